@@ -3,9 +3,10 @@ import pandas as pd
 from utils.calculations import calculate_bmr, calculate_tdee, calculate_protein_needs
 from utils.meal_planning import generate_meal_plan
 from utils.recipe_recommendations import get_recipe_recommendations, format_recipe_recommendation
-from utils.db_operations import create_user, save_meal_plan, get_latest_meal_plan
+from utils.db_operations import create_user, save_meal_plan, get_latest_meal_plan, update_user_profile
 from utils.progress_tracking import add_progress_entry, get_user_progress, calculate_progress_metrics
 from utils.auth import init_session_state, login_user, logout_user, register_user, get_current_user, require_auth
+from utils.user_cache import profile_from_user
 from models.database import get_db
 from datetime import datetime
 import plotly.graph_objects as go
@@ -13,8 +14,17 @@ from plotly.subplots import make_subplots
 import time
 from utils.meal_customization import get_alternative_meals, validate_meal_plan
 from utils.history_viewer import get_user_meal_plans, get_user_progress_history, format_meal_plan_for_display
-from utils.workout_planner import generate_workout_plan, save_workout_schedule, get_latest_workout_schedule, exercise_library, training_guidelines
+from utils.workout_planner import generate_workout_plan, save_workout_schedule, get_latest_workout_schedule, get_exercise_library, get_compiled_exercise_library, get_training_guidelines, load_rotation_state, save_rotation_state
 from utils.recovery_recommendations import calculate_recovery_score, generate_recovery_recommendations
+from utils.tracing import tracer
+from utils.compiled_library import get_compiled_library
+from utils.custom_exercises import get_user_exercise_library
+from utils.catalog_sync import get_catalog_library
+from utils.exercise_substitutions import get_substitution_graph
+from utils.workload import get_workload
+from utils.workout_log import log_sets, load_sets_frame, best_estimated_1rm, weekly_volume, overload_suggestions, exercise_from_schedule_entry
+from utils.periodization import generate_program, save_program, get_latest_program, materialize_week, current_program_week
+from utils.exercise_search import get_exercise_search_index
 
 # Set page config
 st.set_page_config(page_title="Fitness & Nutrition Planner", layout="wide")
@@ -43,6 +53,27 @@ def display_exercise_library():
     tab_exercises, tab_guidelines = st.tabs(["Exercises by Muscle Group", "Training Guidelines"])
 
     with tab_exercises:
+        # Type-ahead search over standard and custom exercises
+        search_query = st.text_input("🔍 Search exercises", key="exercise_search")
+        if search_query:
+            db = get_database()
+            if db:
+                try:
+                    results = get_exercise_search_index(db).search(
+                        search_query,
+                        limit=20,
+                        user_id=st.session_state.user_id
+                    )
+                finally:
+                    db.close()
+                if results:
+                    for result in results:
+                        label = "Custom" if result["is_custom"] else result["subgroup"]
+                        st.write(f"• **{result['name']}** ({result['muscle_group']} / {label}) - {', '.join(result['equipment'])}")
+                else:
+                    st.info("No exercises match your search")
+            st.write("---")
+
         # Select fitness level
         fitness_level = st.selectbox(
             "Select Fitness Level",
@@ -56,16 +87,19 @@ def display_exercise_library():
             default=["None/Bodyweight"]
         )
 
+        compiled = get_compiled_exercise_library()
+
         # Display muscle groups and their subgroups
-        for muscle_group, subgroups in exercise_library.items():
+        for muscle_group, subgroups in compiled.subgroups.items():
             with st.expander(f"{muscle_group} Muscle Group"):
-                for subgroup, exercises_dict in subgroups.items():
+                for subgroup in subgroups:
                     st.subheader(f"⚡ {subgroup}")
-                    if fitness_level in exercises_dict:
+                    if compiled.has_level(muscle_group, subgroup, fitness_level):
                         exercises_shown = False
                         for equip in equipment:
-                            if equip in exercises_dict[fitness_level]:
-                                exercises = exercises_dict[fitness_level][equip]
+                            pool = compiled.pool(muscle_group, subgroup, fitness_level, [equip])
+                            if pool.ids:
+                                exercises = compiled.exercise_names(pool)
                                 st.write(f"🔹 {equip} Exercises:")
                                 for exercise in exercises:
                                     st.write(f"  • {exercise}")
@@ -87,14 +121,14 @@ def display_exercise_library():
         with col1:
             selected_goal = st.selectbox(
                 "Select Training Goal",
-                list(training_guidelines.keys())
+                list(get_training_guidelines().keys())
             )
 
         with col2:
             st.info("💡 These guidelines are general recommendations. Adjust based on your experience and recovery ability.")
 
         if selected_goal:
-            guidelines = training_guidelines[selected_goal]
+            guidelines = get_training_guidelines()[selected_goal]
 
             # Display guidelines in an organized format
             st.subheader(f"Guidelines for {selected_goal}")
@@ -271,8 +305,7 @@ def calculate_nutrition():
 
                 protein_needs = calculate_protein_needs(weight, goal)
 
-                # Store user profile and targets in session state
-                st.session_state.user_profile = {
+                profile = {
                     'weight': weight,
                     'height': height,
                     'age': age,
@@ -283,6 +316,18 @@ def calculate_nutrition():
                     'cuisine_preferences': cuisine_preferences
                 }
 
+                # Persist the profile (refreshing the cached user) and keep it in session state
+                user = None
+                db = get_database()
+                if db:
+                    try:
+                        user = update_user_profile(db, st.session_state.user_id, **profile)
+                    except Exception as e:
+                        print(f"Error saving user profile: {str(e)}")
+                    finally:
+                        db.close()
+                st.session_state.user_profile = profile_from_user(user) if user else profile
+
                 st.session_state.nutritional_targets = {
                     'calories': target_calories,
                     'protein': protein_needs,
@@ -347,6 +392,12 @@ def display_workout_schedule(schedule, selected_days=None):
             with st.expander(f"{day}'s Workout", expanded=True):
                 st.write(f"**Focus:** {workout['focus']}")
                 st.write(f"**Duration:** {workout['duration']} minutes")
+                if workout.get('estimated_duration'):
+                    st.write(f"**Estimated time:** {workout['estimated_duration']} minutes")
+                if workout.get('prescription'):
+                    prescription = workout['prescription']
+                    deload_note = " (deload week)" if prescription.get('deload') else ""
+                    st.write(f"**Sets:** {prescription['sets']} × {prescription.get('rep_range')} reps, rest {prescription.get('rest_period')}{deload_note}")
                 st.write("**Exercises:**")
                 for exercise in workout['exercises']:
                     # Display exercises with proper formatting
@@ -357,18 +408,60 @@ def display_workout_schedule(schedule, selected_days=None):
                             st.write(f"- {exercise}")  # Default exercise format
 
 
-def generate_new_workout(db, fitness_level, goals, available_days, equipment, time_per_session, muscle_groups):
+def display_workout_log(db, user_id):
+    """Helper function to log performed sets and show strength analytics"""
+    st.subheader("🏋️ Log Workout Sets")
+    library = get_user_exercise_library(db, user_id, get_catalog_library(db, get_exercise_library()))
+    current_schedule = get_latest_workout_schedule(db, user_id)
+    entries = []
+    if current_schedule:
+        today = datetime.now().strftime("%A")
+        days = [today] if today in current_schedule["schedule"] else list(current_schedule["schedule"])
+        for day in days:
+            for entry in current_schedule["schedule"][day].get("exercises", []):
+                if exercise_from_schedule_entry(entry, library) and entry not in entries:
+                    entries.append(entry)
+
+    if not entries:
+        st.info("Generate a workout plan to start logging sets.")
+    else:
+        set_rows = st.data_editor(
+            pd.DataFrame({"Exercise": [entries[0]], "Reps": [10], "Load (kg)": [0.0]}),
+            num_rows="dynamic",
+            column_config={
+                "Exercise": st.column_config.SelectboxColumn("Exercise", options=entries, required=True),
+                "Reps": st.column_config.NumberColumn("Reps", min_value=1, max_value=100, step=1),
+                "Load (kg)": st.column_config.NumberColumn("Load (kg)", min_value=0.0, max_value=500.0, step=0.5)
+            },
+            key="workout_set_editor"
+        )
+        if st.button("Save Sets"):
+            sets = []
+            rows = set_rows.dropna(subset=["Exercise", "Reps"]).fillna({"Load (kg)": 0.0})
+            for row in rows.itertuples(index=False):
+                name, muscle_group = exercise_from_schedule_entry(row[0], library)
+                sets.append({"exercise": name, "muscle_group": muscle_group, "reps": row[1], "load": row[2]})
+            logged = log_sets(db, user_id, sets)
+            if logged:
+                st.success(f"Logged {logged} sets")
+
+    sets_frame = load_sets_frame(db, [user_id])
+    if sets_frame.empty:
+        return
+
+    st.write("### Estimated 1RM")
+    st.dataframe(best_estimated_1rm(sets_frame).drop(columns="user_id").round({"e1rm": 1}), hide_index=True)
+
+    st.write("### Weekly Volume by Muscle Group")
+    volume = weekly_volume(sets_frame).pivot_table(index="week", columns="muscle_group", values="volume", observed=True)
+    st.bar_chart(volume)
+
+    st.write("### Next Session Suggestions")
+    st.dataframe(overload_suggestions(sets_frame).drop(columns="user_id").round(1), hide_index=True)
+
+def generate_new_workout(db, fitness_level, goals, available_days, equipment, time_per_session, muscle_groups, mode="fixed"):
     """Helper function to generate and save a new workout schedule"""
     try:
-        print("\n=== Starting New Workout Generation ===")
-        print("Input parameters:")
-        print(f"- Fitness level: {fitness_level}")
-        print(f"- Goals: {goals}")
-        print(f"- Available days: {available_days}")
-        print(f"- Equipment: {equipment}")
-        print(f"- Time per session: {time_per_session}")
-        print(f"- Muscle groups: {muscle_groups}")
-
         # Input validation
         if not available_days:
             st.error("Please select at least one day for your workout")
@@ -381,17 +474,23 @@ def generate_new_workout(db, fitness_level, goals, available_days, equipment, ti
         # Clear current schedule from session state
         try:
             st.session_state.current_schedule = None
-            print("Successfully cleared existing workout schedule")
+            tracer.debug("Cleared existing workout schedule")
         except Exception as e:
             print(f"Error clearing workout schedule: {str(e)}")
 
         with st.spinner("Generating your personalized workout plan..."):
-            # Validate exercise library before generating schedule
-            if not validate_exercise_library(exercise_library):
+            # Load the exercise library (validated once on first load) with the user's custom exercises
+            try:
+                exercise_library = get_user_exercise_library(db, st.session_state.user_id, get_catalog_library(db, get_exercise_library()))
+            except (OSError, ValueError) as e:
+                print(f"Error loading exercise library: {str(e)}")
                 st.error("Error with exercise data. Please try again.")
                 return None
 
-            # Generate new schedule using exercise library
+            # Continue the exercise rotation from previous weeks
+            compiled_library = get_compiled_library(exercise_library)
+            rotation = load_rotation_state(db, st.session_state.user_id, compiled_library)
+
             schedule = generate_workout_plan(
                 fitness_level=fitness_level,
                 goals=goals,
@@ -399,7 +498,9 @@ def generate_new_workout(db, fitness_level, goals, available_days, equipment, ti
                 equipment_available=equipment,
                 time_per_session=time_per_session,
                 muscle_groups=muscle_groups,
-                exercise_library=exercise_library
+                exercise_library=exercise_library,
+                used_exercises_tracker=rotation,
+                mode=mode
             )
 
             if not schedule:
@@ -417,10 +518,10 @@ def generate_new_workout(db, fitness_level, goals, available_days, equipment, ti
 
             # Save to database and update session state
             if save_workout_schedule(db, st.session_state.user_id, schedule, preferences):
-                print("Successfully saved new workout schedule")
+                tracer.debug("Saved new workout schedule")
+                save_rotation_state(db, st.session_state.user_id, rotation, compiled_library)
                 st.session_state.current_schedule = schedule
                 st.success("✅ New workout plan generated successfully!")
-                print("Updated session state with new schedule")
                 st.experimental_rerun()
                 return schedule
             else:
@@ -432,13 +533,21 @@ def generate_new_workout(db, fitness_level, goals, available_days, equipment, ti
         st.error("An error occurred while generating your workout")
         return None
 
-def validate_exercise_library(exercise_library):
-    """Validates the exercise library data for completeness and consistency."""
-    # Add your validation logic here.  This is a placeholder.
-    #  A real implementation would check for missing keys, 
-    #  data types, etc.  Return True if valid, False otherwise.
-    return True  # Placeholder - replace with actual validation
-
+def display_debug_panel():
+    """Show collected trace records and stage timings when tracing is enabled"""
+    if not tracer.enabled("DEBUG") and not tracer.spans:
+        return
+    with st.sidebar.expander("🐞 Debug Trace"):
+        span_totals = tracer.get_span_totals()
+        if span_totals:
+            st.write("**Stage timings (ms)**")
+            for name, total in span_totals.items():
+                st.write(f"- {name}: {total:.2f}")
+        st.write("**Recent trace records**")
+        for record in tracer.get_records()[-50:]:
+            st.text(f"[{record.level}] {record.message}")
+        if st.button("Clear trace", key="clear_trace"):
+            tracer.clear()
 
 def main():
     st.title("🏋️‍♂️ Fitness & Nutrition Planner")
@@ -504,6 +613,7 @@ def main():
     # Main application (only shown when authenticated)
     if st.session_state.is_authenticated:
         st.sidebar.write(f"Welcome, {st.session_state.username}!")
+        display_debug_panel()
         if st.sidebar.button("Logout"):
             st.session_state.clear()
             st.rerun()
@@ -570,6 +680,11 @@ def main():
                     step=15
                 )
 
+                fit_to_time = st.checkbox(
+                    "Fit exercises to session time",
+                    help="Choose how many exercises to do each day from your goals' sets, reps and rest periods"
+                )
+
                 # Muscle group selection
                 muscle_groups = {}
                 if available_days:
@@ -604,7 +719,8 @@ def main():
                                         available_days=available_days,
                                         equipment=equipment,
                                         time_per_session=time_per_session,
-                                        muscle_groups=muscle_groups
+                                        muscle_groups=muscle_groups,
+                                        mode="time_budget" if fit_to_time else "fixed"
                                     )
 
                                     if new_schedule:
@@ -627,6 +743,47 @@ def main():
                                 finally:
                                     db.close()
 
+                st.subheader("Multi-Week Program")
+                program_weeks = st.slider("Program length (weeks)", min_value=4, max_value=12, value=8)
+                if st.button("Generate Program"):
+                    if not available_days or not any(muscles for muscles in muscle_groups.values()):
+                        st.error("Please select workout days and muscle groups")
+                    else:
+                        db = get_database()
+                        if db:
+                            try:
+                                library = get_user_exercise_library(db, st.session_state.user_id, get_catalog_library(db, get_exercise_library()))
+                                compiled_library = get_compiled_library(library)
+                                rotation = load_rotation_state(db, st.session_state.user_id, compiled_library)
+                                program = generate_program(
+                                    fitness_level=fitness_level,
+                                    goals=goals,
+                                    available_days=available_days,
+                                    equipment_available=equipment,
+                                    time_per_session=time_per_session,
+                                    muscle_groups=muscle_groups,
+                                    exercise_library=library,
+                                    weeks=program_weeks,
+                                    used_exercises_tracker=rotation,
+                                    mode="time_budget" if fit_to_time else "fixed"
+                                )
+                                preferences = {
+                                    "fitness_level": fitness_level,
+                                    "goals": goals,
+                                    "equipment": equipment,
+                                    "time_per_session": time_per_session,
+                                    "muscle_groups": muscle_groups
+                                }
+                                if program and save_program(db, st.session_state.user_id, program, preferences):
+                                    save_rotation_state(db, st.session_state.user_id, rotation, compiled_library)
+                                    st.success(f"{program_weeks}-week program generated!")
+                                else:
+                                    st.error("Could not generate program. Please try different selections.")
+                            except Exception as e:
+                                st.error(f"Error generating program: {str(e)}")
+                            finally:
+                                db.close()
+
             with col2:
                 st.subheader("Current Workout Plan")
                 db = get_database()
@@ -634,6 +791,39 @@ def main():
                     try:
                         current_schedule = get_latest_workout_schedule(db, st.session_state.user_id)
                         display_workout_schedule(current_schedule, available_days)
+
+                        program = get_latest_program(db, st.session_state.user_id)
+                        if program:
+                            st.subheader("Current Program")
+                            week = st.selectbox(
+                                "Program week",
+                                list(range(1, program["weeks"] + 1)),
+                                index=current_program_week(program) - 1
+                            )
+                            display_workout_schedule({
+                                "schedule": materialize_week(program, week),
+                                "is_custom": False,
+                                "date": program["start_date"]
+                            }, available_days)
+
+                        if current_schedule and st.button("🔁 Swap Out Full Gym Exercises"):
+                            library = get_user_exercise_library(db, st.session_state.user_id, get_catalog_library(db, get_exercise_library()))
+                            graph = get_substitution_graph(library)
+                            preferences = current_schedule.get("preferences") or {}
+                            available_equipment = [
+                                equip for equip in preferences.get("equipment", ["None/Bodyweight"])
+                                if equip != "Full Gym Access"
+                            ] or ["None/Bodyweight"]
+                            swapped, swaps = graph.swap_schedule(
+                                current_schedule["schedule"],
+                                available_equipment=available_equipment,
+                                level=preferences.get("fitness_level")
+                            )
+                            if not swaps:
+                                st.info("No exercises in this plan need full gym access.")
+                            elif save_workout_schedule(db, st.session_state.user_id, swapped, preferences, is_custom=True):
+                                st.success(f"Swapped {len(swaps)} exercises")
+                                st.rerun()
                     finally:
                         db.close()
 
@@ -705,6 +895,8 @@ def main():
                     else:
                         st.info("No progress data available yet. Start logging your progress!")
 
+                    display_workout_log(db, st.session_state.user_id)
+
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
                 finally:
@@ -842,13 +1034,33 @@ def main():
                     "nutrition_status": nutrition_status
                 }
 
+                # Include the workload from logged sets
+                workload = None
+                db = get_database()
+                if db:
+                    try:
+                        workload = get_workload(db, st.session_state.user_id)
+                    finally:
+                        db.close()
+                if workload and workload["last_session"] is None:
+                    workload = None
+
                 # Generate recommendations
-                recommendations = generate_recovery_recommendations(workout_data, user_metrics)
+                recommendations = generate_recovery_recommendations(workout_data, user_metrics, workload)
 
                 # Display recommendations
                 st.subheader("Your Recovery Score")
                 st.metric("Recovery Score", f"{recommendations['recovery_score']}/100")
 
+                if workload:
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("7-Day Load", f"{workload['acute']:,.0f}")
+                    with col2:
+                        st.metric("28-Day Load", f"{workload['chronic']:,.0f}")
+                    with col3:
+                        st.metric("Acute:Chronic Ratio", workload['acwr'] if workload['acwr'] is not None else "-", help=f"Zone: {workload['zone']}")
+
                 col1, col2 = st.columns(2)
 
                 with col1:
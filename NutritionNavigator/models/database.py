@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, JSON, text, Date, Boolean, Text, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, JSON, text, Date, Boolean, Text, DateTime, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.pool import QueuePool
@@ -6,7 +6,8 @@ import os
 import time
 from contextlib import contextmanager
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_hashing import hash_password, verify_password, needs_rehash
+from models.write_helpers import add_and_commit  # Re-exported for the write helpers
 
 # Get database URL from environment variable
 DATABASE_URL = os.getenv('DATABASE_URL')
@@ -44,13 +45,19 @@ class User(Base):
     water_intakes = relationship("WaterIntake", back_populates="user")
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
 
 class CustomExercise(Base):
     __tablename__ = "custom_exercises"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_custom_exercises_user_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -110,6 +117,113 @@ class WorkoutSchedule(Base):
 
     user = relationship("User", back_populates="workout_schedules")
 
+class WorkoutScheduleHead(Base):
+    __tablename__ = "workout_schedule_heads"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False)  # Latest entry in workout_schedule_versions
+    schedule = Column(JSON)  # Latest schedule, kept in full for single-row reads
+    preferences = Column(JSON)
+    is_custom = Column(Boolean, default=False)
+    date = Column(Date, default=datetime.now().date)
+
+class WorkoutScheduleVersion(Base):
+    __tablename__ = "workout_schedule_versions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "version", name="uq_workout_schedule_versions_user_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    # none_as_null: None must be SQL NULL, not the JSON value null, for the IS NOT NULL snapshot lookups
+    snapshot = Column(JSON(none_as_null=True), nullable=True)  # Full document on snapshot versions
+    patch = Column(JSON(none_as_null=True), nullable=True)  # JSON Patch from the previous version otherwise
+    date = Column(Date, default=datetime.now().date)
+
+class LoggedExercise(Base):
+    __tablename__ = "logged_exercises"
+    __table_args__ = (
+        UniqueConstraint("name", "muscle_group", name="uq_logged_exercises_name_muscle"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    muscle_group = Column(String, nullable=False)
+
+class WorkoutSet(Base):
+    __tablename__ = "workout_sets"
+    __table_args__ = (
+        Index("ix_workout_sets_user_date", "user_id", "date"),
+    )
+
+    # Narrow, append-only: one row per performed set
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    exercise_id = Column(Integer, ForeignKey("logged_exercises.id"), nullable=False)
+    set_number = Column(Integer, nullable=False)
+    reps = Column(Integer, nullable=False)
+    load = Column(Float, nullable=False)  # kg; 0 for bodyweight
+
+class UserWorkload(Base):
+    __tablename__ = "user_workloads"
+
+    # Exponentially weighted training loads, valid as of last_date
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    acute = Column(Float, nullable=False, default=0.0)
+    chronic = Column(Float, nullable=False, default=0.0)
+    last_date = Column(Date, nullable=False)
+    last_session = Column(Date, nullable=True)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class ScrapedExercise(Base):
+    __tablename__ = "scraped_exercises"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    normalized_name = Column(String, unique=True, nullable=False)  # Dedupe key
+    muscle_group = Column(String, nullable=False)  # Muscle group of the page it was found on
+    equipment = Column(String, nullable=False)
+    difficulty = Column(String, nullable=False)
+    source_url = Column(String)
+    first_seen = Column(DateTime, default=datetime.now)
+    last_seen = Column(DateTime, default=datetime.now)
+
+class Recipe(Base):
+    __tablename__ = "recipes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    calories = Column(Float, nullable=False)
+    protein = Column(Float)
+    fat = Column(Float)
+    carbs = Column(Float)
+    servings = Column(Float)
+    scraped_at = Column(DateTime, default=datetime.now)
+
+class WorkoutProgram(Base):
+    __tablename__ = "workout_programs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    start_date = Column(Date, default=datetime.now().date)
+    weeks = Column(Integer, nullable=False)
+    goal = Column(String)
+    base_schedule = Column(JSON)  # Week 1 schedule
+    week_deltas = Column(JSON)  # Per-week exercise swaps and prescription, relative to the previous week
+    preferences = Column(JSON)
+    created_at = Column(DateTime, default=datetime.now)
+
+class ExerciseRotation(Base):
+    __tablename__ = "exercise_rotations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    state = Column(JSON)  # Used-exercise bitsets per muscle-subgroup tracker key
+    updated_at = Column(DateTime, default=datetime.now)
+
 # Create database engine with improved connection pool settings
 engine = create_engine(
     DATABASE_URL,
@@ -187,6 +301,20 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         print("Database tables created successfully")
 
+        # create_all does not add constraints to existing tables; add_custom_exercise's
+        # ON CONFLICT needs this index, so a failure here must stop startup
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_custom_exercises_user_name
+                    ON custom_exercises (user_id, name);
+                """))
+        except Exception as e:
+            raise Exception(
+                f"Could not create uq_custom_exercises_user_name: {str(e)}. If duplicate custom "
+                "exercises exist, review and remove them with `python -m utils.custom_exercise_dedupe`"
+            )
+
         # Verify users table exists
         with engine.connect() as connection:
             result = connection.execute(text("""
@@ -0,0 +1,15 @@
+def add_and_commit(db, instance):
+    """Insert a new row and commit it without a follow-up refresh SELECT.
+
+    The INSERT issued by the flush uses RETURNING to populate the primary key,
+    so the instance is left unexpired after the commit and its attributes can be
+    read without another round trip.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.add(instance)
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+    return instance
@@ -0,0 +1,143 @@
+import os
+import sys
+import types
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, Column, Date, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.orm import declarative_base
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.write_helpers import add_and_commit
+
+# models.database connects and creates tables on import, so tests get a stand-in
+# with the same table definitions for the models they touch and no engine
+Base = declarative_base()
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True)
+    email = Column(String, unique=True)
+    username = Column(String, unique=True)
+    password_hash = Column(String)
+    is_active = Column(Boolean, default=True)
+    weight = Column(Float)
+    height = Column(Float)
+    age = Column(Integer)
+    gender = Column(String)
+    activity_level = Column(String)
+    goal = Column(String)
+    dietary_restrictions = Column(JSON)
+    cuisine_preferences = Column(JSON)
+
+class MealPlan(Base):
+    __tablename__ = "meal_plans"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    date = Column(String)
+    meals = Column(JSON)
+    calories = Column(Float)
+    protein = Column(Float)
+
+class ProgressEntry(Base):
+    __tablename__ = "progress_entries"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    date = Column(Date, default=datetime.now().date)
+    current_weight = Column(Float)
+    calories_consumed = Column(Float)
+    protein_consumed = Column(Float)
+    notes = Column(String, nullable=True)
+
+class WaterIntake(Base):
+    __tablename__ = "water_intake"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    amount_ml = Column(Float, nullable=False)
+    timestamp = Column(DateTime, default=datetime.now)
+
+class LoggedExercise(Base):
+    __tablename__ = "logged_exercises"
+    __table_args__ = (
+        UniqueConstraint("name", "muscle_group", name="uq_logged_exercises_name_muscle"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    muscle_group = Column(String, nullable=False)
+
+class WorkoutSet(Base):
+    __tablename__ = "workout_sets"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    exercise_id = Column(Integer, nullable=False)
+    set_number = Column(Integer, nullable=False)
+    reps = Column(Integer, nullable=False)
+    load = Column(Float, nullable=False)
+
+class UserWorkload(Base):
+    __tablename__ = "user_workloads"
+
+    user_id = Column(Integer, primary_key=True)
+    acute = Column(Float, nullable=False, default=0.0)
+    chronic = Column(Float, nullable=False, default=0.0)
+    last_date = Column(Date, nullable=False)
+    last_session = Column(Date)
+    updated_at = Column(DateTime)
+
+class WorkoutScheduleHead(Base):
+    __tablename__ = "workout_schedule_heads"
+
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    schedule = Column(JSON)
+    preferences = Column(JSON)
+    is_custom = Column(Boolean, default=False)
+    date = Column(Date)
+
+class WorkoutScheduleVersion(Base):
+    __tablename__ = "workout_schedule_versions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "version", name="uq_workout_schedule_versions_user_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    snapshot = Column(JSON(none_as_null=True), nullable=True)
+    patch = Column(JSON(none_as_null=True), nullable=True)
+    date = Column(Date)
+
+class ScrapedExercise(Base):
+    __tablename__ = "scraped_exercises"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    normalized_name = Column(String, unique=True, nullable=False)
+    muscle_group = Column(String, nullable=False)
+    equipment = Column(String, nullable=False)
+    difficulty = Column(String, nullable=False)
+    source_url = Column(String)
+    first_seen = Column(DateTime, default=datetime.now)
+    last_seen = Column(DateTime, default=datetime.now)
+
+database = types.ModuleType("models.database")
+database.Base = Base
+database.add_and_commit = add_and_commit
+database.User = User
+database.MealPlan = MealPlan
+database.ProgressEntry = ProgressEntry
+database.WaterIntake = WaterIntake
+database.LoggedExercise = LoggedExercise
+database.WorkoutSet = WorkoutSet
+database.UserWorkload = UserWorkload
+database.WorkoutScheduleHead = WorkoutScheduleHead
+database.WorkoutScheduleVersion = WorkoutScheduleVersion
+database.ScrapedExercise = ScrapedExercise
+sys.modules["models.database"] = database
@@ -0,0 +1,39 @@
+import pytest
+
+# Smoke runs of the benchmark entry points at small sizes, so they keep working
+
+def test_recovery_benchmark():
+    from utils.recovery_recommendations import benchmark_recovery
+
+    result = benchmark_recovery(clients=50, repeats=1)
+    assert result["scores_match"]
+
+def test_keyword_matcher_benchmark():
+    pytest.importorskip("trafilatura")
+    from utils.keyword_matcher import benchmark_matchers
+
+    results = benchmark_matchers(names=200, workouts=50, repeats=1)
+    assert all(result["outputs_match"] for result in results)
+
+def test_extraction_benchmark(tmp_path):
+    pytest.importorskip("trafilatura")
+    from utils.recipe_scraper import benchmark_extraction, write_benchmark_corpus
+
+    write_benchmark_corpus(str(tmp_path), jsonld=3, microdata=2, plain=1)
+    text_only, structured = benchmark_extraction(str(tmp_path))
+    assert structured["pages"] == 6
+    assert structured["accuracy"]["servings"] > text_only["accuracy"]["servings"]
+
+def test_search_benchmark():
+    from utils.exercise_search import benchmark_search
+
+    result = benchmark_search(docs=500, users=5)
+    assert result["documents"] == 500
+    assert result["prefix_median_ms"] <= result["prefix_p95_ms"]
+
+def test_workout_plan_benchmark():
+    from utils.workout_planner import benchmark_workout_plans
+
+    result = benchmark_workout_plans(plans=5, repeats=1)
+    assert result["exercises"] > 0
+    assert result["warm_plans_per_second"] > 0
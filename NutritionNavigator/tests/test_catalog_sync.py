@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.database import Base, ScrapedExercise
+
+pytest.importorskip("trafilatura")
+from utils import catalog_sync
+
+STANDARD_LIBRARY = {
+    "Chest": {"Upper Chest": {"Beginner": {"Dumbbells": ["Incline Dumbbell Press"]}}}
+}
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(catalog_sync, "CATALOG_LIBRARY_ENABLED", True)
+    monkeypatch.setattr(catalog_sync, "_catalog_view", None)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+def add_scraped(db, name, equipment):
+    db.add(ScrapedExercise(
+        name=name,
+        normalized_name=catalog_sync.normalize_exercise_name(name),
+        muscle_group="Chest",
+        equipment=equipment,
+        difficulty="Beginner"
+    ))
+    db.commit()
+
+def catalog_names(library):
+    levels = library["Chest"].get(catalog_sync.CATALOG_SUBGROUP, {})
+    return sorted(name for equipment_map in levels.values() for names in equipment_map.values() for name in names)
+
+def test_catalog_is_off_unless_enabled(db, monkeypatch):
+    add_scraped(db, "Cable Crossover", "Full Gym Access")
+    monkeypatch.setattr(catalog_sync, "CATALOG_LIBRARY_ENABLED", False)
+    assert catalog_sync.get_catalog_library(db, STANDARD_LIBRARY) is STANDARD_LIBRARY
+
+def test_only_keyword_matched_equipment_is_layered(db):
+    add_scraped(db, "Cable Crossover", "Full Gym Access")
+    # No equipment keyword, so "None/Bodyweight" was only the matcher's default
+    add_scraped(db, "Svend Press", "None/Bodyweight")
+    library = catalog_sync.get_catalog_library(db, STANDARD_LIBRARY)
+    assert catalog_names(library) == ["Cable Crossover"]
+
+def test_view_is_kept_until_the_rows_change(db):
+    add_scraped(db, "Cable Crossover", "Full Gym Access")
+    library = catalog_sync.get_catalog_library(db, STANDARD_LIBRARY)
+
+    # A sync that stores the same rows re-reads them but keeps the view
+    catalog_sync.invalidate_catalog_library()
+    assert catalog_sync.get_catalog_library(db, STANDARD_LIBRARY) is library
+
+    add_scraped(db, "Machine Fly", "Full Gym Access")
+    catalog_sync.invalidate_catalog_library()
+    updated = catalog_sync.get_catalog_library(db, STANDARD_LIBRARY)
+    assert updated is not library
+    assert catalog_names(updated) == ["Cable Crossover", "Machine Fly"]
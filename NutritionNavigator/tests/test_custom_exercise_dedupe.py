@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine, text
+
+from utils.custom_exercise_dedupe import delete_duplicates, find_duplicates
+
+def test_keeps_the_oldest_exercise_per_user_and_name():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE custom_exercises (
+                id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, muscle_group TEXT,
+                equipment TEXT, difficulty TEXT, description TEXT, created_at TEXT
+            )
+        """))
+        connection.execute(text("""
+            INSERT INTO custom_exercises (id, user_id, name, muscle_group, equipment, difficulty)
+            VALUES (1, 1, 'Curl', 'Arms', 'Dumbbells', 'Beginner'),
+                   (2, 2, 'Curl', 'Arms', 'Dumbbells', 'Beginner'),
+                   (3, 1, 'Curl', 'Arms', 'Cable', 'Advanced'),
+                   (4, 1, 'Row', 'Back', 'Cable', 'Beginner')
+        """))
+        duplicates = find_duplicates(connection)
+        assert [(row["id"], row["equipment"]) for row in duplicates] == [(3, "Cable")]
+        assert delete_duplicates(connection, duplicates) == 1
+        remaining = connection.execute(text("SELECT id FROM custom_exercises ORDER BY id")).scalars().all()
+        assert remaining == [1, 2, 4]
@@ -0,0 +1,27 @@
+from utils.exercise_search import ExerciseSearchIndex
+
+def _names(results):
+    return [result["name"] for result in results]
+
+def test_short_prefix_rankings_follow_incremental_changes():
+    index = ExerciseSearchIndex()
+    index.add_documents([
+        ("bench", {"name": "Bench Press", "user_id": None}),
+        ("row", {"name": "Barbell Row", "user_id": None}),
+        ("squat", {"name": "Back Squat", "user_id": None}),
+    ])
+    assert _names(index.search("b")) == ["Back Squat", "Barbell Row", "Bench Press"]
+
+    index.add_document("box", {"name": "Box Jump", "user_id": None})
+    index.add_document("mine", {"name": "Banded Curl", "user_id": 1})
+    index.remove_document("row")
+    assert _names(index.search("b")) == ["Back Squat", "Bench Press", "Box Jump"]
+    assert _names(index.search("b", user_id=1)) == ["Back Squat", "Banded Curl", "Bench Press", "Box Jump"]
+    assert _names(index.search("ba", user_id=2)) == ["Back Squat"]
+
+def test_bulk_load_replaces_existing_documents():
+    index = ExerciseSearchIndex()
+    index.add_document("curl", {"name": "Hammer Curl", "user_id": None})
+    index.add_documents([("curl", {"name": "Cable Curl", "user_id": None})])
+    assert _names(index.search("c")) == ["Cable Curl"]
+    assert index.search("hammer") == []
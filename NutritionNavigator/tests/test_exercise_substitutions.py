@@ -0,0 +1,42 @@
+from utils.exercise_substitutions import SubstitutionGraph
+
+LIBRARY = {
+    "Chest": {
+        "Upper Chest": {
+            "Beginner": {"Full Gym Access": ["Incline Bench Press"], "Dumbbells": ["Incline Fly"]},
+            "Advanced": {"None/Bodyweight": ["Decline Push-ups"]}
+        }
+    }
+}
+
+def test_substitutes_stay_at_the_requested_level():
+    graph = SubstitutionGraph(LIBRARY)
+    assert graph.substitutes("Incline Bench Press", ["None/Bodyweight", "Dumbbells"], level="Beginner") == ["Incline Fly"]
+    assert graph.substitutes("Incline Bench Press", ["None/Bodyweight"], level="Beginner") == []
+
+    schedule = {"Monday": {"exercises": ["Upper Chest (Beginner): Incline Bench Press"]}}
+    swapped, swaps = graph.swap_schedule(schedule, available_equipment=["None/Bodyweight"])
+    assert swapped == schedule
+    assert swaps == []
+
+def test_variants_stay_in_the_muscle_group_behind_the_subgroup():
+    graph = SubstitutionGraph({
+        "Legs": {"Hamstrings": {"Advanced": {
+            "Full Gym Access": ["Drop Set Work"],
+            "None/Bodyweight": ["Nordic Curls"]
+        }}},
+        "Arms": {"Biceps": {"Advanced": {"None/Bodyweight": ["Advanced Band Work", "Drop Set Work"]}}}
+    })
+    assert graph.substitutes("Drop Set Work", ["None/Bodyweight"], subgroup="Hamstrings") == ["Nordic Curls"]
+
+def test_cross_subgroup_swap_takes_the_substitute_subgroup():
+    graph = SubstitutionGraph({
+        "Chest": {
+            "Upper Chest": {"Beginner": {"Full Gym Access": ["Incline Barbell Press"]}},
+            "Middle Chest": {"Beginner": {"Dumbbells": ["Incline Dumbbell Press"]}}
+        }
+    })
+    schedule = {"Monday": {"exercises": ["Upper Chest (Beginner): Incline Barbell Press"]}}
+    swapped, swaps = graph.swap_schedule(schedule, available_equipment=["Dumbbells"])
+    assert swapped["Monday"]["exercises"] == ["Middle Chest (Beginner): Incline Dumbbell Press"]
+    assert swaps[0]["to"] == "Middle Chest (Beginner): Incline Dumbbell Press"
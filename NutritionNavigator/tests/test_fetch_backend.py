@@ -0,0 +1,22 @@
+import pytest
+
+from utils import fetch_backend
+
+@pytest.fixture
+def replay(tmp_path):
+    previous = fetch_backend.set_fetch_backend(fetch_backend.create_fetch_backend("replay", str(tmp_path)))
+    yield fetch_backend.FixtureStore(str(tmp_path))
+    fetch_backend.set_fetch_backend(previous)
+
+def test_missing_fixture_is_reported_and_returns_none(replay, capsys):
+    assert fetch_backend.fetch_url("https://example.com/recipe") is None
+    assert "Missing fetch fixture" in capsys.readouterr().out
+
+    with pytest.raises(fetch_backend.FixtureNotFound):
+        fetch_backend.fetch_bytes("https://example.com/recipe")
+
+def test_recorded_page_is_replayed(replay):
+    replay.save(fetch_backend.FetchResponse(
+        "https://example.com/recipe", 200, {"Content-Type": "text/html; charset=utf-8"}, b"<h1>Oats</h1>"
+    ))
+    assert fetch_backend.fetch_url("https://example.com/recipe") == "<h1>Oats</h1>"
@@ -0,0 +1,22 @@
+import threading
+import time
+
+from utils import password_hashing
+
+def test_concurrent_first_logins_share_one_pool(monkeypatch):
+    created = []
+
+    class SlowExecutor:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(password_hashing, "ThreadPoolExecutor", SlowExecutor)
+    monkeypatch.setattr(password_hashing, "_executor", None)
+    threads = [threading.Thread(target=password_hashing._get_executor) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert password_hashing._get_executor() is created[0]
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, User
+from utils import user_cache
+from utils.db_operations import create_user, save_meal_plan, update_user_profile
+from utils.hydration_tracker import log_water_intake
+from utils.progress_tracking import add_progress_entry
+
+@pytest.fixture
+def counted():
+    """(session factory, list of SQL statements executed)"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    yield sessionmaker(bind=engine), statements
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.st.session_state.pop("_user_cache", None)
+
+def _profile():
+    return dict(weight=70.0, height=175.0, age=30, gender="female", activity_level="Moderate",
+                goal="Maintenance", dietary_restrictions=[], cuisine_preferences=["Any"])
+
+def test_each_write_is_one_statement(counted):
+    Session, statements = counted
+    with Session() as db:
+        user = create_user(db, **_profile())
+        assert len(statements) == 1 and statements[0].startswith("INSERT")
+        assert user.id and user.weight == 70.0
+        assert len(statements) == 1
+
+        for write in (
+            lambda: save_meal_plan(db, user.id, {"meals": []}, 2000.0, 120.0).id,
+            lambda: add_progress_entry(db, user.id, 69.5, 1900.0, 110.0).id,
+            lambda: log_water_intake(db, user.id, 250.0)["entry_id"],
+        ):
+            statements.clear()
+            assert write()
+            assert len(statements) == 1 and statements[0].startswith("INSERT")
+
+def test_cached_user_and_profile_need_no_queries(counted):
+    Session, statements = counted
+    with Session() as db:
+        user = create_user(db, **_profile())
+        user_id = user.id
+        statements.clear()
+        # One SELECT for the row and one UPDATE; the result is written through to the cache
+        update_user_profile(db, user_id, weight=68.0)
+        assert [sql.split()[0] for sql in statements] == ["SELECT", "UPDATE"]
+
+    with Session() as db:
+        statements.clear()
+        cached = user_cache.get_cached_user(db, user_id)
+        profile = user_cache.profile_from_user(cached)
+        assert profile["weight"] == 68.0 and cached.username is None
+        assert statements == []
+
+        # Edits to the merged instance still flush through the session
+        cached.goal = "Weight Loss"
+        db.commit()
+        assert [sql.split()[0] for sql in statements] == ["UPDATE"]
@@ -0,0 +1,56 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.rate_limiter import AttemptRateLimiter, MemoryBucketBackend, SQLiteBucketBackend
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBucketBackend(str(tmp_path / "buckets.sqlite3"))
+    return MemoryBucketBackend()
+
+def test_refilled_buckets_are_evicted():
+    backend = MemoryBucketBackend()
+    for index in range(backend.SWEEP_EVERY - 1):
+        backend.consume(f"user:{index}", capacity=5, rate=0.2, now=0.0)
+    # 25 s later every bucket is full again and the next consume sweeps them
+    backend.consume("user:late", capacity=5, rate=0.2, now=25.0)
+    assert list(backend._buckets) == ["user:late"]
+
+def test_locked_database_raises_original_error(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    backend = SQLiteBucketBackend(path)
+    backend._connect = lambda: sqlite3.connect(path, timeout=0, isolation_level=None)
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            backend.consume("user:a", capacity=5, rate=0.2, now=0.0)
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    assert backend.consume("user:a", capacity=5, rate=0.2, now=0.0)
+
+def test_concurrent_attempts_never_exceed_the_burst(backend):
+    # No refill, so exactly `capacity` of the 400 attempts on one username may pass
+    limiter = AttemptRateLimiter(backend, capacity=5, rate=0)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(
+            lambda attempt: limiter.allow("login", "alice", f"client-{attempt % 40}"),
+            range(400)
+        ))
+    assert sum(results) == 5
+    assert limiter.get_metrics() == {"accepted": 5, "rejected": 395}
+
+def test_user_rejection_keeps_the_client_token(backend):
+    limiter = AttemptRateLimiter(backend, capacity=2, rate=0)
+    assert limiter.allow("login", "alice", "client-1")
+    assert limiter.allow("login", "alice", "client-2")
+    for _ in range(5):
+        assert not limiter.allow("login", "alice", "client-3")
+    # client-3 still has its whole burst for another account
+    assert limiter.allow("login", "bob", "client-3")
+    assert limiter.allow("login", "bob", "client-3")
+    assert not limiter.allow("login", "bob", "client-3")
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("trafilatura")
+
+from utils import recipe_scraper
+
+PARTIAL_JSON_LD = """<script type="application/ld+json">
+{"@type": "Recipe", "recipeYield": "4 servings", "nutrition": {"fatContent": "12 g", "carbohydrateContent": "30 g"}}
+</script>"""
+
+def test_structured_fields_override_text_fallback(monkeypatch):
+    monkeypatch.setattr(recipe_scraper, "extract_text_recipe", lambda html: {
+        "name": "Chickpea Curry", "servings": None, "calories": 420.0, "protein": 15.0, "fat": 5.0, "carbs": 50.0
+    })
+    assert recipe_scraper.parse_recipe_page(PARTIAL_JSON_LD) == {
+        "name": "Chickpea Curry", "servings": 4.0, "calories": 420.0, "protein": 15.0, "fat": 12.0, "carbs": 30.0
+    }
@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from models.database import Base, WorkoutScheduleVersion
+from utils import schedule_versions
+
+def _schedule(version):
+    return {"Monday": {"exercises": [f"Chest: Push-ups x{version}"]}}
+
+def test_patch_versions_survive_pruning(monkeypatch):
+    monkeypatch.setattr(schedule_versions, "SCHEDULE_RETENTION_VERSIONS", 5)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for version in range(1, 26):
+            assert schedule_versions.save_schedule_version(db, 1, _schedule(version), {})
+
+        # Patch rows hold SQL NULL snapshots, so pruning at v21 keeps v1 as the base
+        patch_rows = db.query(WorkoutScheduleVersion).filter(WorkoutScheduleVersion.snapshot.is_(None)).count()
+        assert patch_rows == 23
+        for version in (3, 18, 24):
+            assert schedule_versions.get_schedule_version(db, 1, version)["schedule"] == _schedule(version)
+
+def test_repair_json_nulls():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for version in range(1, 4):
+            schedule_versions.save_schedule_version(db, 1, _schedule(version), {})
+        # Rows as written before none_as_null: the JSON value null in both columns
+        db.execute(text("UPDATE workout_schedule_versions SET snapshot = 'null' WHERE snapshot IS NULL"))
+        db.execute(text("UPDATE workout_schedule_versions SET patch = 'null' WHERE patch IS NULL"))
+        db.commit()
+        assert schedule_versions.get_schedule_version(db, 1, 3) is None
+
+        assert schedule_versions.repair_json_nulls(db) == 3
+        assert schedule_versions.get_schedule_version(db, 1, 3)["schedule"] == _schedule(3)
@@ -0,0 +1,22 @@
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.database import Base, LoggedExercise, UserWorkload, WorkoutSet
+from utils.workload import rebuild_workloads
+
+def test_rebuild_drops_workloads_of_users_without_sets():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(LoggedExercise(id=1, name="Squat", muscle_group="Legs"))
+        for user_id in (1, 2):
+            db.add(WorkoutSet(user_id=user_id, date=date(2024, 5, 1), exercise_id=1, set_number=1, reps=5, load=100.0))
+        db.commit()
+        assert rebuild_workloads(db, [1, 2]) == 2
+
+        db.query(WorkoutSet).filter(WorkoutSet.user_id == 2).delete()
+        db.commit()
+        assert rebuild_workloads(db, [1, 2]) == 1
+        assert [row.user_id for row in db.query(UserWorkload).all()] == [1]
@@ -0,0 +1,53 @@
+import math
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.database import Base, LoggedExercise, WorkoutSet
+from utils import workout_log
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture(autouse=True)
+def empty_exercise_cache():
+    workout_log._exercise_ids.clear()
+    yield
+    workout_log._exercise_ids.clear()
+
+SQUAT = {"exercise": "Squat", "muscle_group": "Legs", "reps": 5, "load": 100}
+
+def fail_next_commit(db, monkeypatch):
+    commit = db.commit
+
+    def failing_commit():
+        monkeypatch.setattr(db, "commit", commit)
+        raise Exception("could not serialize access")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+
+def test_rolled_back_exercise_ids_are_not_cached(db, monkeypatch):
+    fail_next_commit(db, monkeypatch)
+    assert workout_log.log_sets(db, 1, [SQUAT], date(2026, 1, 5)) == 0
+    assert workout_log._exercise_ids == {}
+    assert db.query(LoggedExercise).count() == 0
+
+    assert workout_log.log_sets(db, 1, [SQUAT], date(2026, 1, 6)) == 1
+    squat = db.query(LoggedExercise).one()
+    assert workout_log._exercise_ids == {("Squat", "Legs"): squat.id}
+    assert [row.exercise_id for row in db.query(WorkoutSet).all()] == [squat.id]
+
+def test_missing_load_is_logged_as_bodyweight(db):
+    assert workout_log.log_sets(db, 1, [{**SQUAT, "load": float("nan")}], date(2026, 1, 5)) == 1
+    assert db.query(WorkoutSet).one().load == 0.0
+
+def test_non_finite_values_are_rejected(db):
+    assert workout_log.log_sets(db, 1, [{**SQUAT, "load": math.inf}], date(2026, 1, 5)) == 0
+    assert workout_log.log_sets(db, 1, [{**SQUAT, "reps": float("nan")}], date(2026, 1, 5)) == 0
+    assert db.query(WorkoutSet).count() == 0
@@ -1,7 +1,12 @@
+import os
+import re
 import streamlit as st
-from models.database import User, SessionLocal
+from models.database import User, SessionLocal, add_and_commit
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional
+from utils.user_cache import get_cached_user, cache_user, invalidate_user
+from utils.rate_limiter import get_rate_limiter
 
 def init_session_state():
     """Initialize session state variables for authentication"""
@@ -12,15 +17,64 @@ def init_session_state():
     if 'is_authenticated' not in st.session_state:
         st.session_state.is_authenticated = False
 
+# Number of reverse proxies in front of the app that append to X-Forwarded-For;
+# with none, the header is client-controlled and ignored
+TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+
+def client_address(forwarded_for: Optional[str], peer_address: Optional[str], trusted_hops: int = TRUSTED_PROXY_HOPS) -> Optional[str]:
+    """Client IP as seen by the outermost trusted proxy, else the socket peer address.
+
+    Each trusted proxy appends the address it received the request from, so the
+    entry trusted_hops from the right is the last one a client cannot forge.
+    """
+    if trusted_hops > 0 and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if len(hops) >= trusted_hops:
+            return hops[-trusted_hops]
+    return peer_address
+
+def get_client_id() -> Optional[str]:
+    """Identify the client for throttling: its IP address when known, else the Streamlit session"""
+    try:
+        address = client_address(
+            st.context.headers.get("X-Forwarded-For"),
+            getattr(st.context, "ip_address", None)
+        )
+        if address:
+            return address
+    except Exception:
+        pass
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
 def login_user(db: Session, username: str, password: str) -> bool:
-    """Authenticate user and set session state"""
+    """Authenticate user and set session state.
+
+    Raises RateLimitExceeded, before any password hashing, when the username
+    or client has used up its attempt budget.
+    """
+    get_rate_limiter().check("login", username, get_client_id())
     try:
         print(f"Attempting login for user: {username}")  # Debug log
         user = db.query(User).filter(User.username == username).first()
         if user and user.check_password(password):
+            # Upgrade hashes created with an outdated algorithm or cost
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    add_and_commit(db, user)
+                    print(f"Rehashed password for user: {username}")  # Debug log
+                except Exception as rehash_error:
+                    db.rollback()
+                    print(f"Password rehash error: {str(rehash_error)}")  # Debug log
             st.session_state.user_id = user.id
             st.session_state.username = user.username
             st.session_state.is_authenticated = True
+            cache_user(user)
             print(f"Login successful for user: {username}")  # Debug log
             return True
         print(f"Login failed for user: {username}")  # Debug log
@@ -31,10 +85,25 @@ def login_user(db: Session, username: str, password: str) -> bool:
 
 def logout_user():
     """Clear user session state"""
+    invalidate_user()
     st.session_state.user_id = None
     st.session_state.username = None
     st.session_state.is_authenticated = False
 
+def _duplicate_registration_message(error: IntegrityError) -> str:
+    """Map a unique-violation on the users table to a user-facing message.
+
+    Only the constraint name or the key's column list is inspected, never the
+    conflicting values, which the user chose.
+    """
+    constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+    if not constraint:
+        key = re.search(r"Key \(([^)]*)\)=", str(error.orig))
+        constraint = key.group(1) if key else ""
+    if "email" in constraint:
+        return "Email already registered"
+    return "Username already taken"
+
 def register_user(
     db: Session,
     username: str,
@@ -52,11 +121,8 @@ def register_user(
         if len(password) < 6:
             raise ValueError("Password must be at least 6 characters long")
 
-        # Check if username or email already exists
-        if db.query(User).filter(User.username == username).first():
-            raise ValueError("Username already taken")
-        if db.query(User).filter(User.email == email).first():
-            raise ValueError("Email already registered")
+        # Throttle before hashing so signup storms cannot pin the CPU
+        get_rate_limiter().check("register", username, get_client_id())
 
         # Create new user
         user = User(
@@ -66,9 +132,12 @@ def register_user(
         )
         user.set_password(password)
 
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        # Rely on the unique constraints instead of pre-checking both columns
+        try:
+            add_and_commit(db, user)
+        except IntegrityError as integrity_error:
+            db.rollback()
+            raise ValueError(_duplicate_registration_message(integrity_error))
         print(f"Successfully registered user: {username}")  # Debug log
         return user
     except Exception as e:
@@ -77,9 +146,13 @@ def register_user(
         raise Exception(f"Registration error: {str(e)}")
 
 def get_current_user(db: Session) -> Optional[User]:
-    """Get the current logged-in user"""
+    """Get the current logged-in user, served from the session cache when fresh"""
     if st.session_state.is_authenticated and st.session_state.user_id:
-        return db.query(User).filter(User.id == st.session_state.user_id).first()
+        user = get_cached_user(db, st.session_state.user_id)
+        if user is None:
+            user = db.query(User).filter(User.id == st.session_state.user_id).first()
+            cache_user(user)
+        return user
     return None
 
 def require_auth():
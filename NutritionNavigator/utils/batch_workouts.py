@@ -0,0 +1,88 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from utils.workout_planner import generate_workout_plan, get_exercise_library, save_workout_schedules_bulk
+
+def _client_seed(base_seed: Any, spec: Dict[str, Any], index: int) -> str:
+    """Per-client seed: explicit spec seed, else derived from the batch seed and user"""
+    if spec.get("seed") is not None:
+        return str(spec["seed"])
+    return f"{base_seed}:{spec.get('user_id', index)}"
+
+def _generate_for_client(job: Tuple[int, Dict[str, Any], str]) -> Dict[str, Any]:
+    """Worker entry point; the exercise library is loaded once per worker process"""
+    index, spec, seed = job
+    user_id = spec.get("user_id")
+    try:
+        preferences = spec["preferences"]
+        muscle_groups = spec["muscle_groups"]
+        schedule = generate_workout_plan(
+            fitness_level=preferences["fitness_level"],
+            goals=preferences.get("goals", []),
+            available_days=preferences.get("available_days") or list(muscle_groups),
+            equipment_available=preferences["equipment"],
+            time_per_session=preferences.get("time_per_session", 45),
+            muscle_groups=muscle_groups,
+            exercise_library=get_exercise_library(),
+            rng=random.Random(seed)
+        )
+        if not schedule:
+            return {"index": index, "user_id": user_id, "error": "No workouts could be generated"}
+        return {
+            "index": index,
+            "user_id": user_id,
+            "schedule": schedule,
+            "preferences": {**preferences, "muscle_groups": muscle_groups}
+        }
+    except Exception as e:
+        return {"index": index, "user_id": user_id, "error": str(e)}
+
+def generate_workout_plans_batch(
+    specs: List[Dict[str, Any]],
+    seed: Any = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 8
+) -> Dict[str, Any]:
+    """Generate workout plans for a roster on a process pool.
+
+    Each spec holds "user_id", "preferences" (fitness_level, goals, equipment,
+    time_per_session and optionally available_days) and "muscle_groups", plus an
+    optional "seed". Results come back in spec order, with failures listed
+    separately rather than aborting the batch.
+    """
+    start = time.perf_counter()
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+    jobs = [(index, spec, _client_seed(base_seed, spec, index)) for index, spec in enumerate(specs)]
+
+    results = []
+    failures = []
+    if jobs:
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for outcome in executor.map(_generate_for_client, jobs, chunksize=chunksize):
+                if "error" in outcome:
+                    failures.append(outcome)
+                else:
+                    results.append(outcome)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "results": results,
+        "failures": failures,
+        "seed": base_seed,
+        "elapsed_seconds": round(elapsed, 3),
+        "plans_per_second": round(len(results) / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+def generate_and_save_roster(
+    db,
+    specs: List[Dict[str, Any]],
+    seed: Any = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Generate plans for a roster and persist all of them in one bulk insert"""
+    report = generate_workout_plans_batch(specs, seed=seed, max_workers=max_workers)
+    report["saved"] = save_workout_schedules_bulk(db, report["results"])
+    return report
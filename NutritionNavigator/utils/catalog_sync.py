@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urljoin
+from utils.fetch_backend import get_fetch_backend
+
+# Exercise catalog pages per muscle group, relative to CATALOG_BASE_URL
+CATALOG_BASE_URL = os.getenv("CATALOG_BASE_URL", "https://www.muscleandstrength.com/exercises/")
+CATALOG_PAGES = {
+    "Chest": "chest",
+    "Back": "back",
+    "Legs": "legs",
+    "Shoulders": "shoulders",
+    "Biceps": "biceps",
+    "Triceps": "triceps",
+    "Core": "abs",
+    "Forearms": "forearms"
+}
+
+# Catalog muscle groups that the planner library files under another group
+LIBRARY_MUSCLE_GROUPS = {
+    "Biceps": "Arms",
+    "Triceps": "Arms",
+    "Forearms": "Arms"
+}
+CATALOG_SUBGROUP = "Catalog"
+
+CATALOG_CACHE_DIR = os.getenv(
+    "CATALOG_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".catalog_cache")
+)
+MAX_PAGES_PER_GROUP = 20
+
+_EXERCISE_LINK = re.compile(r"/exercises/[a-z0-9][a-z0-9-]*\.html$")
+
+def normalize_exercise_name(name: str) -> str:
+    """Dedupe key: lowercase words without punctuation"""
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+class PageCache:
+    """On-disk cache of page bodies with their ETag and Last-Modified validators"""
+
+    def __init__(self, directory: str = CATALOG_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + suffix)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url, ".json"), encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(self._path(url, ".html"), "rb") as f:
+                entry["body"] = f.read()
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        # Body first, then metadata, each via rename so readers never see partial files
+        for suffix, data in ((".html", body), (".json", json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat()
+        }).encode())):
+            path = self._path(url, suffix)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+
+def fetch_cached(url: str, cache: PageCache) -> Tuple[bytes, bool]:
+    """Fetch a page with a conditional request; returns (body, served_from_cache)"""
+    cached = cache.get(url)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    response = get_fetch_backend().fetch(url, headers)
+    if response.status == 304 and cached:
+        return cached["body"], True
+    if response.status != 200:
+        raise IOError(f"HTTP {response.status} for {url}")
+    cache.put(url, response.body, response.header("ETag"), response.header("Last-Modified"))
+    return response.body, False
+
+class CatalogPageParser(HTMLParser):
+    """Collects links to exercise pages and the pagination "next" link"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url
+        self.exercises: List[Tuple[str, str]] = []
+        self.next_url: Optional[str] = None
+        self._link: Optional[str] = None
+        self._text: List[str] = []
+        self._in_next = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        rel = (attrs.get("rel") or "").lower().split()
+        classes = attrs.get("class") or ""
+        if tag == "link" and "next" in rel and attrs.get("href"):
+            self.next_url = self.next_url or urljoin(self.base_url, attrs["href"])
+        elif tag == "li" and "next" in classes:
+            # Drupal-style pagers mark the list item, not the link
+            self._in_next = True
+        elif tag == "a" and attrs.get("href"):
+            href = attrs["href"]
+            if "next" in rel or self._in_next:
+                self.next_url = self.next_url or urljoin(self.base_url, href)
+            elif _EXERCISE_LINK.search(href.split("?")[0]):
+                self._link = urljoin(self.base_url, href)
+                self._text = []
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._link is not None:
+            name = " ".join("".join(self._text).split())
+            if name:
+                self.exercises.append((name, self._link))
+            self._link = None
+        elif tag == "li":
+            self._in_next = False
+
+def _crawl_group(muscle_group: str, base_url: str, cache: PageCache, max_pages: int) -> Dict[str, Any]:
+    """Follow one muscle group's pages; errors end that group's crawl, not the sync"""
+    url = urljoin(base_url, CATALOG_PAGES[muscle_group])
+    seen_urls = set()
+    exercises = []
+    stats = {"muscle_group": muscle_group, "pages": 0, "not_modified": 0, "error": None}
+    try:
+        while url and url not in seen_urls and stats["pages"] < max_pages:
+            seen_urls.add(url)
+            body, from_cache = fetch_cached(url, cache)
+            stats["pages"] += 1
+            stats["not_modified"] += from_cache
+            parser = CatalogPageParser(url)
+            parser.feed(body.decode("utf-8", errors="replace"))
+            exercises.extend((name, link, muscle_group) for name, link in parser.exercises)
+            url = parser.next_url
+    except Exception as e:
+        stats["error"] = str(e)
+    stats["exercises"] = exercises
+    return stats
+
+def sync_catalog(
+    db=None,
+    muscle_groups: Optional[List[str]] = None,
+    base_url: str = CATALOG_BASE_URL,
+    cache_dir: str = CATALOG_CACHE_DIR,
+    max_workers: int = 8,
+    max_pages: int = MAX_PAGES_PER_GROUP
+) -> Dict[str, Any]:
+    """Fetch every muscle group's catalog pages concurrently, dedupe and optionally store them.
+
+    Returns the deduplicated exercises plus per-group page counts and errors.
+    """
+    from utils.exercise_scraper import categorize_exercises, get_exercise_difficulties
+
+    start = time.perf_counter()
+    groups = [group for group in (muscle_groups or CATALOG_PAGES) if group in CATALOG_PAGES]
+    cache = PageCache(cache_dir)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as executor:
+        crawls = list(executor.map(lambda group: _crawl_group(group, base_url, cache, max_pages), groups))
+
+    # The first muscle group (in CATALOG_PAGES order) to list an exercise keeps it
+    unique: Dict[str, Tuple[str, str, str]] = {}
+    for crawl in crawls:
+        for name, link, muscle_group in crawl.pop("exercises"):
+            unique.setdefault(normalize_exercise_name(name), (name, link, muscle_group))
+
+    names = [name for name, _, _ in unique.values()]
+    exercises = [
+        {
+            "name": name,
+            "normalized_name": normalized,
+            "muscle_group": muscle_group,
+            "equipment": equipment,
+            "difficulty": difficulty,
+            "source_url": link
+        }
+        for (normalized, (name, link, muscle_group)), equipment, difficulty in zip(
+            unique.items(), categorize_exercises(names), get_exercise_difficulties(names)
+        )
+    ]
+
+    report = {
+        "exercises": exercises,
+        "groups": crawls,
+        "pages": sum(crawl["pages"] for crawl in crawls),
+        "not_modified": sum(crawl["not_modified"] for crawl in crawls),
+        "errors": {crawl["muscle_group"]: crawl["error"] for crawl in crawls if crawl["error"]},
+        "stored": 0
+    }
+    if db is not None and exercises:
+        report["stored"] = store_catalog(db, exercises)
+    report["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+def store_catalog(db, exercises: List[Dict[str, Any]]) -> int:
+    """Upsert scraped exercises by normalized name in one statement"""
+    try:
+        from models.database import ScrapedExercise
+        from sqlalchemy.dialects.postgresql import insert
+
+        now = datetime.now()
+        statement = insert(ScrapedExercise).values([
+            {**exercise, "first_seen": now, "last_seen": now} for exercise in exercises
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=["normalized_name"],
+            set_={
+                "name": statement.excluded.name,
+                "equipment": statement.excluded.equipment,
+                "difficulty": statement.excluded.difficulty,
+                "source_url": statement.excluded.source_url,
+                "last_seen": statement.excluded.last_seen
+            }
+        )
+        db.execute(statement)
+        db.commit()
+        invalidate_catalog_library()
+        return len(exercises)
+
+    except Exception as e:
+        print(f"Error storing exercise catalog: {str(e)}")
+        db.rollback()
+        return 0
+
+def build_catalog_layer(exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Arrange catalog exercises in the library format, under a "Catalog" subgroup per muscle group"""
+    layer: Dict[str, Any] = {}
+    for exercise in exercises:
+        muscle_group = LIBRARY_MUSCLE_GROUPS.get(exercise["muscle_group"], exercise["muscle_group"])
+        levels = layer.setdefault(muscle_group, {}).setdefault(
+            CATALOG_SUBGROUP,
+            {"Beginner": {}, "Intermediate": {}, "Advanced": {}}
+        )
+        levels.setdefault(exercise["difficulty"], {}).setdefault(exercise["equipment"], []).append(exercise["name"])
+    return layer
+
+# Scraped equipment is a keyword guess, so the catalog only reaches users' libraries when enabled
+CATALOG_LIBRARY_ENABLED = os.getenv("CATALOG_LIBRARY_ENABLED", "0") == "1"
+
+# Shared catalog view; the rows are re-read after a sync or once the refresh interval
+# has passed, but the view is only replaced when they changed
+CATALOG_REFRESH_SECONDS = 600
+_catalog_lock = threading.Lock()
+_catalog_view: Optional[Tuple[Any, Tuple[Tuple[str, str, str, str], ...], Any, float]] = None
+
+def invalidate_catalog_library() -> None:
+    """Re-read the catalog rows on next use"""
+    global _catalog_view
+    with _catalog_lock:
+        if _catalog_view is not None:
+            _catalog_view = _catalog_view[:3] + (float("-inf"),)
+
+def layerable_catalog_exercises(exercises: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Catalog exercises whose equipment came from a keyword in the name rather than the default"""
+    from utils.exercise_scraper import EQUIPMENT_MATCHER
+
+    matched = EQUIPMENT_MATCHER.indices_containing([exercise["name"] for exercise in exercises])
+    return [exercise for index, exercise in enumerate(exercises) if index in matched]
+
+def get_catalog_library(db, standard_library: Dict[str, Any]):
+    """The standard library with the scraped catalog layered over it (the standard library itself if disabled or empty)"""
+    global _catalog_view
+    if not CATALOG_LIBRARY_ENABLED:
+        return standard_library
+    from utils.custom_exercises import LayeredExerciseLibrary
+
+    with _catalog_lock:
+        cached = _catalog_view
+    if cached is not None and cached[0] is not standard_library:
+        cached = None
+    if cached is not None and time.monotonic() - cached[3] < CATALOG_REFRESH_SECONDS:
+        return cached[2]
+
+    try:
+        from models.database import ScrapedExercise
+
+        rows = tuple(
+            tuple(row) for row in db.query(
+                ScrapedExercise.name,
+                ScrapedExercise.muscle_group,
+                ScrapedExercise.equipment,
+                ScrapedExercise.difficulty
+            ).order_by(ScrapedExercise.id).all()
+        )
+    except Exception as e:
+        print(f"Error loading exercise catalog: {str(e)}")
+        return cached[2] if cached is not None else standard_library
+
+    if cached is not None and cached[1] == rows:
+        # Same catalog: keep the view, so caches keyed on it stay valid
+        library = cached[2]
+    else:
+        exercises = layerable_catalog_exercises([
+            {"name": name, "muscle_group": muscle_group, "equipment": equipment, "difficulty": difficulty}
+            for name, muscle_group, equipment, difficulty in rows
+        ])
+        library = LayeredExerciseLibrary(standard_library, build_catalog_layer(exercises)) if exercises else standard_library
+    with _catalog_lock:
+        _catalog_view = (standard_library, rows, library, time.monotonic())
+    return library
+
+def main():
+    from models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = sync_catalog(db)
+        print(
+            f"Synced {len(report['exercises'])} exercises from {report['pages']} pages "
+            f"({report['not_modified']} not modified) in {report['elapsed_seconds']}s"
+        )
+        for muscle_group, error in report["errors"].items():
+            print(f"Error syncing {muscle_group}: {error}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
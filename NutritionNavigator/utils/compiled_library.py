@@ -0,0 +1,160 @@
+import random
+import zlib
+from collections import OrderedDict
+from itertools import combinations
+from typing import Dict, List, Any, Optional, Tuple, FrozenSet, NamedTuple, Iterable
+
+class ExercisePool(NamedTuple):
+    """Exercises available for one (muscle, subgroup, level, equipment-combination)"""
+    ids: Tuple[int, ...]
+    mask: int
+
+EMPTY_POOL = ExercisePool((), 0)
+
+class CompiledExerciseLibrary:
+    """Integer-indexed form of the nested exercise library.
+
+    Every exercise name is interned to an ID, and the de-duplicated pool for each
+    (muscle, subgroup, level, equipment combination) is precomputed as a tuple of
+    IDs plus a bitmask, so used-exercise tracking is a bitset per tracker key.
+    """
+
+    def __init__(self, library: Dict[str, Any], base: Optional["CompiledExerciseLibrary"] = None):
+        # IDs from a base library are kept, so layers on top only append new IDs
+        self.names: List[str] = list(base.names) if base else []
+        self.ids: Dict[str, int] = dict(base.ids) if base else {}
+        self.base_size = len(self.names)
+        self.base_fingerprint = base.fingerprint if base else None
+        self.subgroups: Dict[str, Tuple[str, ...]] = {}
+        self._levels: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._equipment: Dict[Tuple[str, str, str], FrozenSet[str]] = {}
+        self._pools: Dict[Tuple[str, str, str, FrozenSet[str]], ExercisePool] = {}
+        self._fingerprint: Optional[str] = None
+
+        for muscle_group, subgroups in library.items():
+            self.subgroups[muscle_group] = tuple(subgroups)
+            for subgroup, levels in subgroups.items():
+                self._levels[(muscle_group, subgroup)] = tuple(levels)
+                for level, equipment_map in levels.items():
+                    equipment_ids = {
+                        equip: tuple(self._intern(name) for name in names)
+                        for equip, names in equipment_map.items()
+                        if names
+                    }
+                    self._equipment[(muscle_group, subgroup, level)] = frozenset(equipment_ids)
+                    self._compile_pools(muscle_group, subgroup, level, equipment_ids)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the ID assignment, so persisted bitsets can be checked against it"""
+        if self._fingerprint is None:
+            checksum = zlib.crc32("\n".join(self.names).encode())
+            self._fingerprint = f"{len(self.names)}-{checksum:08x}"
+        return self._fingerprint
+
+    def _intern(self, name: str) -> int:
+        exercise_id = self.ids.get(name)
+        if exercise_id is None:
+            exercise_id = len(self.names)
+            self.ids[name] = exercise_id
+            self.names.append(name)
+        return exercise_id
+
+    def _compile_pools(self, muscle_group: str, subgroup: str, level: str, equipment_ids: Dict[str, Tuple[int, ...]]):
+        equipment_types = list(equipment_ids)
+        for size in range(1, len(equipment_types) + 1):
+            for combination in combinations(equipment_types, size):
+                ids = []
+                mask = 0
+                for equip in combination:
+                    for exercise_id in equipment_ids[equip]:
+                        bit = 1 << exercise_id
+                        if not mask & bit:
+                            mask |= bit
+                            ids.append(exercise_id)
+                self._pools[(muscle_group, subgroup, level, frozenset(combination))] = ExercisePool(tuple(ids), mask)
+
+    def has_level(self, muscle_group: str, subgroup: str, level: str) -> bool:
+        return level in self._levels.get((muscle_group, subgroup), ())
+
+    def pool(self, muscle_group: str, subgroup: str, level: str, equipment: Iterable[str]) -> ExercisePool:
+        """Precomputed pool for the equipment the user has; unknown equipment is ignored"""
+        known = self._equipment.get((muscle_group, subgroup, level))
+        if not known:
+            return EMPTY_POOL
+        key = frozenset(equip for equip in equipment if equip in known)
+        if not key:
+            return EMPTY_POOL
+        return self._pools[(muscle_group, subgroup, level, key)]
+
+    def exercise_names(self, pool: ExercisePool) -> List[str]:
+        return [self.names[exercise_id] for exercise_id in pool.ids]
+
+    def sample(
+        self,
+        pool: ExercisePool,
+        used_mask: int,
+        count: int,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[List[int], int]:
+        """Pick up to count unused IDs from pool; returns the picks and the updated used mask.
+
+        Sampling is by rejection against the bitset, so the cost is O(count) while
+        most of the pool is unused; a dense tracker falls back to scanning the pool.
+        If every exercise in the pool was used, the tracker is reset first.
+        """
+        if not pool.ids or count <= 0:
+            return [], used_mask
+        rng = rng or random
+        available = pool.mask & ~used_mask
+        if not available:
+            available = pool.mask
+            used_mask = 0
+
+        count = min(count, available.bit_count())
+        ids = pool.ids
+        picks = []
+        attempts = 0
+        max_attempts = 4 * count + 8
+        while len(picks) < count and attempts < max_attempts:
+            exercise_id = ids[rng.randrange(len(ids))]
+            bit = 1 << exercise_id
+            if available & bit:
+                picks.append(exercise_id)
+                available &= ~bit
+            attempts += 1
+
+        if len(picks) < count:
+            remaining = [exercise_id for exercise_id in ids if available >> exercise_id & 1]
+            picks.extend(rng.sample(remaining, count - len(picks)))
+
+        for exercise_id in picks:
+            used_mask |= 1 << exercise_id
+        return picks, used_mask
+
+# Compiled forms keyed by the identity of the source dictionary
+_COMPILED_CACHE_SIZE = 32
+_compiled_cache: "OrderedDict[int, Tuple[Dict[str, Any], CompiledExerciseLibrary]]" = OrderedDict()
+
+def get_compiled_library(library: Dict[str, Any]) -> CompiledExerciseLibrary:
+    """Compile a library once and reuse it for as long as the same object is passed in"""
+    if isinstance(library, CompiledExerciseLibrary):
+        return library
+    # Layered views compile themselves and keep the result on the view
+    get_compiled = getattr(library, "get_compiled", None)
+    if get_compiled is not None:
+        return get_compiled()
+    key = id(library)
+    cached = _compiled_cache.get(key)
+    if cached is not None and cached[0] is library:
+        _compiled_cache.move_to_end(key)
+        return cached[1]
+    compiled = CompiledExerciseLibrary(library)
+    _compiled_cache[key] = (library, compiled)
+    if len(_compiled_cache) > _COMPILED_CACHE_SIZE:
+        _compiled_cache.popitem(last=False)
+    return compiled
+
+def clear_compiled_cache() -> None:
+    """Drop every cached compiled library, so the next lookup compiles again"""
+    _compiled_cache.clear()
@@ -0,0 +1,61 @@
+# One-off migration for the custom_exercises (user_id, name) unique index that
+# init_db creates: lists duplicates from before the index and deletes all but the
+# oldest of each. It connects on its own, since importing models.database runs init_db.
+#
+#   python -m utils.custom_exercise_dedupe --dry-run
+#   python -m utils.custom_exercise_dedupe --backup duplicates.json
+import argparse
+import json
+import os
+from typing import Dict, List, Any
+from sqlalchemy import bindparam, create_engine, text
+
+def find_duplicates(connection) -> List[Dict[str, Any]]:
+    """Every custom exercise after the oldest one with the same user and name"""
+    rows = connection.execute(text("""
+        SELECT id, user_id, name, muscle_group, equipment, difficulty, description, created_at
+        FROM custom_exercises
+        ORDER BY id
+    """)).mappings().all()
+    seen = set()
+    duplicates = []
+    for row in rows:
+        key = (row["user_id"], row["name"])
+        if key in seen:
+            duplicates.append({**row, "created_at": str(row["created_at"]) if row["created_at"] else None})
+        else:
+            seen.add(key)
+    return duplicates
+
+def delete_duplicates(connection, duplicates: List[Dict[str, Any]]) -> int:
+    if not duplicates:
+        return 0
+    statement = text("DELETE FROM custom_exercises WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+    return connection.execute(statement, {"ids": [row["id"] for row in duplicates]}).rowcount
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate custom exercises, keeping the oldest of each")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the rows that would be deleted")
+    parser.add_argument("--backup", help="Write the rows to delete to this JSON file first")
+    args = parser.parse_args()
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        raise Exception("DATABASE_URL environment variable is not set")
+
+    engine = create_engine(database_url, connect_args={"sslmode": "require"})
+    with engine.begin() as connection:
+        duplicates = find_duplicates(connection)
+        for row in duplicates:
+            print(f"{'Would delete' if args.dry_run else 'Deleting'} custom exercise {row['id']} "
+                  f"(user {row['user_id']}, {row['name']!r}, created {row['created_at']})")
+        if args.backup:
+            with open(args.backup, "w", encoding="utf-8") as f:
+                json.dump(duplicates, f, indent=1)
+        if args.dry_run:
+            print(f"{len(duplicates)} duplicate custom exercises found")
+        else:
+            print(f"Deleted {delete_duplicates(connection, duplicates)} duplicate custom exercises")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 
-from typing import Dict, List, Any, Optional
+import threading
+from collections import ChainMap, OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Iterator
 from datetime import datetime
 from sqlalchemy.orm import Session
 from models.database import User
+from utils.compiled_library import CompiledExerciseLibrary, get_compiled_library
+from utils.exercise_search import on_custom_exercise_added, on_custom_exercise_deleted
 
 def add_custom_exercise(
     db: Session,
@@ -18,42 +24,46 @@ def add_custom_exercise(
     """
     try:
         from models.database import CustomExercise
-        
-        # Check if exercise already exists for this user
-        existing = (
-            db.query(CustomExercise)
-            .filter(
-                CustomExercise.user_id == user_id,
-                CustomExercise.name == exercise_name
+        from sqlalchemy.dialects.postgresql import insert
+
+        # Single INSERT; the (user_id, name) unique index rejects duplicates
+        statement = (
+            insert(CustomExercise)
+            .values(
+                user_id=user_id,
+                name=exercise_name,
+                muscle_group=muscle_group,
+                equipment=equipment_needed,
+                difficulty=difficulty,
+                description=description,
+                created_at=datetime.now()
             )
-            .first()
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+            .returning(CustomExercise.id)
         )
-        
-        if existing:
+        exercise_id = db.execute(statement).scalar()
+        db.commit()
+
+        if exercise_id is None:
             return {
                 "success": False,
                 "message": "An exercise with this name already exists in your library"
             }
-            
-        # Create new custom exercise
-        new_exercise = CustomExercise(
-            user_id=user_id,
-            name=exercise_name,
-            muscle_group=muscle_group,
-            equipment=equipment_needed,
-            difficulty=difficulty,
-            description=description,
-            created_at=datetime.now()
-        )
-        
-        db.add(new_exercise)
-        db.commit()
-        db.refresh(new_exercise)
-        
+
+        invalidate_user_exercise_library(user_id)
+        on_custom_exercise_added(user_id, {
+            "id": exercise_id,
+            "name": exercise_name,
+            "muscle_group": muscle_group,
+            "equipment": equipment_needed,
+            "difficulty": difficulty,
+            "description": description
+        })
+
         return {
             "success": True,
             "message": "Exercise added successfully",
-            "exercise_id": new_exercise.id
+            "exercise_id": exercise_id
         }
         
     except Exception as e:
@@ -126,6 +136,8 @@ def delete_custom_exercise(
             
         db.delete(exercise)
         db.commit()
+        invalidate_user_exercise_library(user_id)
+        on_custom_exercise_deleted(exercise_id)
         
         return {
             "success": True,
@@ -153,39 +165,103 @@ def format_custom_exercise_for_workout(
         "custom_id": exercise["id"]
     }
 
-def integrate_custom_exercises_with_library(
-    standard_library: Dict[str, Any],
+def build_custom_layer(
     custom_exercises: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
     """
-    Integrate custom exercises into the standard exercise library format
+    Arrange custom exercises in the library format, under a "Custom" subgroup per muscle group
     """
-    enhanced_library = standard_library.copy()
-    
-    # Group custom exercises by muscle group
+    layer: Dict[str, Any] = {}
     for exercise in custom_exercises:
-        muscle_group = exercise["muscle_group"]
-        if muscle_group not in enhanced_library:
-            # Create the muscle group if it doesn't exist
-            enhanced_library[muscle_group] = {}
-            
-        # Use "Custom" as the subgroup for all custom exercises
-        if "Custom" not in enhanced_library[muscle_group]:
-            enhanced_library[muscle_group]["Custom"] = {
-                "Beginner": {},
-                "Intermediate": {},
-                "Advanced": {}
-            }
-            
-        # Add to the appropriate difficulty level
-        difficulty = exercise["difficulty"]
-        equipment = exercise["equipment"]
-        
-        if equipment not in enhanced_library[muscle_group]["Custom"][difficulty]:
-            enhanced_library[muscle_group]["Custom"][difficulty][equipment] = []
-            
-        enhanced_library[muscle_group]["Custom"][difficulty][equipment].append(
-            exercise["name"]
+        levels = layer.setdefault(exercise["muscle_group"], {}).setdefault(
+            "Custom",
+            {"Beginner": {}, "Intermediate": {}, "Advanced": {}}
         )
-    
-    return enhanced_library
+        levels.setdefault(exercise["difficulty"], {}).setdefault(
+            exercise["equipment"], []
+        ).append(exercise["name"])
+    return layer
+
+class LayeredExerciseLibrary(Mapping):
+    """
+    Read-only view resolving a per-user custom layer over the standard library.
+
+    Lookups consult the custom layer first and fall back to the standard library,
+    so nothing is copied and the shared standard library is never modified.
+    """
+
+    def __init__(self, standard_library: Dict[str, Any], custom_layer: Dict[str, Any]):
+        self._standard = standard_library
+        self._custom = custom_layer
+        self._compiled = None
+
+    def __getitem__(self, muscle_group: str):
+        custom = self._custom.get(muscle_group)
+        standard = self._standard.get(muscle_group)
+        if custom is None and standard is None:
+            raise KeyError(muscle_group)
+        if custom is None:
+            return MappingProxyType(standard)
+        if standard is None:
+            return MappingProxyType(custom)
+        return MappingProxyType(ChainMap(custom, standard))
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._standard
+        for muscle_group in self._custom:
+            if muscle_group not in self._standard:
+                yield muscle_group
+
+    def __len__(self) -> int:
+        return len(self._standard) + sum(1 for muscle_group in self._custom if muscle_group not in self._standard)
+
+    def get_compiled(self) -> CompiledExerciseLibrary:
+        """Compiled form of the view, keeping the standard library's exercise IDs"""
+        if self._compiled is None:
+            self._compiled = CompiledExerciseLibrary(self, base=get_compiled_library(self._standard))
+        return self._compiled
+
+def integrate_custom_exercises_with_library(
+    standard_library: Dict[str, Any],
+    custom_exercises: List[Dict[str, Any]]
+) -> LayeredExerciseLibrary:
+    """
+    Integrate custom exercises with the standard exercise library without copying or mutating it
+    """
+    if not custom_exercises:
+        return LayeredExerciseLibrary(standard_library, {})
+    return LayeredExerciseLibrary(standard_library, build_custom_layer(custom_exercises))
+
+# Per-user layered libraries, invalidated whenever the user's custom exercises change
+_USER_LIBRARY_CACHE_SIZE = 256
+_user_library_cache: "OrderedDict[int, LayeredExerciseLibrary]" = OrderedDict()
+_user_library_lock = threading.Lock()
+
+def invalidate_user_exercise_library(user_id: int) -> None:
+    """Drop the cached library view for a user"""
+    with _user_library_lock:
+        _user_library_cache.pop(user_id, None)
+
+def get_user_exercise_library(
+    db: Session,
+    user_id: int,
+    standard_library: Dict[str, Any]
+) -> LayeredExerciseLibrary:
+    """
+    Get the user's exercise library (standard plus custom exercises), cached per user
+    """
+    with _user_library_lock:
+        library = _user_library_cache.get(user_id)
+        if library is not None and library._standard is standard_library:
+            _user_library_cache.move_to_end(user_id)
+            return library
+
+    library = integrate_custom_exercises_with_library(
+        standard_library,
+        get_user_custom_exercises(db, user_id)
+    )
+    with _user_library_lock:
+        _user_library_cache[user_id] = library
+        if len(_user_library_cache) > _USER_LIBRARY_CACHE_SIZE:
+            _user_library_cache.popitem(last=False)
+    return library
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from models.database import User, MealPlan
+from models.database import User, MealPlan, add_and_commit
 from typing import Dict, List, Any, Optional
 import json
 from datetime import datetime
+from utils.user_cache import PROFILE_FIELDS, cache_user, invalidate_user
 
 def create_user(
     db: Session,
@@ -27,14 +28,33 @@ def create_user(
             dietary_restrictions=dietary_restrictions,
             cuisine_preferences=cuisine_preferences
         )
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        return db_user
+        return add_and_commit(db, db_user)
     except Exception as e:
         db.rollback()
         raise Exception(f"Error creating user: {str(e)}")
 
+def update_user_profile(
+    db: Session,
+    user_id: int,
+    **profile: Any
+) -> Optional[User]:
+    """Update profile fields for a user and write the result through to the user cache"""
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        for field, value in profile.items():
+            if field not in PROFILE_FIELDS:
+                raise ValueError(f"Not an editable profile field: {field}")
+            setattr(user, field, value)
+        add_and_commit(db, user)
+        cache_user(user)
+        return user
+    except Exception as e:
+        db.rollback()
+        invalidate_user(user_id)
+        raise Exception(f"Error updating user profile: {str(e)}")
+
 def save_meal_plan(
     db: Session,
     user_id: int,
@@ -51,10 +71,7 @@ def save_meal_plan(
             protein=protein,
             date=datetime.now().strftime("%Y-%m-%d")
         )
-        db.add(db_meal_plan)
-        db.commit()
-        db.refresh(db_meal_plan)
-        return db_meal_plan
+        return add_and_commit(db, db_meal_plan)
     except Exception as e:
         db.rollback()
         raise Exception(f"Error saving meal plan: {str(e)}")
@@ -1,31 +1,34 @@
 import trafilatura
 from typing import List, Dict, Any, Optional
 import re
+from utils.keyword_matcher import KeywordMatcher
+from utils.catalog_sync import CATALOG_BASE_URL, CATALOG_PAGES
+from utils.fetch_backend import fetch_url
+
+# Keyword tables, highest priority first; compiled once
+EQUIPMENT_MATCHER = KeywordMatcher([
+    ("Full Gym Access", ["machine", "cable", "smith", "hack"]),
+    ("Dumbbells", ["dumbbell", "db"])
+], default="None/Bodyweight")
+
+DIFFICULTY_MATCHER = KeywordMatcher([
+    ("Advanced", ["weighted", "advanced", "complex", "one-arm", "planche"]),
+    ("Beginner", ["basic", "assisted", "beginner", "modified"])
+], default="Intermediate")
 
 def scrape_muscleandstrength_exercises(muscle_group: str) -> List[Dict[str, Any]]:
     """
     Scrape exercises from muscleandstrength.com for a specific muscle group
     """
-    base_urls = {
-        "Chest": "https://www.muscleandstrength.com/exercises/chest",
-        "Back": "https://www.muscleandstrength.com/exercises/back",
-        "Legs": "https://www.muscleandstrength.com/exercises/legs",
-        "Shoulders": "https://www.muscleandstrength.com/exercises/shoulders",
-        "Biceps": "https://www.muscleandstrength.com/exercises/biceps",
-        "Triceps": "https://www.muscleandstrength.com/exercises/triceps",
-        "Core": "https://www.muscleandstrength.com/exercises/abs",
-        "Forearms": "https://www.muscleandstrength.com/exercises/forearms"
-    }
-    
-    if muscle_group not in base_urls:
+    if muscle_group not in CATALOG_PAGES:
         return []
         
     try:
-        url = base_urls[muscle_group]
+        url = CATALOG_BASE_URL + CATALOG_PAGES[muscle_group]
         print(f"Scraping exercises for {muscle_group} from {url}")
         
         # Download and extract content
-        downloaded = trafilatura.fetch_url(url)
+        downloaded = fetch_url(url)
         if not downloaded:
             return []
             
@@ -38,18 +41,15 @@ def scrape_muscleandstrength_exercises(muscle_group: str) -> List[Dict[str, Any]
         exercises = re.findall(exercise_pattern, text)
         
         # Process and categorize exercises
-        processed_exercises = []
-        for _, exercise_name in exercises:
-            exercise_name = exercise_name.strip()
-            if exercise_name:
-                # Categorize based on equipment needed
-                equipment_category = categorize_exercise(exercise_name)
-                
-                processed_exercises.append({
-                    "name": exercise_name,
-                    "equipment": equipment_category,
-                    "muscle_group": muscle_group
-                })
+        exercise_names = [name.strip() for _, name in exercises if name.strip()]
+        processed_exercises = [
+            {
+                "name": exercise_name,
+                "equipment": equipment_category,
+                "muscle_group": muscle_group
+            }
+            for exercise_name, equipment_category in zip(exercise_names, categorize_exercises(exercise_names))
+        ]
         
         print(f"Found {len(processed_exercises)} exercises for {muscle_group}")
         return processed_exercises
@@ -62,27 +62,22 @@ def categorize_exercise(exercise_name: str) -> str:
     """
     Categorize exercise based on its name to determine equipment needed
     """
-    exercise_lower = exercise_name.lower()
-    
-    # Equipment keywords
-    if any(keyword in exercise_lower for keyword in ["machine", "cable", "smith", "hack"]):
-        return "Full Gym Access"
-    elif any(keyword in exercise_lower for keyword in ["dumbbell", "db"]):
-        return "Dumbbells"
-    else:
-        return "None/Bodyweight"
+    return EQUIPMENT_MATCHER.match(exercise_name)
+
+def categorize_exercises(exercise_names: List[str]) -> List[str]:
+    """
+    Equipment category for each exercise name
+    """
+    return EQUIPMENT_MATCHER.match_many(exercise_names)
 
 def get_exercise_difficulty(exercise_name: str) -> str:
     """
     Determine exercise difficulty based on keywords
     """
-    exercise_lower = exercise_name.lower()
-    
-    # Advanced keywords
-    if any(keyword in exercise_lower for keyword in ["weighted", "advanced", "complex", "one-arm", "planche"]):
-        return "Advanced"
-    # Beginner keywords
-    elif any(keyword in exercise_lower for keyword in ["basic", "assisted", "beginner", "modified"]):
-        return "Beginner"
-    else:
-        return "Intermediate"
+    return DIFFICULTY_MATCHER.match(exercise_name)
+
+def get_exercise_difficulties(exercise_names: List[str]) -> List[str]:
+    """
+    Difficulty for each exercise name
+    """
+    return DIFFICULTY_MATCHER.match_many(exercise_names)
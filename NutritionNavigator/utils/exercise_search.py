@@ -0,0 +1,360 @@
+import heapq
+import random
+import re
+import statistics
+import string
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+# Relevance of a match in each field
+FIELD_WEIGHTS = {
+    "name": 3,
+    "subgroup": 2,
+    "muscle_group": 2,
+    "description": 1
+}
+
+# Prefixes this short match many tokens, so their merged postings and rankings
+# are precomputed on a bulk build and kept up to date on every change
+CACHED_PREFIX_LENGTH = 2
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+class ExerciseSearchIndex:
+    """In-memory inverted index with prefix lookup over exercise names, subgroups and descriptions.
+
+    Prefix matching uses a sorted vocabulary (a flattened trie): the tokens
+    sharing a prefix form one contiguous range found by bisection. Prefixes of
+    up to CACHED_PREFIX_LENGTH characters keep their merged postings and a
+    ranking of the shared (standard library) documents, so a one- or two-letter
+    query reads at most `limit` of them plus the user's own custom exercises.
+    Bulk loads go through add_documents; custom exercises are then added and
+    removed one at a time.
+    """
+
+    def __init__(self):
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._vocabulary: List[str] = []
+        # Custom documents by owning user
+        self._owned: Dict[int, Set[Any]] = {}
+        # prefix -> (best weight per document, ranked shared document ids)
+        self._prefix_cache: Dict[str, Tuple[Dict[Any, int], List[Any]]] = {}
+        self._lock = threading.RLock()
+
+    def add_documents(self, documents: Iterable[Tuple[Any, Dict[str, Any]]]) -> None:
+        """Bulk load: the vocabulary is sorted and the short-prefix rankings rebuilt once"""
+        documents = dict(documents)
+        with self._lock:
+            for doc_id in documents:
+                self.remove_document(doc_id)
+            for doc_id, document in documents.items():
+                self._store(doc_id, document)
+                for token, weight in self._weighted_tokens(document).items():
+                    self._postings.setdefault(token, {})[doc_id] = weight
+            self._vocabulary = sorted(self._postings)
+            self._rebuild_prefixes()
+
+    def add_document(self, doc_id: Any, document: Dict[str, Any]) -> None:
+        with self._lock:
+            if doc_id in self.documents:
+                self.remove_document(doc_id)
+            self._store(doc_id, document)
+            weighted_tokens = self._weighted_tokens(document)
+            for token, weight in weighted_tokens.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    insort(self._vocabulary, token)
+                postings[doc_id] = weight
+            for prefix, weight in self._short_prefixes(weighted_tokens).items():
+                cached = self._prefix_cache.get(prefix)
+                if cached is None:
+                    continue
+                merged, ranked = cached
+                merged[doc_id] = weight
+                if document.get("user_id") is None:
+                    insort(ranked, doc_id, key=self._rank_key(merged))
+
+    def remove_document(self, doc_id: Any) -> None:
+        with self._lock:
+            document = self.documents.get(doc_id)
+            if document is None:
+                return
+            weighted_tokens = self._weighted_tokens(document)
+            for prefix in self._short_prefixes(weighted_tokens):
+                cached = self._prefix_cache.get(prefix)
+                if cached is None:
+                    continue
+                merged, ranked = cached
+                if document.get("user_id") is None:
+                    rank_key = self._rank_key(merged)
+                    position = bisect_left(ranked, rank_key(doc_id), key=rank_key)
+                    while ranked[position] != doc_id:
+                        position += 1
+                    del ranked[position]
+                del merged[doc_id]
+                if not merged:
+                    del self._prefix_cache[prefix]
+            del self.documents[doc_id]
+            if document.get("user_id") is not None:
+                self._owned[document["user_id"]].discard(doc_id)
+            for token in weighted_tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _store(self, doc_id: Any, document: Dict[str, Any]) -> None:
+        self.documents[doc_id] = document
+        if document.get("user_id") is not None:
+            self._owned.setdefault(document["user_id"], set()).add(doc_id)
+
+    def _weighted_tokens(self, document: Dict[str, Any]) -> Dict[str, int]:
+        weights: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(document.get(field)):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+        return weights
+
+    def _short_prefixes(self, weighted_tokens: Dict[str, int]) -> Dict[str, int]:
+        """Best weight under each cached-length prefix of the given tokens"""
+        weights: Dict[str, int] = {}
+        for token, weight in weighted_tokens.items():
+            for length in range(1, min(len(token), CACHED_PREFIX_LENGTH) + 1):
+                if weights.get(token[:length], 0) < weight:
+                    weights[token[:length]] = weight
+        return weights
+
+    def _rank_key(self, merged: Dict[Any, int]):
+        return lambda doc_id: (-merged[doc_id], self.documents[doc_id]["name"])
+
+    def _rank(self, merged: Dict[Any, int]) -> List[Any]:
+        shared = [doc_id for doc_id in merged if self.documents[doc_id].get("user_id") is None]
+        shared.sort(key=self._rank_key(merged))
+        return shared
+
+    def _merge_range(self, prefix: str) -> Dict[Any, int]:
+        merged: Dict[Any, int] = {}
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            for doc_id, weight in self._postings[vocabulary[position]].items():
+                if merged.get(doc_id, 0) < weight:
+                    merged[doc_id] = weight
+            position += 1
+        return merged
+
+    def _rebuild_prefixes(self) -> None:
+        # Order shared documents by name once; each prefix then needs two C-keyed stable sorts
+        shared = sorted(
+            (doc_id for doc_id, document in self.documents.items() if document.get("user_id") is None),
+            key=lambda doc_id: self.documents[doc_id]["name"]
+        )
+        name_rank = {doc_id: position for position, doc_id in enumerate(shared)}
+        self._prefix_cache = {}
+        for prefix in {token[:length] for token in self._postings for length in range(1, CACHED_PREFIX_LENGTH + 1)}:
+            merged = self._merge_range(prefix)
+            ranked = [doc_id for doc_id in merged if doc_id in name_rank]
+            ranked.sort(key=name_rank.__getitem__)
+            ranked.sort(key=merged.__getitem__, reverse=True)
+            self._prefix_cache[prefix] = (merged, ranked)
+
+    def _prefix_postings(self, prefix: str) -> Tuple[Dict[Any, int], Optional[List[Any]]]:
+        """Documents matching a token prefix with their best weight, plus the shared ranking for short prefixes"""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+        merged = self._merge_range(prefix)
+        if len(prefix) > CACHED_PREFIX_LENGTH:
+            return merged, None
+        ranked = self._rank(merged)
+        if merged:
+            self._prefix_cache[prefix] = (merged, ranked)
+        return merged, ranked
+
+    def _visible(self, doc_id: Any, user_id: Optional[int]) -> bool:
+        owner = self.documents[doc_id].get("user_id")
+        return owner is None or owner == user_id
+
+    def search(self, query: str, limit: int = 10, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Type-ahead search: every query token must match as a word prefix.
+
+        Custom exercises are only returned for their owner (user_id).
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            matches = [self._prefix_postings(token) for token in tokens]
+
+            # A single short prefix merges its shared ranking with the user's own matches
+            if len(matches) == 1 and matches[0][1] is not None:
+                merged, ranked = matches[0]
+                rank_key = self._rank_key(merged)
+                owned = sorted((doc_id for doc_id in self._owned.get(user_id, ()) if doc_id in merged), key=rank_key)
+                top = islice(heapq.merge(ranked, owned, key=rank_key), limit)
+                return [self.documents[doc_id] for doc_id in top]
+
+            # Intersect starting from the smallest postings
+            postings_lists = sorted((postings for postings, _ in matches), key=len)
+            smallest, rest = postings_lists[0], postings_lists[1:]
+
+            scored: List[Tuple[int, str, Any]] = []
+            for doc_id, weight in smallest.items():
+                score = weight
+                for postings in rest:
+                    other = postings.get(doc_id)
+                    if other is None:
+                        break
+                    score += other
+                else:
+                    if self._visible(doc_id, user_id):
+                        scored.append((-score, self.documents[doc_id]["name"], doc_id))
+
+            return [self.documents[doc_id] for _, _, doc_id in heapq.nsmallest(limit, scored)]
+
+def index_standard_library(index: ExerciseSearchIndex, library: Dict[str, Any]) -> None:
+    """Index one document per (muscle group, subgroup, exercise name) of the standard library"""
+    documents: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for muscle_group, subgroups in library.items():
+        for subgroup, levels in subgroups.items():
+            for level, equipment_map in levels.items():
+                for equipment, names in equipment_map.items():
+                    for name in names:
+                        document = documents.setdefault((muscle_group, subgroup, name), {
+                            "name": name,
+                            "muscle_group": muscle_group,
+                            "subgroup": subgroup,
+                            "levels": [],
+                            "equipment": [],
+                            "is_custom": False,
+                            "user_id": None
+                        })
+                        if level not in document["levels"]:
+                            document["levels"].append(level)
+                        if equipment not in document["equipment"]:
+                            document["equipment"].append(equipment)
+    index.add_documents((("standard",) + key, document) for key, document in documents.items())
+
+def _custom_document(user_id: int, exercise: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    return ("custom", exercise["id"]), {
+        "name": exercise["name"],
+        "muscle_group": exercise["muscle_group"],
+        "subgroup": "Custom",
+        "description": exercise.get("description"),
+        "levels": [exercise["difficulty"]],
+        "equipment": [exercise["equipment"]],
+        "is_custom": True,
+        "custom_id": exercise["id"],
+        "user_id": user_id
+    }
+
+def index_custom_exercise(index: ExerciseSearchIndex, user_id: int, exercise: Dict[str, Any]) -> None:
+    index.add_document(*_custom_document(user_id, exercise))
+
+_index: Optional[ExerciseSearchIndex] = None
+_index_lock = threading.Lock()
+
+def get_exercise_search_index(db) -> ExerciseSearchIndex:
+    """Process-wide index over the standard library and every custom exercise, built on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from models.database import CustomExercise
+                from utils.workout_planner import get_exercise_library
+
+                index = ExerciseSearchIndex()
+                index_standard_library(index, get_exercise_library())
+                index.add_documents(
+                    _custom_document(row.user_id, {
+                        "id": row.id,
+                        "name": row.name,
+                        "muscle_group": row.muscle_group,
+                        "equipment": row.equipment,
+                        "difficulty": row.difficulty,
+                        "description": row.description
+                    })
+                    for row in db.query(CustomExercise).all()
+                )
+                _index = index
+    return _index
+
+def on_custom_exercise_added(user_id: int, exercise: Dict[str, Any]) -> None:
+    """Keep an already-built index in step with a new custom exercise"""
+    if _index is not None:
+        index_custom_exercise(_index, user_id, exercise)
+
+def on_custom_exercise_deleted(exercise_id: int) -> None:
+    if _index is not None:
+        _index.remove_document(("custom", exercise_id))
+
+def _synthetic_custom_exercises(count: int, users: int, seed: int) -> List[Tuple[Any, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(30000)]
+    return [
+        _custom_document(rng.randrange(users), {
+            "id": exercise_id,
+            "name": " ".join(rng.sample(words, 3)),
+            "muscle_group": rng.choice(("Chest", "Back", "Legs", "Shoulders", "Arms", "Core")),
+            "equipment": rng.choice(("Bodyweight", "Dumbbells", "Barbell")),
+            "difficulty": rng.choice(("Beginner", "Intermediate", "Advanced")),
+            "description": " ".join(rng.sample(words, 8))
+        })
+        for exercise_id in range(count)
+    ]
+
+def benchmark_search(docs: int = 50000, users: int = 100, limit: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """Build time and first-hit latency of one- and two-character prefixes on synthetic custom exercises"""
+    documents = _synthetic_custom_exercises(docs, users, seed)
+    index = ExerciseSearchIndex()
+    start = time.perf_counter()
+    index.add_documents(documents)
+    build_seconds = time.perf_counter() - start
+
+    prefixes = list(string.ascii_lowercase) + [a + b for a in "etaoinsr" for b in "etaoinsr"]
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.search(prefix, limit, user_id=0)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    # A keystroke right after an add reads the prefix entries the add just updated
+    start = time.perf_counter()
+    index_custom_exercise(index, 0, {
+        "id": docs, "name": "bench press", "muscle_group": "Chest",
+        "equipment": "Barbell", "difficulty": "Beginner", "description": None
+    })
+    index.search("b", limit, user_id=0)
+    add_then_search_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "documents": docs,
+        "build_seconds": round(build_seconds, 2),
+        "prefix_median_ms": round(statistics.median(timings), 3),
+        "prefix_p95_ms": round(timings[int(len(timings) * 0.95)], 3),
+        "add_then_search_ms": round(add_then_search_ms, 3)
+    }
+
+def main():
+    result = benchmark_search()
+    print(
+        f"{result['documents']} documents built in {result['build_seconds']} s; "
+        f"short prefix median {result['prefix_median_ms']} ms, p95 {result['prefix_p95_ms']} ms; "
+        f"add then search {result['add_then_search_ms']} ms"
+    )
+
+if __name__ == "__main__":
+    main()
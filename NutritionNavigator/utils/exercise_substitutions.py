@@ -0,0 +1,201 @@
+import copy
+import re
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+# Implements and loading modifiers: names differing only in these are treated
+# as variants of one movement. Generic training words ("advanced", "drop set",
+# "complex") stay in the key, or unrelated exercises would collapse together.
+VARIANT_WORDS = {
+    "barbell", "dumbbell", "dumbbells", "cable", "machine", "smith", "kettlebell",
+    "weighted", "assisted", "single", "arm", "one", "alternating", "tempo", "pause", "paused"
+}
+
+_SCHEDULE_ENTRY = re.compile(r"^(?P<subgroup>[^:(]+?)(?:\s*\((?P<level>[^)]+)\))?:\s*(?P<name>.+)$")
+
+def variant_key(name: str) -> str:
+    """Normalize an exercise name to the movement it describes"""
+    words = re.findall(r"[a-z]+", re.sub(r"\([^)]*\)", " ", name.lower()))
+    core = [word for word in words if word not in VARIANT_WORDS]
+    return " ".join(core or words)
+
+def parse_schedule_entry(entry: str) -> Optional[Tuple[str, Optional[str], str]]:
+    """Split a schedule entry like "Upper Chest (Beginner): Incline Push-ups" into its parts"""
+    match = _SCHEDULE_ENTRY.match(entry)
+    if not match:
+        return None
+    return match.group("subgroup").strip(), match.group("level"), match.group("name").strip()
+
+class SubstitutionGraph:
+    """Exercise substitution graph built once from an exercise library.
+
+    Nodes are (muscle group, subgroup, exercise name). Each node links to every
+    exercise of the same subgroup (across equipment and levels) and to same-name
+    variants in the other subgroups of its muscle group. Neighbours are
+    precomputed per equipment type, best substitutes first, so a neighbour query
+    is a dictionary lookup.
+    """
+
+    def __init__(self, library: Dict[str, Any]):
+        self.nodes: List[Tuple[str, str, str]] = []
+        self.placements: List[Dict[str, set]] = []  # equipment -> levels, per node
+        self._node_ids: Dict[Tuple[str, str, str], int] = {}
+        self._by_subgroup_name: Dict[Tuple[str, str], int] = {}
+        self._neighbours: List[Dict[str, Tuple[int, ...]]] = []
+
+        for muscle_group, subgroups in library.items():
+            for subgroup, levels in subgroups.items():
+                for level, equipment_map in levels.items():
+                    for equipment, names in equipment_map.items():
+                        for name in names:
+                            node = self._add_node(muscle_group, subgroup, name)
+                            self.placements[node].setdefault(equipment, set()).add(level)
+
+        self._build_edges()
+
+    def _add_node(self, muscle_group: str, subgroup: str, name: str) -> int:
+        key = (muscle_group, subgroup, name)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self.nodes.append(key)
+            self.placements.append({})
+            self._node_ids[key] = node
+            self._by_subgroup_name.setdefault((subgroup, name), node)
+        return node
+
+    def _build_edges(self):
+        by_subgroup: Dict[Tuple[str, str], List[int]] = {}
+        by_variant: Dict[Tuple[str, str], List[int]] = {}
+        keys = [variant_key(name) for _, _, name in self.nodes]
+        for node, (muscle_group, subgroup, name) in enumerate(self.nodes):
+            by_subgroup.setdefault((muscle_group, subgroup), []).append(node)
+            by_variant.setdefault((muscle_group, keys[node]), []).append(node)
+
+        for node, (muscle_group, subgroup, _) in enumerate(self.nodes):
+            levels = set().union(*self.placements[node].values())
+            same_subgroup = [other for other in by_subgroup[(muscle_group, subgroup)] if other != node]
+            variants = [
+                other for other in by_variant[(muscle_group, keys[node])]
+                if self.nodes[other][1] != subgroup
+            ]
+            variant_set = set(variants)
+
+            # Rank: same subgroup first, variants within it ahead; shared levels break ties
+            ranked = sorted(
+                same_subgroup + variants,
+                key=lambda other: (
+                    other in variant_set,
+                    keys[other] != keys[node],
+                    -len(levels & set().union(*self.placements[other].values()))
+                )
+            )
+            neighbours: Dict[str, List[int]] = {}
+            for other in ranked:
+                for equipment in self.placements[other]:
+                    neighbours.setdefault(equipment, []).append(other)
+            self._neighbours.append({equipment: tuple(nodes) for equipment, nodes in neighbours.items()})
+
+    def find(self, name: str, subgroup: Optional[str] = None, muscle_group: Optional[str] = None) -> Optional[int]:
+        if muscle_group and subgroup:
+            return self._node_ids.get((muscle_group, subgroup, name))
+        if subgroup:
+            return self._by_subgroup_name.get((subgroup, name))
+        for node, key in enumerate(self.nodes):
+            if key[2] == name:
+                return node
+        return None
+
+    def neighbours(self, node: int, equipment: str) -> Tuple[int, ...]:
+        """Substitutes for node that can be done with the given equipment, best first"""
+        return self._neighbours[node].get(equipment, ())
+
+    def needs_only(self, node: int, unavailable: Iterable[str]) -> bool:
+        """True if every way to do the exercise needs unavailable equipment"""
+        return set(self.placements[node]) <= set(unavailable)
+
+    def substitutes(
+        self,
+        name: str,
+        available_equipment: Iterable[str],
+        subgroup: Optional[str] = None,
+        level: Optional[str] = None,
+        limit: int = 5
+    ) -> List[str]:
+        """Names of substitutes doable with the available equipment, only at `level` when one is given"""
+        node = self.find(name, subgroup)
+        if node is None:
+            return []
+        results = []
+        for other in self._candidates(node, available_equipment, level):
+            results.append(self.nodes[other][2])
+            if len(results) == limit:
+                break
+        return results
+
+    def _candidates(self, node: int, available_equipment: Iterable[str], level: Optional[str]):
+        candidates = []
+        seen = set()
+        for equipment in available_equipment:
+            for other in self.neighbours(node, equipment):
+                # With a level, the substitute must be listed at it for this equipment
+                if other not in seen and (not level or level in self.placements[other][equipment]):
+                    seen.add(other)
+                    candidates.append(other)
+        return candidates
+
+    def swap_schedule(
+        self,
+        schedule: Dict[str, Any],
+        unavailable: Iterable[str] = ("Full Gym Access",),
+        available_equipment: Iterable[str] = ("None/Bodyweight", "Dumbbells"),
+        level: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+        """Replace every exercise that needs only unavailable equipment.
+
+        Returns the new schedule (the input is not modified) and the swaps made.
+        Exercises without a substitute at the same level are left in place.
+        """
+        unavailable = tuple(unavailable)
+        available_equipment = tuple(available_equipment)
+        new_schedule = copy.deepcopy(schedule)
+        swaps = []
+        for day, workout in new_schedule.items():
+            exercises = workout.get("exercises", [])
+            in_use = set(exercises)
+            for position, entry in enumerate(exercises):
+                parsed = parse_schedule_entry(entry) if isinstance(entry, str) else None
+                if not parsed:
+                    continue
+                subgroup, entry_level, name = parsed
+                node = self.find(name, subgroup)
+                if node is None or not self.needs_only(node, unavailable):
+                    continue
+                for other in self._candidates(node, available_equipment, entry_level or level):
+                    # A variant from another subgroup is filed under its own subgroup
+                    _, other_subgroup, other_name = self.nodes[other]
+                    prefix = f"{other_subgroup} ({entry_level})" if entry_level else other_subgroup
+                    replacement = f"{prefix}: {other_name}"
+                    if replacement not in in_use:
+                        exercises[position] = replacement
+                        in_use.add(replacement)
+                        swaps.append({"day": day, "from": entry, "to": replacement})
+                        break
+        return new_schedule, swaps
+
+# Graphs keyed by the identity of the source library
+_GRAPH_CACHE_SIZE = 32
+_graph_cache: "OrderedDict[int, Tuple[Any, SubstitutionGraph]]" = OrderedDict()
+
+def get_substitution_graph(library: Dict[str, Any]) -> SubstitutionGraph:
+    """Build the graph for a library once and reuse it while the same library object is passed in"""
+    key = id(library)
+    cached = _graph_cache.get(key)
+    if cached is not None and cached[0] is library:
+        _graph_cache.move_to_end(key)
+        return cached[1]
+    graph = SubstitutionGraph(library)
+    _graph_cache[key] = (library, graph)
+    if len(_graph_cache) > _GRAPH_CACHE_SIZE:
+        _graph_cache.popitem(last=False)
+    return graph
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Any, Optional, NamedTuple, Tuple
+
+FETCH_MODES = ("live", "record", "replay")
+REQUEST_TIMEOUT = 30
+USER_AGENT = "Mozilla/5.0 (compatible; FitnessMoses/1.0)"
+FETCH_FIXTURES_DIR = os.getenv(
+    "FETCH_FIXTURES_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "http")
+)
+
+# Per-request latency as (mean ms, standard deviation ms)
+NETWORK_PROFILES = {
+    "none": (0, 0),
+    "datacenter": (15, 5),
+    "broadband": (80, 30),
+    "mobile": (250, 100),
+    "3g": (600, 250)
+}
+
+# Response headers kept in fixtures
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_CHARSET = re.compile(r"charset=([\w-]+)", re.IGNORECASE)
+
+class FixtureNotFound(Exception):
+    """Replay mode was asked for a URL that was never recorded"""
+
+def _header(headers, name: str) -> Optional[str]:
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+class FetchResponse(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def header(self, name: str) -> Optional[str]:
+        return _header(self.headers, name)
+
+    @property
+    def text(self) -> str:
+        match = _CHARSET.search(self.header("Content-Type") or "")
+        encoding = match.group(1) if match else "utf-8"
+        try:
+            return self.body.decode(encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+class LiveBackend:
+    """Fetches over the network; HTTP error statuses are returned, connection failures raised"""
+
+    def __init__(self, timeout: int = REQUEST_TIMEOUT, user_agent: str = USER_AGENT):
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        request = urllib.request.Request(url, headers={"User-Agent": self.user_agent, **(headers or {})})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return FetchResponse(url, response.status, dict(response.headers), response.read())
+        except urllib.error.HTTPError as e:
+            return FetchResponse(url, e.code, dict(e.headers or {}), e.read() if e.code != 304 else b"")
+
+class FixtureStore:
+    """Recorded responses on disk: metadata as JSON next to the raw body, keyed by URL hash"""
+
+    def __init__(self, directory: str = FETCH_FIXTURES_DIR):
+        self.directory = directory
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + suffix)
+
+    def load(self, url: str) -> Optional[FetchResponse]:
+        try:
+            with open(self._path(url, ".json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(url, ".body"), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return FetchResponse(url, meta["status"], meta["headers"], body)
+
+    def save(self, response: FetchResponse) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {
+            "url": response.url,
+            "status": response.status,
+            "headers": {
+                name: value for name in RECORDED_HEADERS
+                if (value := _header(response.headers, name)) is not None
+            }
+        }
+        for suffix, data in ((".body", response.body), (".json", json.dumps(meta, indent=1).encode())):
+            path = self._path(response.url, suffix)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+
+class RecordingBackend:
+    """Fetches live and writes every full response to the fixture store"""
+
+    def __init__(self, store: FixtureStore, live: Optional[LiveBackend] = None):
+        self.store = store
+        self.live = live or LiveBackend()
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        response = self.live.fetch(url, headers)
+        # A 304 has no body; keep the earlier recording of the page
+        if response.status != 304:
+            self.store.save(response)
+        return response
+
+class ReplayBackend:
+    """Serves recorded responses only, answering conditional requests the way the server did"""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        recorded = self.store.load(url)
+        if recorded is None:
+            raise FixtureNotFound(f"No recorded response for {url} in {self.store.directory}")
+        etag = recorded.header("ETag")
+        last_modified = recorded.header("Last-Modified")
+        if (etag and _header(headers, "If-None-Match") == etag) or (
+            last_modified and _header(headers, "If-Modified-Since") == last_modified
+        ):
+            return FetchResponse(url, 304, recorded.headers, b"")
+        return recorded
+
+class LatencyBackend:
+    """Adds a sampled delay to every request of the wrapped backend"""
+
+    def __init__(self, backend, mean_ms: float, jitter_ms: float = 0, seed: Any = None):
+        self.backend = backend
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.mean_ms, self.jitter_ms)) if self.jitter_ms else self.mean_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return self.backend.fetch(url, headers)
+
+def parse_latency(latency: Optional[str]) -> Tuple[float, float]:
+    """(mean ms, jitter ms) from a profile name or "mean" / "mean:jitter" in milliseconds"""
+    if not latency:
+        return NETWORK_PROFILES["none"]
+    if latency in NETWORK_PROFILES:
+        return NETWORK_PROFILES[latency]
+    mean, _, jitter = latency.partition(":")
+    return float(mean), float(jitter or 0)
+
+def create_fetch_backend(
+    mode: Optional[str] = None,
+    fixtures_dir: Optional[str] = None,
+    latency: Optional[str] = None,
+    seed: Any = None
+):
+    """Backend for a mode (default FETCH_MODE, else live), optionally with injected latency (FETCH_LATENCY)"""
+    mode = mode or os.getenv("FETCH_MODE", "live")
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode {mode!r}; expected one of {', '.join(FETCH_MODES)}")
+    store = FixtureStore(fixtures_dir or FETCH_FIXTURES_DIR)
+    if mode == "record":
+        backend = RecordingBackend(store)
+    elif mode == "replay":
+        backend = ReplayBackend(store)
+    else:
+        backend = LiveBackend()
+
+    mean_ms, jitter_ms = parse_latency(latency if latency is not None else os.getenv("FETCH_LATENCY"))
+    if mean_ms > 0 or jitter_ms > 0:
+        backend = LatencyBackend(backend, mean_ms, jitter_ms, seed)
+    return backend
+
+# Process-wide backend, created from the environment on first use
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_fetch_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_fetch_backend()
+    return _backend
+
+def set_fetch_backend(backend):
+    """Install a backend for all network-backed code paths; returns the previous one"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+def fetch_url(url: str) -> Optional[str]:
+    """Page text, or None if it could not be fetched (a drop-in for trafilatura.fetch_url)"""
+    try:
+        response = get_fetch_backend().fetch(url)
+    except FixtureNotFound as e:
+        print(f"Missing fetch fixture: {str(e)}; record it with FETCH_MODE=record")
+        return None
+    except Exception as e:
+        print(f"Error fetching {url}: {str(e)}")
+        return None
+    return response.text if response.status == 200 else None
+
+def fetch_bytes(url: str) -> bytes:
+    """Raw page body; raises on connection failures, non-200 statuses and missing replay fixtures"""
+    response = get_fetch_backend().fetch(url)
+    if response.status != 200:
+        raise IOError(f"HTTP {response.status} for {url}")
+    return response.body
@@ -13,7 +13,7 @@ def log_water_intake(
     Log a water intake entry for the user
     """
     try:
-        from models.database import WaterIntake
+        from models.database import WaterIntake, add_and_commit
         
         entry = WaterIntake(
             user_id=user_id,
@@ -21,9 +21,7 @@ def log_water_intake(
             timestamp=timestamp or datetime.now()
         )
         
-        db.add(entry)
-        db.commit()
-        db.refresh(entry)
+        add_and_commit(db, entry)
         
         return {
             "success": True,
@@ -0,0 +1,74 @@
+import copy
+from typing import Dict, List, Any
+
+# Minimal RFC 6902 JSON Patch: the add/remove/replace operations produced by make_patch
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def make_patch(source: Any, target: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Operations that turn source into target.
+
+    Dicts are compared key by key and lists element by element, so changing
+    one exercise in a schedule produces a single replace operation.
+    """
+    if source == target:
+        return []
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in source:
+                operations.append({"op": "add", "path": child, "value": value})
+            else:
+                operations.extend(make_patch(source[key], value, child))
+        return operations
+    if isinstance(source, list) and isinstance(target, list):
+        operations = []
+        shared = min(len(source), len(target))
+        for index in range(shared):
+            operations.extend(make_patch(source[index], target[index], f"{path}/{index}"))
+        # Remove from the end first so earlier indices stay valid
+        for index in range(len(source) - 1, shared - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(shared, len(target)):
+            operations.append({"op": "add", "path": f"{path}/{index}", "value": target[index]})
+        return operations
+    return [{"op": "replace", "path": path, "value": target}]
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """Apply operations to a copy of document and return the result"""
+    document = copy.deepcopy(document)
+    for operation in operations:
+        path = operation["path"]
+        value = copy.deepcopy(operation.get("value"))
+        if path == "":
+            if operation["op"] == "remove":
+                raise ValueError("Cannot remove the document root")
+            document = value
+            continue
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if operation["op"] == "add":
+                parent.insert(index, value)
+            elif operation["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = value
+        else:
+            if operation["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = value
+    return document
@@ -0,0 +1,156 @@
+import random
+import re
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Iterable
+
+class KeywordMatcher:
+    """Priority-ordered substring classifier with one compiled alternation per category.
+
+    categories is a sequence of (label, keywords); a text gets the label of the
+    first category with any keyword occurring in it, else the default. This
+    matches the chained `any(keyword in text ...)` checks it replaces.
+
+    Batch calls join the texts with newlines and run each category's regex over
+    the joined string once, mapping match offsets back to texts, so the scanning
+    happens in the regex engine instead of a Python loop per text and keyword.
+    """
+
+    SEPARATOR = "\n"
+
+    def __init__(
+        self,
+        categories: Sequence[Tuple[str, Sequence[str]]],
+        default: Optional[str] = None,
+        lowercase: bool = True
+    ):
+        self.categories = [(label, tuple(keywords)) for label, keywords in categories]
+        self.labels = [label for label, _ in categories]
+        self.default = default
+        self.lowercase = lowercase
+        self._patterns = [self._compile(keywords) for _, keywords in categories]
+        self._any = self._compile([keyword for _, keywords in categories for keyword in keywords])
+
+    def _compile(self, keywords: Iterable[str]):
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        if any(self.SEPARATOR in keyword for keyword in keywords):
+            raise ValueError("Keywords cannot contain newlines")
+        return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+    def _prepare(self, text: str) -> str:
+        return text.lower() if self.lowercase else text
+
+    def _joined(self, texts: Sequence[str]) -> Tuple[str, List[int]]:
+        """Texts joined by newlines, with the offset each text starts at"""
+        if self.lowercase:
+            texts = [text.lower() for text in texts]
+        starts = [0]
+        starts.extend(accumulate(len(text) + 1 for text in texts[:-1]))
+        return self.SEPARATOR.join(texts), starts
+
+    def match(self, text: str) -> Optional[str]:
+        text = self._prepare(text)
+        for label, pattern in zip(self.labels, self._patterns):
+            if pattern.search(text):
+                return label
+        return self.default
+
+    def match_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        texts = list(texts)
+        results = [self.default] * len(texts)
+        if not texts:
+            return results
+        joined, starts = self._joined(texts)
+        # Lowest priority first, so higher-priority categories overwrite
+        for label, pattern in reversed(list(zip(self.labels, self._patterns))):
+            for found in pattern.finditer(joined):
+                results[bisect_right(starts, found.start()) - 1] = label
+        return results
+
+    def contains_any(self, text: str) -> bool:
+        return self._any.search(self._prepare(text)) is not None
+
+    def indices_containing(self, texts: Sequence[str]) -> Set[int]:
+        """Positions of the texts that contain at least one keyword"""
+        texts = list(texts)
+        if not texts:
+            return set()
+        joined, starts = self._joined(texts)
+        return {bisect_right(starts, found.start()) - 1 for found in self._any.finditer(joined)}
+
+    def count_containing(self, texts: Sequence[str]) -> int:
+        """How many texts contain at least one keyword"""
+        return len(self.indices_containing(texts))
+
+def substring_match(matcher: KeywordMatcher, text: str) -> Optional[str]:
+    """The chained `any(keyword in text ...)` check a matcher replaces; the benchmark baseline"""
+    text = matcher._prepare(text)
+    for label, keywords in matcher.categories:
+        if any(keyword in text for keyword in keywords):
+            return label
+    return matcher.default
+
+# Words synthetic exercise names are drawn from, keywords of every table included
+BENCHMARK_WORDS = (
+    "Incline", "Decline", "Dumbbell", "DB", "Cable", "Machine", "Smith", "Hack", "Press", "Row",
+    "Squat", "Deadlift", "Bench Press", "Pull-up", "Lunge", "Curl", "Fly", "Raise", "Plank",
+    "Weighted", "Assisted", "Basic", "Beginner", "Modified", "Advanced", "One-Arm", "Planche",
+    "Complex", "Band", "Hold", "Walk", "Extension", "Kickback", "Crunch", "Bridge"
+)
+
+def benchmark_matchers(names: int = 50000, workouts: int = 10000, repeats: int = 5, seed: int = 0) -> List[Dict[str, Any]]:
+    """Best-of-repeats milliseconds for the substring loops against the compiled batch matchers"""
+    from utils.exercise_scraper import DIFFICULTY_MATCHER, EQUIPMENT_MATCHER
+    from utils.recovery_recommendations import COMPOUND_MATCHER, _intensity_for, get_workout_intensities
+
+    rng = random.Random(seed)
+    exercise_names = [" ".join(rng.sample(BENCHMARK_WORDS, rng.randint(2, 4))) for _ in range(names)]
+    workout_lists = [rng.sample(exercise_names, rng.randint(3, 8)) for _ in range(workouts)]
+    levels = [rng.choice(("Beginner", "Intermediate", "Advanced")) for _ in range(workouts)]
+
+    def loop_intensities():
+        return [
+            _intensity_for(sum(substring_match(COMPOUND_MATCHER, exercise) is not None for exercise in workout), level)
+            for workout, level in zip(workout_lists, levels)
+        ]
+
+    def best(run: Callable[[], Any]) -> float:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return round(min(timings) * 1000, 1)
+
+    cases = [
+        ("equipment", f"{names} names",
+         lambda: [substring_match(EQUIPMENT_MATCHER, name) for name in exercise_names],
+         lambda: EQUIPMENT_MATCHER.match_many(exercise_names)),
+        ("difficulty", f"{names} names",
+         lambda: [substring_match(DIFFICULTY_MATCHER, name) for name in exercise_names],
+         lambda: DIFFICULTY_MATCHER.match_many(exercise_names)),
+        ("intensity", f"{workouts} workouts",
+         loop_intensities,
+         lambda: get_workout_intensities(workout_lists, levels))
+    ]
+    return [
+        {
+            "table": table,
+            "size": size,
+            "loop_ms": best(loop),
+            "batch_ms": best(batch),
+            "outputs_match": loop() == batch()
+        }
+        for table, size, loop, batch in cases
+    ]
+
+def main():
+    for result in benchmark_matchers():
+        print(
+            f"{result['table']} ({result['size']}): substring loop {result['loop_ms']} ms, "
+            f"compiled batch {result['batch_ms']} ms, outputs match: {result['outputs_match']}"
+        )
+
+if __name__ == "__main__":
+    main()
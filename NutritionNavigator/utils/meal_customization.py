@@ -1,5 +1,6 @@
 from typing import Dict, List, Any, Optional
 from data.food_database import meal_suggestions
+from utils.tracing import tracer
 
 def get_alternative_meals(
     meal_type: str,
@@ -13,8 +14,7 @@ def get_alternative_meals(
     """
     Get alternative meal suggestions based on user preferences and nutritional targets
     """
-    print(f"Searching alternatives for {meal_type}, current meal: {current_meal_name}")  # Debug log
-    print(f"Available meals for {meal_type}: {len(meal_suggestions[meal_type])}")  # Debug log
+    tracer.debug("Searching alternatives for %s, current meal: %s (%d available)", meal_type, current_meal_name, len(meal_suggestions[meal_type]))
 
     suitable_alternatives = [
         meal for meal in meal_suggestions[meal_type]
@@ -25,7 +25,7 @@ def get_alternative_meals(
         and abs(meal['protein'] - target_protein) < 15
     ]
 
-    print(f"Found {len(suitable_alternatives)} suitable alternatives")  # Debug log
+    tracer.debug("Found %d suitable alternatives", len(suitable_alternatives))
     return suitable_alternatives[:num_alternatives]
 
 def validate_meal_plan(
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Hash algorithm and cost; raising the cost makes existing hashes outdated and
+# they are transparently upgraded on the next successful login
+PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'scrypt')
+PASSWORD_HASH_COST = int(os.getenv('PASSWORD_HASH_COST', '32768'))
+
+# hashlib releases the GIL while hashing, so a small thread pool bounds how many
+# cores are spent on hashing without stalling the other Streamlit sessions
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Costs compared by benchmark_logins for each algorithm
+BENCHMARK_COSTS = {
+    'scrypt': (8192, 16384, 32768, 65536),
+    'pbkdf2': (100000, 260000, 600000)
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_hash_method(algorithm: Optional[str] = None, cost: Optional[int] = None) -> str:
+    """Build the werkzeug method string for an algorithm and cost"""
+    algorithm = algorithm or PASSWORD_HASH_ALGORITHM
+    cost = cost or PASSWORD_HASH_COST
+    if algorithm == 'scrypt':
+        return f"scrypt:{cost}:8:1"
+    if algorithm == 'pbkdf2':
+        return f"pbkdf2:sha256:{cost}"
+    raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Concurrent first logins must not each start a pool
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash"
+                )
+    return _executor
+
+def hash_password(password: str, method: Optional[str] = None) -> str:
+    """Hash a password on the hashing pool"""
+    return _get_executor().submit(generate_password_hash, password, method or get_hash_method()).result()
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password against a stored hash on the hashing pool"""
+    if not password_hash:
+        return False
+    return _get_executor().submit(check_password_hash, password_hash, password).result()
+
+def needs_rehash(password_hash: str, method: Optional[str] = None) -> bool:
+    """Whether a stored hash was produced with a different method or cost than configured"""
+    if not password_hash:
+        return False
+    return password_hash.split('$', 1)[0] != (method or get_hash_method())
+
+def benchmark_logins(costs: Optional[Sequence[int]] = None, logins: int = 32, algorithm: Optional[str] = None) -> List[Dict[str, float]]:
+    """Login latency and pool throughput (logins per second per hashing core) at several costs"""
+    algorithm = algorithm or PASSWORD_HASH_ALGORITHM
+    results = []
+    cores = min(PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+    for cost in costs or BENCHMARK_COSTS[algorithm]:
+        password_hash = generate_password_hash("benchmark-password", get_hash_method(algorithm, cost))
+
+        start = time.perf_counter()
+        verify_password(password_hash, "benchmark-password")
+        latency = time.perf_counter() - start
+
+        # A burst of logins, as at the start of a class, all queued on the pool at once
+        start = time.perf_counter()
+        futures = [_get_executor().submit(check_password_hash, password_hash, "benchmark-password") for _ in range(logins)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+
+        results.append({
+            "cost": cost,
+            "latency_ms": round(latency * 1000, 1),
+            "burst_seconds": round(elapsed, 2),
+            "logins_per_second_per_core": round(logins / elapsed / cores, 1)
+        })
+    return results
+
+def main():
+    print(f"{PASSWORD_HASH_ALGORITHM}, {PASSWORD_HASH_WORKERS} hashing workers")
+    for result in benchmark_logins():
+        print(
+            f"cost {result['cost']}: {result['latency_ms']} ms per login, "
+            f"{result['logins_per_second_per_core']} logins/s/core, "
+            f"burst of 32 in {result['burst_seconds']} s"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import copy
+import random
+import re
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from utils.compiled_library import CompiledExerciseLibrary, ExercisePool, get_compiled_library
+from utils.exercise_substitutions import parse_schedule_entry
+from utils.tracing import tracer
+from utils.workout_planner import generate_workout_plan, get_training_guidelines
+
+DEFAULT_GOAL = "General Fitness"
+
+def week_prescription(guideline: Dict[str, Any], week: int, weeks: int, deload_every: int = 4) -> Dict[str, Any]:
+    """Sets, reps and rest for one week of a block.
+
+    Sets climb from the low to the high end of the goal's sets_per_exercise
+    range over each loading phase; every deload_every-th week (never the
+    first) drops back below the starting volume.
+    """
+    set_counts = [int(value) for value in re.findall(r"\d+", str(guideline.get("sets_per_exercise", "")))] or [3]
+    low, high = min(set_counts), max(set_counts)
+    deload = bool(deload_every) and week > 1 and week % deload_every == 0
+    if deload:
+        sets = max(1, low - 1)
+    else:
+        # Position within the current loading phase
+        phase_length = (deload_every - 1) if deload_every else weeks
+        phase_week = (week - 1) % deload_every if deload_every else week - 1
+        span = max(phase_length - 1, 1)
+        sets = low + round((high - low) * min(phase_week, span) / span)
+    return {
+        "sets": sets,
+        "rep_range": guideline.get("rep_range"),
+        "rest_period": guideline.get("rest_period"),
+        "deload": deload
+    }
+
+def _muscle_for_subgroup(compiled: CompiledExerciseLibrary, focus: List[str], subgroup: str) -> Optional[str]:
+    for muscle in focus:
+        if subgroup in compiled.subgroups.get(muscle, ()):
+            return muscle
+    return None
+
+def derive_next_week(
+    compiled: CompiledExerciseLibrary,
+    schedule: Dict[str, Any],
+    fitness_level: str,
+    equipment: List[str],
+    used_exercises_tracker: Dict[str, int],
+    week: int,
+    rotate_per_week: int = 1,
+    rng: Optional[random.Random] = None
+) -> Dict[str, Dict[str, str]]:
+    """Exercise changes for the next week: rotate_per_week slots per day get a fresh exercise.
+
+    The slots rotated move through each day's list week by week, and picks
+    come from the same subgroup pool through the shared rotation tracker.
+    Returns {day: {position: new entry}}; the schedule is not modified.
+    """
+    changes: Dict[str, Dict[str, str]] = {}
+    for day, workout in schedule.items():
+        exercises = workout.get("exercises", [])
+        focus = [muscle.strip() for muscle in workout.get("focus", "").split(",")]
+        if not exercises or workout.get("duration") == 0:
+            continue
+        in_day = set(exercises)
+        for step in range(min(rotate_per_week, len(exercises))):
+            position = ((week - 2) * rotate_per_week + step) % len(exercises)
+            parsed = parse_schedule_entry(exercises[position])
+            if not parsed:
+                continue
+            subgroup, level, name = parsed
+            muscle = _muscle_for_subgroup(compiled, focus, subgroup)
+            if muscle is None:
+                continue
+            pool = compiled.pool(muscle, subgroup, level or fitness_level, equipment)
+            tracker_key = f"{muscle}-{subgroup}"
+            # Never pick an exercise that is already in the day
+            taken = 0
+            for entry in in_day:
+                entry_parts = parse_schedule_entry(entry)
+                if entry_parts and entry_parts[0] == subgroup and entry_parts[2] in compiled.ids:
+                    taken |= 1 << compiled.ids[entry_parts[2]]
+            candidates = pool.mask & ~taken
+            if not candidates:
+                continue
+            used_mask = used_exercises_tracker.get(tracker_key, 0)
+            if not candidates & ~used_mask:
+                # Every other exercise was used this block: restart the rotation
+                used_mask = 0
+            picks, used_mask = compiled.sample(ExercisePool(pool.ids, candidates), used_mask, 1, rng)
+            used_exercises_tracker[tracker_key] = used_mask
+            new_name = compiled.names[picks[0]]
+            entry = exercises[position].split(":", 1)[0] + f": {new_name}"
+            changes.setdefault(day, {})[str(position)] = entry
+            in_day.add(entry)
+    return changes
+
+def apply_week_delta(schedule: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the schedule with one week's delta applied (the input is not modified)"""
+    result = copy.deepcopy(schedule)
+    for day, positions in delta.get("exercises", {}).items():
+        if day in result:
+            for position, entry in positions.items():
+                result[day]["exercises"][int(position)] = entry
+    prescription = delta.get("prescription")
+    if prescription:
+        for workout in result.values():
+            if workout.get("duration"):
+                workout["prescription"] = prescription
+    return result
+
+def generate_program(
+    fitness_level: str,
+    goals: List[str],
+    available_days: List[str],
+    equipment_available: List[str],
+    time_per_session: int,
+    muscle_groups: Dict[str, List[str]],
+    exercise_library: Dict,
+    weeks: int = 8,
+    deload_every: int = 4,
+    rotate_per_week: int = 1,
+    used_exercises_tracker: Optional[Dict[str, int]] = None,
+    rng: Optional[random.Random] = None,
+    mode: str = "fixed"
+) -> Dict[str, Any]:
+    """Generate a multi-week block as a base week plus one compact delta per week.
+
+    Only week 1 is a full generation; each later week is derived from the
+    previous week's schedule and rotation state, so storage is the base plan
+    plus a few swapped entries and a prescription per week.
+    """
+    if used_exercises_tracker is None:
+        used_exercises_tracker = {}
+    base = generate_workout_plan(
+        fitness_level=fitness_level,
+        goals=goals,
+        available_days=available_days,
+        equipment_available=equipment_available,
+        time_per_session=time_per_session,
+        muscle_groups=muscle_groups,
+        exercise_library=exercise_library,
+        used_exercises_tracker=used_exercises_tracker,
+        rng=rng,
+        mode=mode
+    )
+    if not base:
+        return {}
+
+    guidelines = get_training_guidelines()
+    goal = next((goal for goal in goals if goal in guidelines), DEFAULT_GOAL)
+    guideline = guidelines.get(goal, {})
+    compiled = get_compiled_library(exercise_library)
+
+    deltas = [{"exercises": {}, "prescription": week_prescription(guideline, 1, weeks, deload_every)}]
+    current = base
+    with tracer.span("generate_program"):
+        for week in range(2, weeks + 1):
+            prescription = week_prescription(guideline, week, weeks, deload_every)
+            # Deload weeks keep the exercises so only the volume changes
+            changes = {} if prescription["deload"] else derive_next_week(
+                compiled,
+                current,
+                fitness_level,
+                equipment_available,
+                used_exercises_tracker,
+                week,
+                rotate_per_week,
+                rng
+            )
+            delta = {"exercises": changes, "prescription": prescription}
+            deltas.append(delta)
+            current = apply_week_delta(current, {"exercises": changes})
+            tracer.debug("Week %d: %d days changed, prescription=%s", week, len(changes), prescription)
+
+    return {"weeks": weeks, "goal": goal, "base": base, "deltas": deltas}
+
+def materialize_week(program: Dict[str, Any], week: int) -> Dict[str, Any]:
+    """Full schedule for one week, built from the base plan and the deltas up to that week"""
+    weeks = program.get("weeks", 0)
+    if not 1 <= week <= weeks:
+        raise ValueError(f"Week must be between 1 and {weeks}")
+    schedule = copy.deepcopy(program["base"])
+    deltas = program["deltas"]
+    # Exercise swaps accumulate; the prescription is the target week's own
+    for delta in deltas[1:week]:
+        for day, positions in delta.get("exercises", {}).items():
+            if day in schedule:
+                for position, entry in positions.items():
+                    schedule[day]["exercises"][int(position)] = entry
+    prescription = deltas[week - 1].get("prescription")
+    if prescription:
+        for workout in schedule.values():
+            if workout.get("duration"):
+                workout["prescription"] = prescription
+    return schedule
+
+def save_program(
+    db,
+    user_id: int,
+    program: Dict[str, Any],
+    preferences: Dict[str, Any]
+) -> Optional[int]:
+    """Save a generated program; returns its ID"""
+    try:
+        from models.database import WorkoutProgram, add_and_commit
+
+        row = WorkoutProgram(
+            user_id=user_id,
+            start_date=datetime.now().date(),
+            weeks=program["weeks"],
+            goal=program["goal"],
+            base_schedule=program["base"],
+            week_deltas=program["deltas"],
+            preferences=preferences
+        )
+        add_and_commit(db, row)
+        return row.id
+
+    except Exception as e:
+        print(f"Error saving program: {str(e)}")
+        db.rollback()
+        return None
+
+def get_latest_program(db, user_id: int) -> Optional[Dict[str, Any]]:
+    """Get the user's most recent program without materializing any week"""
+    try:
+        from models.database import WorkoutProgram
+
+        row = (
+            db.query(WorkoutProgram)
+            .filter(WorkoutProgram.user_id == user_id)
+            .order_by(WorkoutProgram.id.desc())
+            .first()
+        )
+        if row:
+            return {
+                "id": row.id,
+                "weeks": row.weeks,
+                "goal": row.goal,
+                "base": row.base_schedule,
+                "deltas": row.week_deltas,
+                "preferences": row.preferences,
+                "start_date": row.start_date
+            }
+        return None
+
+    except Exception as e:
+        print(f"Error getting program: {str(e)}")
+        return None
+
+def current_program_week(program: Dict[str, Any], today=None) -> int:
+    """Week of the block that today falls in, clamped to the program length"""
+    today = today or datetime.now().date()
+    elapsed = (today - program["start_date"]).days if program.get("start_date") else 0
+    return min(max(elapsed // 7 + 1, 1), program["weeks"])
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from models.database import ProgressEntry
+from models.database import ProgressEntry, add_and_commit
 from datetime import datetime, timedelta
 import pandas as pd
 from typing import List, Optional, Dict, Any
@@ -21,10 +21,7 @@ def add_progress_entry(
             protein_consumed=protein_consumed,
             notes=notes
         )
-        db.add(progress_entry)
-        db.commit()
-        db.refresh(progress_entry)
-        return progress_entry
+        return add_and_commit(db, progress_entry)
     except Exception as e:
         db.rollback()
         raise Exception(f"Error adding progress entry: {str(e)}")
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Token bucket settings: each key may burst up to LOGIN_RATE_LIMIT_BURST attempts,
+# then regains one attempt every 1 / LOGIN_RATE_LIMIT_PER_SECOND seconds
+LOGIN_RATE_LIMIT_BURST = float(os.getenv('LOGIN_RATE_LIMIT_BURST', '5'))
+LOGIN_RATE_LIMIT_PER_SECOND = float(os.getenv('LOGIN_RATE_LIMIT_PER_SECOND', '0.2'))
+
+# "memory" keeps buckets in this process; "sqlite" shares them between workers on one host
+LOGIN_RATE_LIMIT_BACKEND = os.getenv('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+LOGIN_RATE_LIMIT_SQLITE_PATH = os.getenv('LOGIN_RATE_LIMIT_SQLITE_PATH', 'rate_limits.sqlite3')
+
+class RateLimitExceeded(Exception):
+    """Raised when an attempt is rejected before any password hashing happens"""
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+def _refill_all(buckets: Dict[str, Tuple[float, float]], now: float, capacity: float, rate: float) -> Dict[str, float]:
+    return {key: _refill(tokens, updated_at, now, capacity, rate) for key, (tokens, updated_at) in buckets.items()}
+
+class MemoryBucketBackend:
+    """Token buckets held in a dictionary of the current process"""
+
+    # Consumes between sweeps for buckets that have refilled completely
+    SWEEP_EVERY = 1024
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._since_sweep = 0
+
+    def _sweep(self, now: float, capacity: float, rate: float) -> None:
+        # A bucket untouched for capacity / rate seconds is full again, the same as a missing one
+        idle = capacity / rate if rate > 0 else float("inf")
+        for key in [key for key, (_, updated_at) in self._buckets.items() if now - updated_at >= idle]:
+            del self._buckets[key]
+
+    def consume(self, key: str, capacity: float, rate: float, now: float) -> bool:
+        return self.consume_all([key], capacity, rate, now)
+
+    def consume_all(self, keys: Sequence[str], capacity: float, rate: float, now: float) -> bool:
+        """Take one token from every bucket, or from none of them if any is empty"""
+        with self._lock:
+            self._since_sweep += 1
+            if self._since_sweep >= self.SWEEP_EVERY:
+                self._since_sweep = 0
+                self._sweep(now, capacity, rate)
+            refilled = _refill_all(
+                {key: self._buckets.get(key, (capacity, now)) for key in keys}, now, capacity, rate
+            )
+            allowed = all(tokens >= 1.0 for tokens in refilled.values())
+            for key, tokens in refilled.items():
+                self._buckets[key] = (tokens - 1.0 if allowed else tokens, now)
+            return allowed
+
+class SQLiteBucketBackend:
+    """Token buckets in a local SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def consume(self, key: str, capacity: float, rate: float, now: float) -> bool:
+        return self.consume_all([key], capacity, rate, now)
+
+    def consume_all(self, keys: Sequence[str], capacity: float, rate: float, now: float) -> bool:
+        """Take one token from every bucket, or from none of them if any is empty"""
+        connection = self._connect()
+        try:
+            # Take the write lock up front so concurrent workers serialize on the buckets
+            connection.execute("BEGIN IMMEDIATE")
+            buckets = {}
+            for key in keys:
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                buckets[key] = row if row else (capacity, now)
+            refilled = _refill_all(buckets, now, capacity, rate)
+            allowed = all(tokens >= 1.0 for tokens in refilled.values())
+            connection.executemany(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                [(key, tokens - 1.0 if allowed else tokens, now) for key, tokens in refilled.items()]
+            )
+            connection.execute("COMMIT")
+            return allowed
+        except Exception:
+            # BEGIN IMMEDIATE itself may have failed (e.g. database is locked)
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+class AttemptRateLimiter:
+    """Token-bucket limiter keyed by username and client ID"""
+
+    def __init__(self, backend, capacity: float = LOGIN_RATE_LIMIT_BURST, rate: float = LOGIN_RATE_LIMIT_PER_SECOND):
+        self.backend = backend
+        self.capacity = capacity
+        self.rate = rate
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"accepted": 0, "rejected": 0}
+
+    def allow(self, action: str, username: Optional[str], client_id: Optional[str]) -> bool:
+        """Consume one attempt for the client and the username; False if either is exhausted"""
+        now = time.time()
+        keys: List[str] = []
+        if client_id:
+            keys.append(f"{action}:client:{client_id}")
+        if username:
+            keys.append(f"{action}:user:{username.lower()}")
+
+        # All-or-nothing, so a rejection by one bucket never spends the other's token
+        allowed = self.backend.consume_all(keys, self.capacity, self.rate, now)
+        with self._metrics_lock:
+            self._metrics["accepted" if allowed else "rejected"] += 1
+        return allowed
+
+    def check(self, action: str, username: Optional[str], client_id: Optional[str]) -> None:
+        """Raise RateLimitExceeded if the attempt is over budget"""
+        if not self.allow(action, username, client_id):
+            raise RateLimitExceeded("Too many attempts. Please wait a moment and try again.")
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+_limiter: Optional[AttemptRateLimiter] = None
+
+def get_rate_limiter() -> AttemptRateLimiter:
+    """Process-wide limiter using the configured backend"""
+    global _limiter
+    if _limiter is None:
+        if LOGIN_RATE_LIMIT_BACKEND == 'sqlite':
+            backend = SQLiteBucketBackend(LOGIN_RATE_LIMIT_SQLITE_PATH)
+        else:
+            backend = MemoryBucketBackend()
+        _limiter = AttemptRateLimiter(backend)
+    return _limiter
@@ -0,0 +1,276 @@
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from utils.fetch_backend import fetch_bytes
+
+FETCH_WORKERS = 16
+BATCH_SIZE = 200
+QUEUE_SIZE = 256
+FLUSH_INTERVAL = 2.0
+
+# Marks the end of a queue's input
+_DONE = None
+
+def extract_recipe_bytes(url: str, body: bytes) -> Tuple[Optional[Dict[str, Any]], float]:
+    """Worker entry point: parse one raw page, returning (recipe or None, CPU seconds)"""
+    from utils.recipe_scraper import parse_recipe_page
+
+    start = time.process_time()
+    recipe = None
+    parsed = parse_recipe_page(body.decode("utf-8", errors="replace"))
+    if parsed and parsed["name"] and parsed["calories"] > 0:
+        recipe = {"url": url, **parsed}
+    return recipe, time.process_time() - start
+
+def _warm_up() -> int:
+    return os.getpid()
+
+def store_recipes(db, recipes: List[Dict[str, Any]]) -> int:
+    """Upsert a batch of recipes by URL in one statement"""
+    try:
+        from models.database import Recipe
+        from sqlalchemy.dialects.postgresql import insert
+
+        now = datetime.now()
+        # A URL may appear twice in one batch; keep the last parse
+        rows = list({recipe["url"]: {
+            "url": recipe["url"],
+            "name": recipe["name"],
+            "calories": recipe["calories"],
+            "protein": recipe.get("protein"),
+            "fat": recipe.get("fat"),
+            "carbs": recipe.get("carbs"),
+            "servings": recipe.get("servings"),
+            "scraped_at": now
+        } for recipe in recipes}.values())
+        statement = insert(Recipe).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["url"],
+            set_={
+                column: getattr(statement.excluded, column)
+                for column in ("name", "calories", "protein", "fat", "carbs", "servings", "scraped_at")
+            }
+        )
+        db.execute(statement)
+        db.commit()
+        return len(rows)
+
+    except Exception as e:
+        print(f"Error storing recipes: {str(e)}")
+        db.rollback()
+        return 0
+
+class _StageStats:
+    """Pages handled by one stage, plus when it started and finished work"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = 0
+        self.errors = 0
+        self.skipped = 0
+        self.blocked_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def record(self, error: bool = False, skipped: bool = False, blocked: float = 0.0) -> None:
+        with self.lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+            self.items += 1
+            self.errors += error
+            self.skipped += skipped
+            self.blocked_seconds += blocked
+
+    def report(self, **extra) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        return {
+            "items": self.items,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.items / elapsed, 1) if elapsed > 0 else 0.0,
+            # Time spent waiting on a full downstream queue
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            **extra
+        }
+
+def _timed_put(target: queue.Queue, item: Any) -> float:
+    start = time.perf_counter()
+    target.put(item)
+    return time.perf_counter() - start
+
+def run_recipe_pipeline(
+    urls: Iterable[str],
+    db=None,
+    fetch_workers: int = FETCH_WORKERS,
+    extract_workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    fetch=fetch_bytes
+) -> Dict[str, Any]:
+    """Crawl recipe pages through fetch, extraction and write stages.
+
+    Fetch threads download raw bytes, a process pool parses them (so extraction
+    is not serialized by the GIL) and a single writer upserts batches into the
+    recipes table. The stages are linked by bounded queues, so a slow stage
+    holds back the ones before it instead of buffering the whole crawl. Without
+    a db the extracted recipes are returned in the report instead.
+    """
+    start = time.perf_counter()
+    extract_workers = extract_workers or os.cpu_count() or 1
+    url_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    fetched_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    write_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    fetch_stats, extract_stats, write_stats = _StageStats(), _StageStats(), _StageStats()
+    cpu_seconds = [0.0]
+    collected: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    fetchers_left = [fetch_workers]
+
+    def feed():
+        for url in urls:
+            url_queue.put(url)
+        for _ in range(fetch_workers):
+            url_queue.put(_DONE)
+
+    def fetch_worker():
+        while True:
+            url = url_queue.get()
+            if url is _DONE:
+                break
+            try:
+                body = fetch(url)
+            except Exception as e:
+                errors.append({"stage": "fetch", "url": url, "error": str(e)})
+                fetch_stats.record(error=True)
+                continue
+            fetch_stats.record(blocked=_timed_put(fetched_queue, (url, body)))
+        with fetch_stats.lock:
+            fetchers_left[0] -= 1
+            last = fetchers_left[0] == 0
+        if last:
+            fetch_stats.finished = time.perf_counter()
+            fetched_queue.put(_DONE)
+
+    def emit(futures, urls_by_future):
+        for future in futures:
+            url = urls_by_future.pop(future)
+            try:
+                recipe, cpu = future.result()
+            except Exception as e:
+                errors.append({"stage": "extract", "url": url, "error": str(e)})
+                extract_stats.record(error=True)
+                continue
+            cpu_seconds[0] += cpu
+            if recipe is None:
+                # Fetched fine but no recipe on the page
+                extract_stats.record(skipped=True)
+                continue
+            extract_stats.record(blocked=_timed_put(write_queue, recipe))
+
+    def extract_dispatcher(executor):
+        # At most two pages per worker in flight, so the pool cannot outrun the writer
+        pending = {}
+        while True:
+            item = fetched_queue.get()
+            if item is _DONE:
+                break
+            url, body = item
+            pending[executor.submit(extract_recipe_bytes, url, body)] = url
+            if len(pending) >= 2 * extract_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                emit(done, pending)
+        emit(list(pending), pending)
+        extract_stats.finished = time.perf_counter()
+        write_queue.put(_DONE)
+
+    def flush(batch):
+        if db is not None:
+            stored = store_recipes(db, batch) > 0
+            if not stored:
+                errors.append({"stage": "write", "url": batch[0]["url"], "error": "batch not stored"})
+            for _ in batch:
+                write_stats.record(error=not stored)
+        else:
+            collected.extend(batch)
+            for _ in batch:
+                write_stats.record()
+
+    def writer():
+        batch = []
+        while True:
+            try:
+                recipe = write_queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                # Nothing new for a while; don't hold a partial batch back
+                if batch:
+                    flush(batch)
+                    batch = []
+                continue
+            if recipe is _DONE:
+                break
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        write_stats.finished = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=extract_workers) as executor:
+        # Start the worker processes before any threads exist, so none are forked mid-lock
+        executor.submit(_warm_up).result()
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads += [threading.Thread(target=fetch_worker, daemon=True) for _ in range(fetch_workers)]
+        threads += [
+            threading.Thread(target=extract_dispatcher, args=(executor,), daemon=True),
+            threading.Thread(target=writer, daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "stages": {
+            "fetch": fetch_stats.report(workers=fetch_workers),
+            "extract": extract_stats.report(workers=extract_workers, cpu_seconds=round(cpu_seconds[0], 3)),
+            "write": write_stats.report(batch_size=batch_size)
+        },
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(fetch_stats.items / elapsed, 1) if elapsed > 0 else 0.0,
+        "recipes_written": write_stats.items - write_stats.errors
+    }
+    if db is None:
+        report["recipes"] = collected
+    return report
+
+def main():
+    """Crawl the URLs listed one per line in a file (or stdin) into the recipes table"""
+    from models.database import SessionLocal
+
+    source = open(sys.argv[1], encoding="utf-8") if len(sys.argv) > 1 else sys.stdin
+    with source:
+        urls = [line.strip() for line in source if line.strip()]
+
+    db = SessionLocal()
+    try:
+        report = run_recipe_pipeline(urls, db)
+        for stage, stats in report["stages"].items():
+            print(
+                f"{stage}: {stats['items']} pages, {stats['errors']} errors, "
+                f"{stats['pages_per_second']} pages/s, blocked {stats['blocked_seconds']}s"
+            )
+        print(f"Total: {report['pages_per_second']} pages/s in {report['elapsed_seconds']}s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
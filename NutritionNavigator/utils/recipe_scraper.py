@@ -1,73 +1,219 @@
 import trafilatura
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import argparse
+import os
+import random
 import re
 import json
+import tempfile
+import time
 from datetime import datetime
+from html import unescape
+from html.parser import HTMLParser
+from utils.fetch_backend import fetch_url
 
-def extract_nutritional_info(text: str) -> Dict[str, float]:
-    """Extract calories and protein information from recipe text"""
-    calories = 0
-    protein = 0
-    
-    # Look for common patterns of nutritional information
-    calories_patterns = [
+# Text fallback patterns, tried in order per nutrient on the lowercased text
+NUTRITION_PATTERNS = {
+    'calories': [re.compile(pattern) for pattern in (
         r'(\d+)\s*calories',
         r'calories:\s*(\d+)',
         r'energy:\s*(\d+)\s*kcal'
-    ]
-    
-    protein_patterns = [
+    )],
+    'protein': [re.compile(pattern) for pattern in (
         r'(\d+)g?\s*protein',
         r'protein:\s*(\d+)g?',
         r'protein\s*(\d+)g?'
-    ]
-    
-    for pattern in calories_patterns:
-        match = re.search(pattern, text.lower())
-        if match:
-            try:
-                calories = float(match.group(1))
+    )],
+    'fat': [re.compile(pattern) for pattern in (
+        r'(\d+)g?\s*(?:total )?fat',
+        r'(?:total )?fat:?\s*(\d+)g?'
+    )],
+    'carbs': [re.compile(pattern) for pattern in (
+        r'(\d+)g?\s*carb',
+        r'carb(?:ohydrate)?s?:?\s*(\d+)g?'
+    )]
+}
+
+# schema.org NutritionInformation properties for each nutrient
+SCHEMA_NUTRIENTS = {
+    'calories': 'calories',
+    'protein': 'proteinContent',
+    'fat': 'fatContent',
+    'carbs': 'carbohydrateContent'
+}
+
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]+type=["\']?application/ld\+json["\']?[^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+MICRODATA_RECIPE_PATTERN = re.compile(r'itemtype=["\']?https?://schema\.org/Recipe', re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+def extract_nutritional_info(text: str) -> Dict[str, float]:
+    """Extract calories, protein, fat and carbs information from recipe text"""
+    text = text.lower()
+    nutrition = {}
+    for nutrient, patterns in NUTRITION_PATTERNS.items():
+        nutrition[nutrient] = 0
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                nutrition[nutrient] = float(match.group(1))
                 break
-            except ValueError:
-                continue
-    
-    for pattern in protein_patterns:
-        match = re.search(pattern, text.lower())
+    return nutrition
+
+def parse_quantity(value: Any) -> Optional[float]:
+    """First number in a schema.org value such as "350 kcal", "12 g" or ["4", "4 servings"]"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.search(value.replace(',', ''))
         if match:
-            try:
-                protein = float(match.group(1))
-                break
-            except ValueError:
-                continue
-    
-    return {
-        'calories': calories,
-        'protein': protein
+            return float(match.group())
+    return None
+
+def _json_ld_nodes(data: Any):
+    """Every object in a JSON-LD document, including those inside @graph and lists"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _json_ld_nodes(data['@graph'])
+
+def _is_recipe(node: Dict[str, Any]) -> bool:
+    node_type = node.get('@type')
+    return node_type == 'Recipe' or (isinstance(node_type, list) and 'Recipe' in node_type)
+
+def _structured_recipe(name: Any, servings: Any, nutrition: Dict[str, Any]) -> Dict[str, Any]:
+    recipe = {
+        'name': unescape(str(name or '')).strip(),
+        'servings': parse_quantity(servings)
     }
+    for nutrient, schema_property in SCHEMA_NUTRIENTS.items():
+        recipe[nutrient] = parse_quantity(nutrition.get(schema_property)) or 0
+    return recipe
+
+def extract_json_ld_recipe(html: str) -> Optional[Dict[str, Any]]:
+    """Name, servings and nutrition from the page's schema.org Recipe JSON-LD, if any"""
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for node in _json_ld_nodes(data):
+            if _is_recipe(node):
+                nutrition = node.get('nutrition')
+                return _structured_recipe(
+                    node.get('name'),
+                    node.get('recipeYield'),
+                    nutrition if isinstance(nutrition, dict) else {}
+                )
+    return None
+
+class MicrodataRecipeParser(HTMLParser):
+    """Collects the first value of each itemprop inside a schema.org Recipe item"""
+
+    VOID_TAGS = {'meta', 'link', 'img', 'br', 'hr', 'input', 'source'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.properties: Dict[str, str] = {}
+        self._depth = 0
+        self._recipe_depth = None
+        self._finished = False
+        self._capture = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag not in self.VOID_TAGS:
+            self._depth += 1
+        if self._finished:
+            return
+        if self._recipe_depth is None:
+            if 'schema.org/recipe' in (attrs.get('itemtype') or '').lower():
+                self._recipe_depth = self._depth
+            return
+        prop = attrs.get('itemprop')
+        if not prop or prop in self.properties or self._capture:
+            return
+        value = attrs.get('content') or attrs.get('datetime')
+        if value is not None:
+            self.properties[prop] = value
+        elif tag not in self.VOID_TAGS and 'itemscope' not in attrs:
+            self._capture = (prop, self._depth, [])
+
+    def handle_data(self, data):
+        if self._capture:
+            self._capture[2].append(data)
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS:
+            return
+        if self._capture and self._capture[1] == self._depth:
+            prop, _, text = self._capture
+            self.properties[prop] = ' '.join(''.join(text).split())
+            self._capture = None
+        if self._recipe_depth == self._depth:
+            # Only the first Recipe item on the page is read
+            self._finished = True
+        self._depth -= 1
+
+def extract_microdata_recipe(html: str) -> Optional[Dict[str, Any]]:
+    """Name, servings and nutrition from schema.org Recipe microdata, if any"""
+    match = MICRODATA_RECIPE_PATTERN.search(html)
+    if not match:
+        return None
+    # Parse from the Recipe element's own tag rather than the whole page
+    parser = MicrodataRecipeParser()
+    parser.feed(html[html.rfind('<', 0, match.start()):])
+    parser.close()
+    if not parser.properties:
+        return None
+    return _structured_recipe(parser.properties.get('name'), parser.properties.get('recipeYield'), parser.properties)
+
+def extract_text_recipe(html: str) -> Optional[Dict[str, Any]]:
+    """Title and nutrition guessed from the page's main text with trafilatura"""
+    text = trafilatura.extract(html)
+    if not text:
+        return None
+    # First line is usually the title
+    return {'name': text.split('\n')[0].strip(), 'servings': None, **extract_nutritional_info(text)}
+
+def parse_recipe_page(html: str) -> Optional[Dict[str, Any]]:
+    """Structured data first; full-text extraction fills in only what it lacks"""
+    structured = extract_json_ld_recipe(html) or extract_microdata_recipe(html)
+    if structured is not None and structured['name'] and structured['calories']:
+        return structured
+    recipe = extract_text_recipe(html)
+    if structured is None or recipe is None:
+        return recipe or structured
+    # Structured values beat the text guesses wherever the page provided them
+    recipe.update({field: value for field, value in structured.items() if value})
+    return recipe
 
 def scrape_recipe(url: str) -> Optional[Dict[str, Any]]:
     """Scrape recipe information from a given URL"""
     try:
-        # Download and extract content
-        downloaded = trafilatura.fetch_url(url)
+        downloaded = fetch_url(url)
         if not downloaded:
             return None
-            
-        text = trafilatura.extract(downloaded)
-        if not text:
+
+        parsed = parse_recipe_page(downloaded)
+        if not parsed:
             return None
-        
-        # Extract title (first line is usually the title)
-        title = text.split('\n')[0].strip()
-        
-        # Extract nutritional information
-        nutrition = extract_nutritional_info(text)
-        
+
         # Create recipe object
         recipe = {
-            'name': title,
-            'calories': nutrition['calories'],
-            'protein': nutrition['protein'],
+            'name': parsed['name'],
+            'calories': parsed['calories'],
+            'protein': parsed['protein'],
+            'fat': parsed['fat'],
+            'carbs': parsed['carbs'],
+            'servings': parsed['servings'],
             'restrictions': [],  # Would need more sophisticated analysis
             'cuisine': ["Any"],  # Would need more sophisticated analysis
             'link': url,
@@ -112,3 +258,150 @@ def get_online_recipes(
             recipes.append(recipe)
     
     return recipes[:num_recipes]
+
+BENCHMARK_FIELDS = ('name', 'calories', 'protein', 'fat', 'carbs', 'servings')
+BENCHMARK_WORDS = (
+    "the a tomato onion garlic stir simmer minutes pan heat oil until golden "
+    "serve fresh basil pepper salt bowl mix whisk bake oven tender"
+).split()
+
+def _synthetic_page(index: int, kind: str, rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    """A recipe page of the given markup kind ("jsonld", "microdata" or "plain") and its true values"""
+    def paragraph(words: int) -> str:
+        return " ".join(rng.choice(BENCHMARK_WORDS) for _ in range(words)).capitalize() + "."
+
+    expected = {
+        'name': f"Recipe Number {index} Chicken Bowl",
+        'calories': rng.randint(150, 900),
+        'protein': rng.randint(5, 60),
+        'fat': rng.randint(2, 50),
+        'carbs': rng.randint(5, 120),
+        'servings': rng.randint(1, 8)
+    }
+    nav = "".join(f'<li><a href="/c/{k}">Category {k}</a></li>' for k in range(150))
+    body = "".join(f"<p>{paragraph(60)}</p>" for _ in range(40))
+    if index % 3 == 0:
+        # Real recipe posts often mention calories before the nutrition panel
+        body = f"<p>Swap in turkey to save {rng.randint(20, 90)} calories per bowl.</p>" + body
+    comments = "".join(
+        f'<div class="comment"><p>{paragraph(30)} 5 stars, {rng.randint(100, 999)} calories felt right</p></div>'
+        for _ in range(30)
+    )
+    nutrition_text = (
+        f"<p>Nutrition per serving: {expected['calories']} calories, {expected['protein']}g protein, "
+        f"{expected['fat']}g fat, {expected['carbs']}g carbs</p>"
+    )
+
+    head = ""
+    if kind == "jsonld":
+        document = {"@context": "https://schema.org", "@graph": [
+            {"@type": "WebPage", "name": "Recipes"},
+            {
+                "@type": ["Recipe"],
+                "name": expected['name'],
+                "recipeYield": [str(expected['servings']), f"{expected['servings']} servings"],
+                "nutrition": {
+                    "@type": "NutritionInformation",
+                    "calories": f"{expected['calories']} kcal",
+                    "proteinContent": f"{expected['protein']} g",
+                    "fatContent": f"{expected['fat']} g",
+                    "carbohydrateContent": f"{expected['carbs']} g"
+                }
+            }
+        ]}
+        head = f'<script type="application/ld+json">{json.dumps(document)}</script>'
+        main_content = f"<h1>{expected['name']}</h1>{body}"
+    elif kind == "microdata":
+        main_content = (
+            f'<div itemscope itemtype="https://schema.org/Recipe"><h1 itemprop="name">{expected["name"]}</h1>'
+            f'<span itemprop="recipeYield">{expected["servings"]} servings</span>{body}'
+            f'<div itemprop="nutrition" itemscope itemtype="https://schema.org/NutritionInformation">'
+            f'<span itemprop="calories">{expected["calories"]} calories</span>'
+            f'<span itemprop="proteinContent">{expected["protein"]} g</span>'
+            f'<meta itemprop="fatContent" content="{expected["fat"]} g">'
+            f'<span itemprop="carbohydrateContent">{expected["carbs"]}g</span></div></div>'
+        )
+    else:
+        main_content = f"<h1>{expected['name']}</h1>{body}"
+
+    html = (
+        f"<html><head><title>{expected['name']} | Site</title>{head}<script>var x={{}};</script></head>"
+        f"<body><nav><ul>{nav}</ul></nav><article>{main_content}{nutrition_text}</article>"
+        f"<section>{comments}</section><footer>{paragraph(40)}</footer></body></html>"
+    )
+    return html, expected
+
+def write_benchmark_corpus(directory: str, jsonld: int = 120, microdata: int = 50, plain: int = 30, seed: int = 0) -> int:
+    """Save a synthetic corpus as NAME.html pages, each with its true values in NAME.json"""
+    rng = random.Random(seed)
+    kinds = ["jsonld"] * jsonld + ["microdata"] * microdata + ["plain"] * plain
+    os.makedirs(directory, exist_ok=True)
+    for index, kind in enumerate(kinds):
+        html, expected = _synthetic_page(index, kind, rng)
+        stem = os.path.join(directory, f"{index:04d}-{kind}")
+        with open(stem + ".html", "w", encoding="utf-8") as f:
+            f.write(html)
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(expected, f)
+    return len(kinds)
+
+def load_benchmark_corpus(directory: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """(html, expected) pairs for every saved page that has its expected values next to it"""
+    corpus = []
+    for filename in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(filename)
+        expected_path = os.path.join(directory, stem + ".json")
+        if extension != ".html" or not os.path.exists(expected_path):
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            html = f.read()
+        with open(expected_path, encoding="utf-8") as f:
+            corpus.append((html, json.load(f)))
+    return corpus
+
+def _field_matches(parsed: Optional[Dict[str, Any]], expected: Dict[str, Any], field: str) -> bool:
+    if not parsed or expected.get(field) is None:
+        return False
+    if field == 'name':
+        return parsed.get('name') == expected['name']
+    return parsed.get(field) == float(expected[field])
+
+def benchmark_extraction(corpus_dir: str) -> List[Dict[str, Any]]:
+    """Pages per second and per-field accuracy of text-only against structured-first parsing"""
+    corpus = load_benchmark_corpus(corpus_dir)
+    if not corpus:
+        raise ValueError(f"No saved pages with expected values in {corpus_dir}")
+
+    results = []
+    for label, parse in (("trafilatura only", extract_text_recipe), ("structured first", parse_recipe_page)):
+        start = time.perf_counter()
+        parsed = [parse(html) for html, _ in corpus]
+        elapsed = time.perf_counter() - start
+        results.append({
+            "parser": label,
+            "pages": len(corpus),
+            "pages_per_second": round(len(corpus) / elapsed, 1),
+            "accuracy": {
+                field: round(sum(_field_matches(page, expected, field) for page, (_, expected) in zip(parsed, corpus)) / len(corpus), 3)
+                for field in BENCHMARK_FIELDS
+            }
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recipe extraction on a corpus of saved pages")
+    parser.add_argument("corpus", nargs="?", help="Directory of NAME.html pages with expected values in NAME.json; "
+                                                  "a synthetic corpus is generated when omitted")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = scratch
+            write_benchmark_corpus(corpus_dir)
+        for result in benchmark_extraction(corpus_dir):
+            accuracy = ", ".join(f"{field} {share:.0%}" for field, share in result["accuracy"].items())
+            print(f"{result['parser']}: {result['pages_per_second']} pages/s on {result['pages']} pages; {accuracy}")
+
+if __name__ == "__main__":
+    main()
@@ -1,158 +1,281 @@
-from typing import Dict, List, Any, Optional
+import random
+import time
+import numpy as np
+import pandas as pd
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Sequence
 from datetime import datetime, timedelta
+from utils.keyword_matcher import KeywordMatcher
 
-def calculate_recovery_score(
-    workout_intensity: str,
-    training_volume: int,
-    exercise_types: List[str],
-    user_metrics: Dict[str, Any]
-) -> float:
-    """Calculate recovery score based on workout and user metrics"""
-    base_score = 100.0
-    
-    # Intensity impact
-    intensity_factors = {
-        "light": 0.8,
-        "moderate": 0.6,
-        "high": 0.4,
-        "very high": 0.3
-    }
-    
-    # Volume impact (number of exercises)
-    volume_impact = max(0.3, 1 - (training_volume * 0.05))
-    
-    # Exercise type impact
-    exercise_impacts = {
-        "compound": 0.4,
-        "isolation": 0.7,
-        "bodyweight": 0.8,
-        "cardio": 0.85
-    }
-    
-    # Calculate average exercise impact
-    exercise_score = sum(exercise_impacts.get(ex_type, 0.6) for ex_type in exercise_types) / len(exercise_types)
-    
-    # Apply all factors
-    recovery_score = base_score * intensity_factors.get(workout_intensity.lower(), 0.6) * volume_impact * exercise_score
-    
-    # Adjust for user metrics
-    if user_metrics.get("sleep_hours", 8) < 7:
-        recovery_score *= 0.8
-    if user_metrics.get("stress_level", "low").lower() == "high":
-        recovery_score *= 0.85
-    if user_metrics.get("nutrition_status", "good").lower() == "poor":
-        recovery_score *= 0.9
-        
-    return round(recovery_score, 1)
+# Score multipliers; module-level and read-only so every call shares them
+INTENSITY_FACTORS = MappingProxyType({
+    "light": 0.8,
+    "moderate": 0.6,
+    "high": 0.4,
+    "very high": 0.3
+})
 
-def generate_recovery_recommendations(
-    workout_data: Dict[str, Any],
-    user_metrics: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Generate personalized recovery recommendations"""
-    
-    # Calculate recovery score
-    recovery_score = calculate_recovery_score(
-        workout_data.get("intensity", "moderate"),
-        len(workout_data.get("exercises", [])),
-        workout_data.get("exercise_types", ["compound"]),
-        user_metrics
-    )
-    
-    # Base recommendations
-    recommendations = {
-        "recovery_score": recovery_score,
-        "recommended_rest_days": 1,
-        "nutrition_tips": [],
-        "recovery_activities": [],
-        "sleep_recommendations": {},
-        "next_workout_date": None
-    }
-    
-    # Adjust recommendations based on recovery score
-    if recovery_score < 50:
-        recommendations["recommended_rest_days"] = 2
-        recommendations["nutrition_tips"] = [
+EXERCISE_IMPACTS = MappingProxyType({
+    "compound": 0.4,
+    "isolation": 0.7,
+    "bodyweight": 0.8,
+    "cardio": 0.85
+})
+
+DEFAULT_FACTOR = 0.6
+
+# Recovery score multiplier per acute:chronic workload zone
+WORKLOAD_FACTORS = MappingProxyType({
+    "undertrained": 1.0,
+    "optimal": 1.0,
+    "caution": 0.85,
+    "high risk": 0.7
+})
+
+# Recommendation templates per recovery tier, from lowest score up
+RECOVERY_TIERS = ("low", "moderate", "good")
+TIER_THRESHOLDS = (50, 75)
+
+RECOVERY_TEMPLATES = MappingProxyType({
+    "low": MappingProxyType({
+        "recommended_rest_days": 2,
+        "nutrition_tips": (
             "Increase protein intake to 2g per kg body weight",
             "Focus on anti-inflammatory foods",
             "Stay well hydrated (3-4 liters of water)",
             "Consider BCAAs supplementation"
-        ]
-        recommendations["recovery_activities"] = [
+        ),
+        "recovery_activities": (
             "Light stretching",
             "Foam rolling",
             "10-15 minutes of light walking",
             "Cold therapy (ice bath or cold shower)"
-        ]
-        recommendations["sleep_recommendations"] = {
+        ),
+        "sleep_recommendations": MappingProxyType({
             "minimum_hours": 8,
             "optimal_hours": 9,
-            "tips": [
+            "tips": (
                 "Avoid screens 1 hour before bed",
                 "Keep room temperature cool",
                 "Use blackout curtains",
                 "Consider magnesium supplementation"
-            ]
-        }
-    elif recovery_score < 75:
-        recommendations["recommended_rest_days"] = 1
-        recommendations["nutrition_tips"] = [
+            )
+        })
+    }),
+    "moderate": MappingProxyType({
+        "recommended_rest_days": 1,
+        "nutrition_tips": (
             "Maintain regular protein intake (1.6-1.8g per kg)",
             "Focus on complex carbohydrates",
             "Stay hydrated (2-3 liters of water)"
-        ]
-        recommendations["recovery_activities"] = [
+        ),
+        "recovery_activities": (
             "Dynamic stretching",
             "Light mobility work",
             "20-30 minutes of walking",
             "Self-massage techniques"
-        ]
-        recommendations["sleep_recommendations"] = {
+        ),
+        "sleep_recommendations": MappingProxyType({
             "minimum_hours": 7,
             "optimal_hours": 8,
-            "tips": [
+            "tips": (
                 "Maintain regular sleep schedule",
                 "Practice relaxation techniques",
                 "Ensure dark, quiet sleeping environment"
-            ]
-        }
-    else:
-        recommendations["recommended_rest_days"] = 0
-        recommendations["nutrition_tips"] = [
+            )
+        })
+    }),
+    "good": MappingProxyType({
+        "recommended_rest_days": 0,
+        "nutrition_tips": (
             "Maintain balanced diet",
             "Regular hydration",
             "Consider pre-workout nutrition"
-        ]
-        recommendations["recovery_activities"] = [
+        ),
+        "recovery_activities": (
             "Dynamic warm-up",
             "Basic mobility work",
             "Light cardio if desired"
-        ]
-        recommendations["sleep_recommendations"] = {
+        ),
+        "sleep_recommendations": MappingProxyType({
             "minimum_hours": 7,
             "optimal_hours": 8,
-            "tips": [
+            "tips": (
                 "Maintain regular sleep schedule",
                 "Stay hydrated throughout the day"
-            ]
-        }
+            )
+        })
+    })
+})
+
+def recovery_tier(recovery_score: float) -> str:
+    for threshold, tier in zip(TIER_THRESHOLDS, RECOVERY_TIERS):
+        if recovery_score < threshold:
+            return tier
+    return RECOVERY_TIERS[-1]
+
+def calculate_recovery_score(
+    workout_intensity: str,
+    training_volume: int,
+    exercise_types: List[str],
+    user_metrics: Dict[str, Any],
+    workload: Optional[Dict[str, Any]] = None
+) -> float:
+    """Calculate recovery score based on workout and user metrics, and logged workload if given"""
+    base_score = 100.0
+    
+    # Volume impact (number of exercises)
+    volume_impact = max(0.3, 1 - (training_volume * 0.05))
+    
+    # Calculate average exercise impact
+    exercise_score = sum(EXERCISE_IMPACTS.get(ex_type, DEFAULT_FACTOR) for ex_type in exercise_types) / len(exercise_types)
+    
+    # Apply all factors
+    recovery_score = base_score * INTENSITY_FACTORS.get(workout_intensity.lower(), DEFAULT_FACTOR) * volume_impact * exercise_score
+    
+    # Adjust for user metrics
+    if user_metrics.get("sleep_hours", 8) < 7:
+        recovery_score *= 0.8
+    if user_metrics.get("stress_level", "low").lower() == "high":
+        recovery_score *= 0.85
+    if user_metrics.get("nutrition_status", "good").lower() == "poor":
+        recovery_score *= 0.9
+
+    # Adjust for recent training relative to what the user is used to
+    if workload:
+        recovery_score *= WORKLOAD_FACTORS.get(workload.get("zone"), 1.0)
+
+    return round(recovery_score, 1)
+
+def generate_recovery_recommendations(
+    workout_data: Dict[str, Any],
+    user_metrics: Dict[str, Any],
+    workload: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Generate personalized recovery recommendations.
+
+    workload is a summary from utils.workload; with it the score reflects
+    logged training and the next workout date counts from the last session.
+    The tips are shared read-only templates.
+    """
+    
+    # Calculate recovery score
+    recovery_score = calculate_recovery_score(
+        workout_data.get("intensity", "moderate"),
+        len(workout_data.get("exercises", [])),
+        workout_data.get("exercise_types", ["compound"]),
+        user_metrics,
+        workload
+    )
+    
+    # Recommendations for the score's tier
+    template = RECOVERY_TEMPLATES[recovery_tier(recovery_score)]
+    recommendations = {
+        "recovery_score": recovery_score,
+        "recommended_rest_days": template["recommended_rest_days"],
+        "nutrition_tips": template["nutrition_tips"],
+        "recovery_activities": template["recovery_activities"],
+        "sleep_recommendations": template["sleep_recommendations"],
+        "next_workout_date": None,
+        "workload": workload
+    }
     
     # Calculate next workout date
-    next_workout_date = datetime.now() + timedelta(days=recommendations["recommended_rest_days"])
+    if workload and workload.get("last_session"):
+        # Rest until the workload ratio is back in a safe range, counting from the last session
+        rest_days = max(recommendations["recommended_rest_days"], workload.get("rest_days_to_safe", 0))
+        recommendations["recommended_rest_days"] = rest_days
+        last_session = datetime.combine(workload["last_session"], datetime.min.time())
+        next_workout_date = max(last_session + timedelta(days=rest_days + 1), datetime.now())
+    else:
+        next_workout_date = datetime.now() + timedelta(days=recommendations["recommended_rest_days"])
     recommendations["next_workout_date"] = next_workout_date.strftime("%Y-%m-%d")
     
     return recommendations
 
-def get_workout_intensity(exercises: List[str], fitness_level: str) -> str:
-    """Determine workout intensity based on exercises and fitness level"""
-    compound_movements = [
+def _lookup(values: Sequence[Any], factors: Dict[str, float], default: float, lowercase: bool = True) -> np.ndarray:
+    """Map labels to factors, doing the dictionary lookups once per distinct label"""
+    table = {label: factors.get(label.lower() if lowercase else label, default) for label in set(values)}
+    return np.fromiter((table[label] for label in values), dtype=float, count=len(values))
+
+def score_recovery_batch(
+    intensities: Sequence[str],
+    volumes: Sequence[int],
+    exercise_types: Sequence[Sequence[str]],
+    sleep_hours: Optional[Sequence[float]] = None,
+    stress_levels: Optional[Sequence[str]] = None,
+    nutrition_statuses: Optional[Sequence[str]] = None,
+    workload_zones: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """Recovery scores for many clients in one vectorized pass.
+
+    Arguments are parallel arrays, one entry per client; exercise_types holds
+    each client's list of exercise types. Scores match calculate_recovery_score.
+    """
+    count = len(intensities)
+    scores = 100.0 * _lookup(intensities, INTENSITY_FACTORS, DEFAULT_FACTOR)
+    scores *= np.maximum(0.3, 1 - np.asarray(volumes, dtype=float) * 0.05)
+
+    # Mean exercise impact per client over the flattened type lists
+    lengths = np.fromiter((len(types) for types in exercise_types), dtype=np.int64, count=count)
+    flat = [ex_type for types in exercise_types for ex_type in types]
+    owners = np.repeat(np.arange(count), lengths)
+    totals = np.bincount(owners, weights=_lookup(flat, EXERCISE_IMPACTS, DEFAULT_FACTOR, lowercase=False) if flat else None, minlength=count)
+    scores *= np.where(lengths > 0, totals / np.maximum(lengths, 1), DEFAULT_FACTOR)
+
+    if sleep_hours is not None:
+        scores *= np.where(np.asarray(sleep_hours, dtype=float) < 7, 0.8, 1.0)
+    if stress_levels is not None:
+        scores *= _lookup(stress_levels, {"high": 0.85}, 1.0)
+    if nutrition_statuses is not None:
+        scores *= _lookup(nutrition_statuses, {"poor": 0.9}, 1.0)
+    if workload_zones is not None:
+        scores *= _lookup(workload_zones, WORKLOAD_FACTORS, 1.0, lowercase=False)
+    # Python's round (not np.round) so halves round exactly as in calculate_recovery_score
+    return np.array([round(score, 1) for score in scores.tolist()])
+
+def recommend_recovery_batch(
+    client_ids: Sequence[Any],
+    intensities: Sequence[str],
+    volumes: Sequence[int],
+    exercise_types: Sequence[Sequence[str]],
+    sleep_hours: Optional[Sequence[float]] = None,
+    stress_levels: Optional[Sequence[str]] = None,
+    nutrition_statuses: Optional[Sequence[str]] = None,
+    workload_zones: Optional[Sequence[str]] = None,
+    as_of: Optional[datetime] = None
+) -> pd.DataFrame:
+    """Scores, tiers, rest days and next workout dates for a roster, highest risk first.
+
+    Each row's tier names its shared template in RECOVERY_TEMPLATES, so the
+    tips are looked up rather than copied per client.
+    """
+    scores = score_recovery_batch(
+        intensities, volumes, exercise_types,
+        sleep_hours, stress_levels, nutrition_statuses, workload_zones
+    )
+    tier_codes = np.searchsorted(np.array(TIER_THRESHOLDS), scores, side="right")
+    rest_days = np.array([RECOVERY_TEMPLATES[tier]["recommended_rest_days"] for tier in RECOVERY_TIERS])[tier_codes]
+    start = np.datetime64((as_of or datetime.now()).date(), "D")
+    table = pd.DataFrame({
+        "client_id": client_ids,
+        "recovery_score": scores,
+        "risk": np.round(100 - scores, 1),
+        "tier": pd.Categorical.from_codes(tier_codes, categories=RECOVERY_TIERS, ordered=True),
+        "recommended_rest_days": rest_days.astype("int8"),
+        "next_workout_date": start + rest_days.astype("timedelta64[D]")
+    })
+    return table.sort_values("risk", ascending=False, kind="stable").reset_index(drop=True)
+
+# Compound movements, matched case-sensitively within exercise names
+COMPOUND_MATCHER = KeywordMatcher([
+    ("compound", [
         "Squat", "Deadlift", "Bench Press", "Pull-up", "Clean", "Snatch",
         "Press", "Row", "Lunge"
-    ]
-    
-    # Count compound movements
-    compound_count = sum(1 for ex in exercises if any(move in ex for move in compound_movements))
-    
+    ])
+], lowercase=False)
+
+def _intensity_for(compound_count: int, fitness_level: str) -> str:
     # Calculate intensity based on compound movements and fitness level
     if fitness_level.lower() == "beginner":
         if compound_count >= 3:
@@ -172,3 +295,74 @@ def get_workout_intensity(exercises: List[str], fitness_level: str) -> str:
         elif compound_count >= 2:
             return "high"
         return "moderate"
+
+def get_workout_intensity(exercises: List[str], fitness_level: str) -> str:
+    """Determine workout intensity based on exercises and fitness level"""
+    return _intensity_for(COMPOUND_MATCHER.count_containing(exercises), fitness_level)
+
+def get_workout_intensities(workouts: Sequence[List[str]], fitness_levels: Sequence[str]) -> List[str]:
+    """Intensity for each (exercise list, fitness level) pair, matching all exercises in one pass"""
+    exercises = [exercise for workout in workouts for exercise in workout]
+    owners = [index for index, workout in enumerate(workouts) for _ in workout]
+    compound_counts = [0] * len(workouts)
+    for position in COMPOUND_MATCHER.indices_containing(exercises):
+        compound_counts[owners[position]] += 1
+    return [
+        _intensity_for(compound_count, fitness_level)
+        for compound_count, fitness_level in zip(compound_counts, fitness_levels)
+    ]
+
+def _synthetic_roster(clients: int, seed: int) -> Dict[str, List[Any]]:
+    rng = random.Random(seed)
+    exercise_types = list(EXERCISE_IMPACTS) + ["stretching"]
+    return {
+        "intensities": [rng.choice(list(INTENSITY_FACTORS)) for _ in range(clients)],
+        "volumes": [rng.randint(2, 12) for _ in range(clients)],
+        "exercise_types": [rng.choices(exercise_types, k=rng.randint(1, 4)) for _ in range(clients)],
+        "sleep_hours": [rng.choice((5.5, 6.5, 7.0, 8.0)) for _ in range(clients)],
+        "stress_levels": [rng.choice(("low", "moderate", "high")) for _ in range(clients)],
+        "nutrition_statuses": [rng.choice(("good", "fair", "poor")) for _ in range(clients)],
+        "workload_zones": [rng.choice(list(WORKLOAD_FACTORS)) for _ in range(clients)]
+    }
+
+def benchmark_recovery(clients: int = 10000, repeats: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """Best-of-repeats milliseconds for the per-client loop against the batch APIs on a synthetic roster"""
+    roster = _synthetic_roster(clients, seed)
+    rows = list(zip(*roster.values()))
+
+    def per_client():
+        return [
+            generate_recovery_recommendations(
+                {"intensity": intensity, "exercises": [None] * volume, "exercise_types": types},
+                {"sleep_hours": sleep, "stress_level": stress, "nutrition_status": nutrition},
+                {"zone": zone}
+            )["recovery_score"]
+            for intensity, volume, types, sleep, stress, nutrition, zone in rows
+        ]
+
+    def best(run) -> float:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return round(min(timings) * 1000, 1)
+
+    return {
+        "clients": clients,
+        "per_client_ms": best(per_client),
+        "batch_scores_ms": best(lambda: score_recovery_batch(**roster)),
+        "batch_table_ms": best(lambda: recommend_recovery_batch(list(range(clients)), **roster)),
+        "scores_match": per_client() == score_recovery_batch(**roster).tolist()
+    }
+
+def main():
+    result = benchmark_recovery()
+    print(
+        f"{result['clients']} clients: per-client loop {result['per_client_ms']} ms, "
+        f"batch scores {result['batch_scores_ms']} ms, batch table {result['batch_table_ms']} ms, "
+        f"scores match: {result['scores_match']}"
+    )
+
+if __name__ == "__main__":
+    main()
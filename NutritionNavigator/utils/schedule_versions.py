@@ -0,0 +1,349 @@
+import argparse
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from utils.json_patch import make_patch, apply_patch
+
+# A full snapshot is written every SNAPSHOT_INTERVAL versions; the rest are patches
+SNAPSHOT_INTERVAL = int(os.getenv("SCHEDULE_SNAPSHOT_INTERVAL", "20"))
+# Versions kept per user; older ones are pruned when a snapshot is written
+SCHEDULE_RETENTION_VERSIONS = int(os.getenv("SCHEDULE_RETENTION_VERSIONS", "100"))
+
+def _document(schedule: Dict[str, Any], preferences: Dict[str, Any], is_custom: bool) -> Dict[str, Any]:
+    return {"schedule": schedule, "preferences": preferences, "is_custom": bool(is_custom)}
+
+def next_version(
+    head: Optional[Dict[str, Any]],
+    document: Dict[str, Any],
+    interval: int = SNAPSHOT_INTERVAL
+) -> Optional[Dict[str, Any]]:
+    """Version row for saving document on top of head, or None if nothing changed.
+
+    head holds the current "version" plus the document fields. Version 1 and
+    every interval-th version after it are snapshots.
+    """
+    if head is None:
+        return {"version": 1, "snapshot": document, "patch": None}
+    previous = _document(head["schedule"], head["preferences"], head["is_custom"])
+    patch = make_patch(previous, document)
+    if not patch:
+        return None
+    version = head["version"] + 1
+    if (version - 1) % interval == 0:
+        return {"version": version, "snapshot": document, "patch": None}
+    return {"version": version, "snapshot": None, "patch": patch}
+
+def _head_dict(head) -> Optional[Dict[str, Any]]:
+    if head is None:
+        return None
+    return {
+        "version": head.version,
+        "schedule": head.schedule,
+        "preferences": head.preferences,
+        "is_custom": head.is_custom
+    }
+
+def _prune(db, user_id: int, version: int, keep: int) -> int:
+    """Delete versions no longer needed to rebuild the last keep versions"""
+    from models.database import WorkoutScheduleVersion
+    from sqlalchemy import func
+
+    oldest_kept = version - keep + 1
+    if oldest_kept <= 1:
+        return 0
+    base_snapshot = (
+        db.query(func.max(WorkoutScheduleVersion.version))
+        .filter(
+            WorkoutScheduleVersion.user_id == user_id,
+            WorkoutScheduleVersion.snapshot.isnot(None),
+            WorkoutScheduleVersion.version <= oldest_kept
+        )
+        .scalar()
+    )
+    if not base_snapshot:
+        return 0
+    return (
+        db.query(WorkoutScheduleVersion)
+        .filter(WorkoutScheduleVersion.user_id == user_id, WorkoutScheduleVersion.version < base_snapshot)
+        .delete(synchronize_session=False)
+    )
+
+def save_schedule_version(
+    db,
+    user_id: int,
+    schedule: Dict[str, Any],
+    preferences: Dict[str, Any],
+    is_custom: bool = False
+) -> bool:
+    """Record a new schedule version and move the user's head to it.
+
+    Saving a schedule identical to the head only refreshes its date.
+    """
+    try:
+        from models.database import WorkoutScheduleHead, WorkoutScheduleVersion
+
+        today = datetime.now().date()
+        document = _document(schedule, preferences, is_custom)
+        head = (
+            db.query(WorkoutScheduleHead)
+            .filter(WorkoutScheduleHead.user_id == user_id)
+            .with_for_update()
+            .first()
+        )
+        row = next_version(_head_dict(head), document)
+        if row is not None:
+            db.add(WorkoutScheduleVersion(user_id=user_id, date=today, **row))
+            if head is None:
+                head = WorkoutScheduleHead(user_id=user_id)
+                db.add(head)
+            head.version = row["version"]
+            head.schedule = schedule
+            head.preferences = preferences
+            head.is_custom = bool(is_custom)
+            if row["snapshot"] is not None:
+                db.flush()
+                _prune(db, user_id, row["version"], SCHEDULE_RETENTION_VERSIONS)
+        head.date = today
+        db.commit()
+        return True
+
+    except Exception as e:
+        print(f"Error saving schedule version: {str(e)}")
+        db.rollback()
+        return False
+
+def save_schedule_versions_bulk(
+    db,
+    schedules: List[Dict[str, Any]],
+    is_custom: bool = False
+) -> int:
+    """Version many schedules with one head read, one version insert and one head upsert.
+
+    Each item needs "user_id", "schedule" and "preferences". Returns the number saved.
+    """
+    if not schedules:
+        return 0
+    try:
+        from models.database import WorkoutScheduleHead, WorkoutScheduleVersion
+        from sqlalchemy import insert
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        today = datetime.now().date()
+        user_ids = {item["user_id"] for item in schedules}
+        heads = {
+            head.user_id: _head_dict(head)
+            for head in (
+                db.query(WorkoutScheduleHead)
+                .filter(WorkoutScheduleHead.user_id.in_(user_ids))
+                .with_for_update()
+                .all()
+            )
+        }
+
+        versions = []
+        for item in schedules:
+            document = _document(item["schedule"], item["preferences"], is_custom)
+            row = next_version(heads.get(item["user_id"]), document)
+            if row is None:
+                continue
+            versions.append({"user_id": item["user_id"], "date": today, **row})
+            heads[item["user_id"]] = {"version": row["version"], **document}
+
+        if versions:
+            db.execute(insert(WorkoutScheduleVersion), versions)
+            # One head row per user, even if a user appears several times in the batch
+            latest = {row["user_id"]: heads[row["user_id"]] for row in versions}
+            statement = pg_insert(WorkoutScheduleHead)
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={
+                    "version": statement.excluded.version,
+                    "schedule": statement.excluded.schedule,
+                    "preferences": statement.excluded.preferences,
+                    "is_custom": statement.excluded.is_custom,
+                    "date": statement.excluded.date
+                }
+            )
+            db.execute(statement, [
+                {"user_id": user_id, "date": today, **head}
+                for user_id, head in latest.items()
+            ])
+        db.commit()
+        return len(schedules)
+
+    except Exception as e:
+        print(f"Error bulk saving schedule versions: {str(e)}")
+        db.rollback()
+        return 0
+
+def get_latest_schedule(db, user_id: int) -> Optional[Dict[str, Any]]:
+    """Latest schedule from the head row; users without one fall back to the legacy table"""
+    from models.database import WorkoutSchedule, WorkoutScheduleHead
+
+    head = db.get(WorkoutScheduleHead, user_id)
+    if head is not None:
+        return {
+            "schedule": head.schedule,
+            "preferences": head.preferences,
+            "is_custom": head.is_custom,
+            "date": head.date,
+            "version": head.version
+        }
+
+    legacy = (
+        db.query(WorkoutSchedule)
+        .filter(WorkoutSchedule.user_id == user_id)
+        .order_by(WorkoutSchedule.date.desc(), WorkoutSchedule.id.desc())
+        .first()
+    )
+    if legacy:
+        return {
+            "schedule": legacy.schedule,
+            "preferences": legacy.preferences,
+            "is_custom": legacy.is_custom,
+            "date": legacy.date
+        }
+    return None
+
+def _rebuild(rows) -> Tuple[int, Dict[str, Any]]:
+    """Fold version rows (ascending, starting at a snapshot) into the last one's document"""
+    document = None
+    version = 0
+    for row in rows:
+        if row.snapshot is not None:
+            document = row.snapshot
+        elif document is None:
+            raise ValueError(f"Version {row.version} has no snapshot to apply its patch to")
+        else:
+            document = apply_patch(document, row.patch)
+        version = row.version
+    return version, document
+
+def _rows_for_version(db, user_id: int, version: int):
+    from models.database import WorkoutScheduleVersion
+    from sqlalchemy import func
+
+    base_snapshot = (
+        db.query(func.max(WorkoutScheduleVersion.version))
+        .filter(
+            WorkoutScheduleVersion.user_id == user_id,
+            WorkoutScheduleVersion.snapshot.isnot(None),
+            WorkoutScheduleVersion.version <= version
+        )
+        .scalar()
+    )
+    if not base_snapshot:
+        return []
+    return (
+        db.query(WorkoutScheduleVersion)
+        .filter(
+            WorkoutScheduleVersion.user_id == user_id,
+            WorkoutScheduleVersion.version.between(base_snapshot, version)
+        )
+        .order_by(WorkoutScheduleVersion.version)
+        .all()
+    )
+
+def get_schedule_version(db, user_id: int, version: int) -> Optional[Dict[str, Any]]:
+    """Rebuild an older version from its nearest snapshot and the patches after it"""
+    try:
+        rows = _rows_for_version(db, user_id, version)
+        if not rows or rows[-1].version != version:
+            return None
+        _, document = _rebuild(rows)
+        return {**document, "date": rows[-1].date, "version": version}
+
+    except Exception as e:
+        print(f"Error getting schedule version: {str(e)}")
+        return None
+
+def compact_schedule_history(db, user_id: Optional[int] = None, keep: int = SCHEDULE_RETENTION_VERSIONS) -> int:
+    """Keep only the last keep versions per user, turning the oldest kept one into a snapshot.
+
+    Returns the number of version rows deleted.
+    """
+    from models.database import WorkoutScheduleHead, WorkoutScheduleVersion
+
+    deleted = 0
+    query = db.query(WorkoutScheduleHead.user_id, WorkoutScheduleHead.version)
+    if user_id is not None:
+        query = query.filter(WorkoutScheduleHead.user_id == user_id)
+    for head_user_id, head_version in query.all():
+        oldest_kept = head_version - keep + 1
+        if oldest_kept <= 1:
+            continue
+        rows = _rows_for_version(db, head_user_id, oldest_kept)
+        if not rows or rows[-1].version != oldest_kept:
+            continue
+        _, document = _rebuild(rows)
+        rows[-1].snapshot = document
+        rows[-1].patch = None
+        deleted += (
+            db.query(WorkoutScheduleVersion)
+            .filter(WorkoutScheduleVersion.user_id == head_user_id, WorkoutScheduleVersion.version < oldest_kept)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    return deleted
+
+def repair_json_nulls(db) -> int:
+    """Turn snapshot/patch values stored as the JSON value null into SQL NULL.
+
+    Rows written before the columns were declared none_as_null hold 'null',
+    which the snapshot lookups would take for a snapshot. Returns rows fixed.
+    """
+    from models.database import WorkoutScheduleVersion
+    from sqlalchemy import Text, cast
+
+    repaired = 0
+    for column in (WorkoutScheduleVersion.snapshot, WorkoutScheduleVersion.patch):
+        repaired += (
+            db.query(WorkoutScheduleVersion)
+            .filter(cast(column, Text) == "null")
+            .update({column: None}, synchronize_session=False)
+        )
+    db.commit()
+    return repaired
+
+def migrate_legacy_schedules(db, drop_legacy: bool = False) -> int:
+    """Create heads from the latest legacy workout_schedules row of users without one"""
+    from models.database import WorkoutSchedule, WorkoutScheduleHead
+
+    migrated = 0
+    versioned = {user_id for (user_id,) in db.query(WorkoutScheduleHead.user_id).all()}
+    legacy_users = {user_id for (user_id,) in db.query(WorkoutSchedule.user_id).distinct().all()}
+    for user_id in legacy_users - versioned:
+        latest = get_latest_schedule(db, user_id)
+        if latest and save_schedule_version(db, user_id, latest["schedule"], latest["preferences"], latest["is_custom"]):
+            migrated += 1
+            if drop_legacy:
+                db.query(WorkoutSchedule).filter(WorkoutSchedule.user_id == user_id).delete(synchronize_session=False)
+                db.commit()
+    return migrated
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain versioned workout schedules")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact", help="Drop versions beyond the retention limit")
+    compact.add_argument("--keep", type=int, default=SCHEDULE_RETENTION_VERSIONS)
+    compact.add_argument("--user", type=int, default=None)
+    migrate = subparsers.add_parser("migrate", help="Version the latest legacy schedule of each user")
+    migrate.add_argument("--drop-legacy", action="store_true")
+    subparsers.add_parser("repair-nulls", help="Store JSON null snapshots and patches as SQL NULL")
+    args = parser.parse_args()
+
+    from models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "compact":
+            print(f"Deleted {compact_schedule_history(db, args.user, args.keep)} schedule versions")
+        elif args.command == "repair-nulls":
+            print(f"Repaired {repair_json_nulls(db)} schedule version columns")
+        else:
+            print(f"Migrated {migrate_legacy_schedules(db, args.drop_legacy)} users")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
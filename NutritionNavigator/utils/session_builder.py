@@ -0,0 +1,111 @@
+import heapq
+import re
+from typing import Dict, List, Any, Tuple, Iterable
+
+DEFAULT_GOAL = "General Fitness"
+
+# Fixed time costs in minutes
+WARMUP_MINUTES = 5
+TRANSITION_MINUTES = 1
+
+# Most exercises worth programming for one subgroup in a single session
+MAX_PER_SUBGROUP = 4
+
+# Seconds per rep when the tempo is not a plain number sequence (e.g. "Varied")
+DEFAULT_REP_SECONDS = 4
+# "X" in a tempo means explosive
+EXPLOSIVE_SECONDS = 1
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+def parse_range(text: Any, default: float) -> float:
+    """Midpoint of a guideline range such as "8-12", "Varied (3-15)" or "15-30+" """
+    numbers = [float(value) for value in _NUMBER.findall(str(text))]
+    if not numbers:
+        return default
+    return (min(numbers) + max(numbers)) / 2
+
+def parse_rest_seconds(text: Any, default: float = 90) -> float:
+    """Rest period in seconds from "60-90 seconds" or "2-5 minutes" """
+    seconds = parse_range(text, default)
+    if "min" in str(text).lower():
+        seconds *= 60
+    return seconds
+
+def parse_tempo_seconds(text: Any) -> float:
+    """Seconds per rep from a tempo such as "2-1-2" or "X-0-X" """
+    phases = str(text).upper().split("-")
+    if len(phases) < 2:
+        return DEFAULT_REP_SECONDS
+    seconds = 0.0
+    for phase in phases:
+        phase = phase.strip()
+        if phase == "X":
+            seconds += EXPLOSIVE_SECONDS
+        elif _NUMBER.fullmatch(phase):
+            seconds += float(phase)
+        else:
+            return DEFAULT_REP_SECONDS
+    return seconds or DEFAULT_REP_SECONDS
+
+def estimate_exercise_minutes(guideline: Dict[str, Any]) -> float:
+    """Time for all sets of one exercise, including rest and moving to the next exercise"""
+    sets = parse_range(guideline.get("sets_per_exercise"), 3)
+    reps = parse_range(guideline.get("rep_range"), 10)
+    rest = parse_rest_seconds(guideline.get("rest_period"))
+    work = reps * parse_tempo_seconds(guideline.get("tempo"))
+    # No rest is needed after the last set
+    seconds = sets * work + (sets - 1) * rest
+    return seconds / 60 + TRANSITION_MINUTES
+
+# Estimates per (guidelines object, goals); guidelines are loaded once per process
+_minutes_cache: Dict[Tuple[int, Tuple[str, ...]], float] = {}
+
+def minutes_per_exercise(goals: Iterable[str], guidelines: Dict[str, Dict[str, Any]]) -> float:
+    """Estimated minutes per exercise, averaged over the user's goals"""
+    goals = tuple(goals or ())
+    key = (id(guidelines), goals)
+    minutes = _minutes_cache.get(key)
+    if minutes is None:
+        known = [goal for goal in goals if goal in guidelines]
+        if not known and DEFAULT_GOAL in guidelines:
+            known = [DEFAULT_GOAL]
+        estimates = [estimate_exercise_minutes(guidelines[goal]) for goal in known]
+        minutes = sum(estimates) / len(estimates) if estimates else estimate_exercise_minutes({})
+        _minutes_cache[key] = minutes
+    return minutes
+
+def pack_session(
+    slots: List[Tuple[Any, int]],
+    budget_minutes: float,
+    minutes_each: float
+) -> Dict[Any, int]:
+    """Decide how many exercises each slot gets within the time budget.
+
+    slots holds (key, available exercises) pairs, e.g. one per subgroup. This is
+    a bounded knapsack where the k-th exercise from a slot is worth 1/k (the
+    first exercise for a subgroup matters most) and each copy is bounded by the
+    exercises available. With one cost per exercise the greedy choice by value
+    is optimal, and ties go to the slot listed first. Every slot gets at least
+    one exercise while the budget allows.
+    """
+    counts = {key: 0 for key, _ in slots}
+    if minutes_each <= 0:
+        return counts
+    remaining = budget_minutes - WARMUP_MINUTES
+    capacity = {key: min(available, MAX_PER_SUBGROUP) for key, available in slots}
+
+    heap = [(-1.0, order, key) for order, (key, _) in enumerate(slots) if capacity[key] > 0]
+    heapq.heapify(heap)
+    while heap and remaining >= minutes_each:
+        _, order, key = heapq.heappop(heap)
+        counts[key] += 1
+        remaining -= minutes_each
+        if counts[key] < capacity[key]:
+            heapq.heappush(heap, (-1.0 / (counts[key] + 1), order, key))
+    return counts
+
+def estimate_session_minutes(exercise_count: int, minutes_each: float) -> int:
+    if not exercise_count:
+        return 0
+    return round(WARMUP_MINUTES + exercise_count * minutes_each)
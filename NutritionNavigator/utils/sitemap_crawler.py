@@ -0,0 +1,255 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+# Sitemaps of the sites get_online_recipes draws from, and the paths that hold recipes there
+RECIPE_SITEMAPS = [
+    "https://www.eatingwell.com/sitemap.xml",
+    "https://www.foodnetwork.com/sitemap.xml",
+    "https://www.allrecipes.com/sitemap.xml"
+]
+RECIPE_PATH_PATTERN = re.compile(r"/recipes?/")
+
+RECIPE_CRAWL_STATE = os.getenv(
+    "RECIPE_CRAWL_STATE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".recipe_crawl_state.json")
+)
+CHECKPOINT_EVERY = 100
+FETCH_WORKERS = 16
+MAX_SITEMAPS = 500
+# Pages whose sitemap entry has no lastmod are rechecked after this long
+REFETCH_AFTER = timedelta(days=7)
+
+# Title words that don't tell two recipes apart
+TITLE_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "with", "of", "for", "in", "on", "my",
+    "recipe", "recipes", "easy", "best", "quick", "simple", "healthy", "homemade", "perfect"
+})
+
+_SITEMAP_NS = re.compile(r"^\{[^}]*\}")
+
+def parse_sitemap(body: bytes) -> Tuple[List[str], List[Tuple[str, Optional[str]]]]:
+    """(child sitemap URLs, [(page URL, lastmod)]) from a sitemap or sitemap index"""
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    root = ElementTree.fromstring(body)
+    sitemaps, pages = [], []
+    for entry in root:
+        fields = {_SITEMAP_NS.sub("", child.tag): (child.text or "").strip() for child in entry}
+        if not fields.get("loc"):
+            continue
+        if _SITEMAP_NS.sub("", entry.tag) == "sitemap":
+            sitemaps.append(fields["loc"])
+        else:
+            pages.append((fields["loc"], fields.get("lastmod") or None))
+    return sitemaps, pages
+
+def read_sitemaps(
+    sitemap_urls: Iterable[str],
+    fetch,
+    url_pattern=RECIPE_PATH_PATTERN
+) -> Tuple[Dict[str, Optional[str]], List[Dict[str, str]]]:
+    """Every recipe page URL with its lastmod, following sitemap indexes"""
+    to_visit = list(sitemap_urls)
+    visited = set()
+    pages: Dict[str, Optional[str]] = {}
+    errors = []
+    while to_visit and len(visited) < MAX_SITEMAPS:
+        url = to_visit.pop()
+        if url in visited:
+            continue
+        visited.add(url)
+        try:
+            sitemaps, entries = parse_sitemap(fetch(url))
+        except Exception as e:
+            errors.append({"url": url, "error": str(e)})
+            continue
+        to_visit.extend(sitemaps)
+        for page_url, lastmod in entries:
+            if url_pattern.search(page_url):
+                pages[page_url] = lastmod
+    return pages, errors
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+def recipe_fingerprint(recipe: Dict[str, Any]) -> str:
+    """Near-duplicate key: title words without filler, in any order, plus rounded nutrition.
+
+    Syndicated copies of a recipe differ in title decoration and in how the
+    nutrition figures are rounded, so calories go to the nearest 10 and the
+    macros to the nearest gram.
+    """
+    words = sorted(set(re.findall(r"[a-z0-9]+", recipe["name"].lower())) - TITLE_STOPWORDS)
+    key = "|".join([
+        " ".join(words),
+        str(int(round((recipe.get("calories") or 0) / 10))),
+        *(str(int(round(recipe.get(nutrient) or 0))) for nutrient in ("protein", "fat", "carbs"))
+    ])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def load_crawl_state(path: str = RECIPE_CRAWL_STATE) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"pages": {}, "fingerprints": {}}
+
+def save_crawl_state(state: Dict[str, Any], path: str = RECIPE_CRAWL_STATE) -> None:
+    """Write the state through a temporary file, so an interrupted save keeps the previous one"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temporary, path)
+
+def pages_to_fetch(
+    sitemap_pages: Dict[str, Optional[str]],
+    state: Dict[str, Any],
+    now: Optional[datetime] = None
+) -> List[str]:
+    """Pages that are new, have a new lastmod, or have no lastmod and are due a recheck"""
+    now = now or datetime.now()
+    due = []
+    for url, lastmod in sitemap_pages.items():
+        seen = state["pages"].get(url)
+        if seen is None:
+            due.append(url)
+        elif lastmod is not None:
+            if lastmod != seen.get("lastmod"):
+                due.append(url)
+        elif now - datetime.fromisoformat(seen["checked_at"]) >= REFETCH_AFTER:
+            due.append(url)
+    return due
+
+def crawl_recipes(
+    db=None,
+    sitemap_urls: Iterable[str] = RECIPE_SITEMAPS,
+    state_path: str = RECIPE_CRAWL_STATE,
+    fetch=None,
+    fetch_workers: int = FETCH_WORKERS,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    max_pages: Optional[int] = None
+) -> Dict[str, Any]:
+    """Incrementally crawl recipe pages listed in site sitemaps.
+
+    Only pages that are new or whose sitemap lastmod changed are fetched; a
+    fetched page whose content hash is unchanged is not parsed again. Recipes
+    whose fingerprint matches one already kept from another page are dropped
+    as near-duplicates. State is checkpointed every checkpoint_every pages, so
+    an interrupted crawl resumes where it stopped. Without a db the new
+    recipes are returned in the report instead.
+    """
+    from utils.fetch_backend import fetch_bytes
+    from utils.recipe_pipeline import store_recipes
+    from utils.recipe_scraper import parse_recipe_page
+
+    fetch = fetch or fetch_bytes
+    start = time.perf_counter()
+    state = load_crawl_state(state_path)
+    sitemap_pages, sitemap_errors = read_sitemaps(sitemap_urls, fetch)
+    due = pages_to_fetch(sitemap_pages, state)
+    if max_pages is not None:
+        due = due[:max_pages]
+
+    report = {
+        "sitemap_pages": len(sitemap_pages),
+        "due": len(due),
+        "fetched": 0,
+        "unchanged": 0,
+        "not_recipes": 0,
+        "duplicates": 0,
+        "stored": 0,
+        "errors": sitemap_errors
+    }
+    collected = []
+
+    def fetch_one(url):
+        try:
+            return url, fetch(url), None
+        except Exception as e:
+            return url, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+        for offset in range(0, len(due), checkpoint_every):
+            batch = []
+            for url, body, error in executor.map(fetch_one, due[offset:offset + checkpoint_every]):
+                if error is not None:
+                    report["errors"].append({"url": url, "error": error})
+                    continue
+                report["fetched"] += 1
+                now = datetime.now().isoformat()
+                seen = state["pages"].get(url, {})
+                page = {"lastmod": sitemap_pages[url], "checked_at": now, "hash": content_hash(body)}
+
+                if page["hash"] == seen.get("hash"):
+                    report["unchanged"] += 1
+                    state["pages"][url] = {**seen, **page}
+                    continue
+
+                # The page changed, so whatever recipe it held before no longer claims its fingerprint
+                if state["fingerprints"].get(seen.get("fingerprint")) == url:
+                    del state["fingerprints"][seen["fingerprint"]]
+
+                recipe = parse_recipe_page(body.decode("utf-8", errors="replace"))
+                if not recipe or not recipe["name"] or not recipe["calories"]:
+                    report["not_recipes"] += 1
+                    state["pages"][url] = page
+                    continue
+
+                fingerprint = recipe_fingerprint(recipe)
+                owner = state["fingerprints"].get(fingerprint)
+                if owner is not None and owner != url:
+                    report["duplicates"] += 1
+                    state["pages"][url] = {**page, "duplicate_of": owner}
+                    continue
+
+                state["fingerprints"][fingerprint] = url
+                state["pages"][url] = {**page, "fingerprint": fingerprint}
+                batch.append({"url": url, **recipe})
+
+            if batch:
+                if db is not None:
+                    stored = store_recipes(db, batch)
+                    if not stored:
+                        # Leave these pages due, so the next run retries them
+                        for recipe in batch:
+                            state["pages"].pop(recipe["url"], None)
+                    report["stored"] += stored
+                else:
+                    collected.extend(batch)
+                    report["stored"] += len(batch)
+            save_crawl_state(state, state_path)
+
+    if not due:
+        save_crawl_state(state, state_path)
+    report["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    if db is None:
+        report["recipes"] = collected
+    return report
+
+def main():
+    from models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = crawl_recipes(db)
+        print(
+            f"{report['sitemap_pages']} recipe pages in sitemaps, {report['due']} due, "
+            f"{report['fetched']} fetched, {report['unchanged']} unchanged, "
+            f"{report['duplicates']} near-duplicates, {report['stored']} stored "
+            f"in {report['elapsed_seconds']}s"
+        )
+        for error in report["errors"][:20]:
+            print(f"Error crawling {error['url']}: {error['error']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, List, Any, Optional, NamedTuple
+
+TRACE_LEVELS = {
+    "DEBUG": 10,
+    "INFO": 20,
+    "WARNING": 30,
+    "ERROR": 40,
+    "OFF": 100
+}
+
+class TraceRecord(NamedTuple):
+    timestamp: float
+    level: str
+    message: str
+    duration_ms: Optional[float] = None
+
+class _Span:
+    """Times a block and records it when it exits"""
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        self.tracer._record("SPAN", self.name, duration_ms)
+        return False
+
+class Tracer:
+    """Leveled tracing with lazy %-style formatting, optional span timing and an in-memory collector.
+
+    Messages below the configured level are never formatted, so tracing calls
+    are close to free when tracing is off (the default).
+    """
+
+    def __init__(self, level: str = "OFF", spans: bool = False, echo: bool = True, max_records: int = 1000):
+        self.records = deque(maxlen=max_records)
+        self.echo = echo
+        self._lock = threading.Lock()
+        self.configure(level, spans)
+
+    def configure(self, level: Optional[str] = None, spans: Optional[bool] = None, echo: Optional[bool] = None):
+        if level is not None:
+            self.level = level.upper()
+            self._threshold = TRACE_LEVELS.get(self.level, TRACE_LEVELS["OFF"])
+        if spans is not None:
+            self.spans = spans
+        if echo is not None:
+            self.echo = echo
+
+    def enabled(self, level: str = "DEBUG") -> bool:
+        return TRACE_LEVELS[level] >= self._threshold
+
+    def _record(self, level: str, message: str, duration_ms: Optional[float] = None):
+        record = TraceRecord(time.time(), level, message, duration_ms)
+        with self._lock:
+            self.records.append(record)
+        if self.echo:
+            if duration_ms is None:
+                print(f"[{level}] {message}")
+            else:
+                print(f"[{level}] {message}: {duration_ms:.2f} ms")
+
+    def _log(self, level: str, message: str, args: tuple):
+        if TRACE_LEVELS[level] < self._threshold:
+            return
+        self._record(level, message % args if args else message)
+
+    def debug(self, message: str, *args: Any):
+        self._log("DEBUG", message, args)
+
+    def info(self, message: str, *args: Any):
+        self._log("INFO", message, args)
+
+    def warning(self, message: str, *args: Any):
+        self._log("WARNING", message, args)
+
+    def error(self, message: str, *args: Any):
+        self._log("ERROR", message, args)
+
+    def span(self, name: str, *args: Any):
+        """Context manager timing a stage; a no-op unless span timing is enabled"""
+        if not self.spans:
+            return nullcontext()
+        return _Span(self, name % args if args else name)
+
+    def get_records(self, level: Optional[str] = None) -> List[TraceRecord]:
+        with self._lock:
+            records = list(self.records)
+        if level is None:
+            return records
+        return [record for record in records if record.level == level]
+
+    def get_span_totals(self) -> Dict[str, float]:
+        """Total milliseconds per span name from the collected records"""
+        totals: Dict[str, float] = {}
+        for record in self.get_records("SPAN"):
+            totals[record.message] = totals.get(record.message, 0.0) + record.duration_ms
+        return totals
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+# Process-wide tracer, configured from the environment (off unless requested)
+tracer = Tracer(
+    level=os.getenv("FITNESS_TRACE_LEVEL", "OFF"),
+    spans=os.getenv("FITNESS_TRACE_SPANS", "0") == "1",
+    echo=os.getenv("FITNESS_TRACE_ECHO", "1") == "1"
+)
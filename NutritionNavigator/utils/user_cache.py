@@ -0,0 +1,89 @@
+import streamlit as st
+import copy
+import time
+from typing import Dict, Any, Optional
+
+# How long a cached user snapshot stays valid across reruns
+USER_CACHE_TTL_SECONDS = 300
+
+# Profile fields users may edit, in the order the session profile lists them
+PROFILE_FIELDS = (
+    'weight',
+    'height',
+    'age',
+    'gender',
+    'activity_level',
+    'goal',
+    'dietary_restrictions',
+    'cuisine_preferences'
+)
+
+# Columns kept in the snapshot; the password hash never leaves the database session
+SNAPSHOT_FIELDS = ('id', 'email', 'username', 'is_active') + PROFILE_FIELDS
+
+def _get_cache() -> Dict[str, Any]:
+    """Get (or create) the per-session cache stored in Streamlit session state"""
+    if '_user_cache' not in st.session_state:
+        st.session_state._user_cache = {
+            "user": None,
+            "user_id": None,
+            "expires_at": 0.0,
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0
+        }
+    return st.session_state._user_cache
+
+def get_cached_user(db, user_id: int):
+    """Return user_id's User attached to db from the cached snapshot, or None if missing or expired.
+
+    The instance is merged without a query; columns outside the snapshot and
+    relationships load lazily through db as usual.
+    """
+    cache = _get_cache()
+    if cache["user"] is not None and cache["user_id"] == user_id and time.monotonic() < cache["expires_at"]:
+        from models.database import User
+        from sqlalchemy.orm import make_transient_to_detached
+
+        cache["hits"] += 1
+        user = User(**copy.deepcopy(cache["user"]))
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    cache["misses"] += 1
+    return None
+
+def cache_user(user) -> None:
+    """Store a plain snapshot of user's columns so later reruns can skip the users query"""
+    if user is None:
+        return
+    cache = _get_cache()
+    cache["user"] = {field: copy.deepcopy(getattr(user, field)) for field in SNAPSHOT_FIELDS}
+    cache["user_id"] = user.id
+    cache["expires_at"] = time.monotonic() + USER_CACHE_TTL_SECONDS
+
+def invalidate_user(user_id: Optional[int] = None) -> None:
+    """Drop the cached snapshot (only if it belongs to user_id, when given)"""
+    cache = _get_cache()
+    if user_id is None or cache["user_id"] == user_id:
+        cache["user"] = None
+        cache["user_id"] = None
+        cache["expires_at"] = 0.0
+        cache["invalidations"] += 1
+
+def profile_from_user(user) -> Dict[str, Any]:
+    """Build the session profile dictionary from a user snapshot"""
+    profile = {field: getattr(user, field) for field in PROFILE_FIELDS}
+    profile['dietary_restrictions'] = profile['dietary_restrictions'] or []
+    profile['cuisine_preferences'] = profile['cuisine_preferences'] or []
+    return profile
+
+def get_user_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics for the user cache of the current session"""
+    cache = _get_cache()
+    lookups = cache["hits"] + cache["misses"]
+    return {
+        "hits": cache["hits"],
+        "misses": cache["misses"],
+        "invalidations": cache["invalidations"],
+        "hit_rate": round(cache["hits"] / lookups, 3) if lookups else 0.0
+    }
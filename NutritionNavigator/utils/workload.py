@@ -0,0 +1,176 @@
+import math
+from datetime import datetime, date as date_type
+from typing import Dict, List, Any, Optional, Iterable
+
+# Exponentially weighted moving averages of daily training load (lambda = 2 / (N + 1))
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACUTE_DECAY = 1 - 2 / (ACUTE_DAYS + 1)
+CHRONIC_DECAY = 1 - 2 / (CHRONIC_DAYS + 1)
+
+# Load counted per rep of a bodyweight set (kg equivalent); the ratio is unitless
+BODYWEIGHT_REP_LOAD = 20.0
+
+# Acute:chronic ratio zones, checked in order
+ACWR_ZONES = (
+    (0.8, "undertrained"),
+    (1.3, "optimal"),
+    (1.5, "caution"),
+    (float("inf"), "high risk")
+)
+SAFE_ACWR = 1.3
+
+def session_load(sets: Iterable[Dict[str, Any]]) -> float:
+    """Training load of a session: volume load, with bodyweight reps at a fixed equivalent"""
+    total = 0.0
+    for item in sets:
+        load = float(item.get("load") or 0)
+        total += int(item.get("reps") or 0) * (load if load > 0 else BODYWEIGHT_REP_LOAD)
+    return total
+
+def _lambda(decay: float) -> float:
+    return 1 - decay
+
+def add_session(state: Optional[Dict[str, Any]], session_date: date_type, load: float) -> Dict[str, Any]:
+    """State after adding one session's load, without looking at earlier sessions.
+
+    The EWMA is linear in the daily loads, so a session on any date adds
+    lambda x load, decayed by the days between it and the state's date; this
+    also covers several sessions on one day and back-dated sessions.
+    """
+    if state is None:
+        state = {"acute": 0.0, "chronic": 0.0, "last_date": session_date, "last_session": None}
+    state = dict(state)
+    if session_date > state["last_date"]:
+        state = decay_to(state, session_date)
+    gap = (state["last_date"] - session_date).days
+    state["acute"] += _lambda(ACUTE_DECAY) * load * ACUTE_DECAY ** gap
+    state["chronic"] += _lambda(CHRONIC_DECAY) * load * CHRONIC_DECAY ** gap
+    if state["last_session"] is None or session_date > state["last_session"]:
+        state["last_session"] = session_date
+    return state
+
+def decay_to(state: Dict[str, Any], as_of: date_type) -> Dict[str, Any]:
+    """State carried forward to as_of with no training in between"""
+    days = (as_of - state["last_date"]).days
+    if days <= 0:
+        return dict(state)
+    return {
+        **state,
+        "acute": state["acute"] * ACUTE_DECAY ** days,
+        "chronic": state["chronic"] * CHRONIC_DECAY ** days,
+        "last_date": as_of
+    }
+
+def acwr_zone(ratio: Optional[float]) -> str:
+    if ratio is None:
+        return "no data"
+    for limit, zone in ACWR_ZONES:
+        if ratio < limit:
+            return zone
+    return ACWR_ZONES[-1][1]
+
+def days_until_ratio(state: Dict[str, Any], target: float = SAFE_ACWR) -> int:
+    """Rest days until the acute:chronic ratio falls to target (acute decays faster)"""
+    if state["chronic"] <= 0 or state["acute"] <= target * state["chronic"]:
+        return 0
+    days = math.log(target * state["chronic"] / state["acute"]) / math.log(ACUTE_DECAY / CHRONIC_DECAY)
+    return math.ceil(days)
+
+def summarize(state: Optional[Dict[str, Any]], as_of: Optional[date_type] = None) -> Dict[str, Any]:
+    """Acute and chronic load, their ratio and zone as of a date"""
+    as_of = as_of or datetime.now().date()
+    if state is None:
+        return {
+            "acute": 0.0,
+            "chronic": 0.0,
+            "acwr": None,
+            "zone": acwr_zone(None),
+            "last_session": None,
+            "as_of": as_of,
+            "rest_days_to_safe": 0
+        }
+    state = decay_to(state, as_of)
+    ratio = state["acute"] / state["chronic"] if state["chronic"] > 0 else None
+    return {
+        "acute": round(state["acute"], 1),
+        "chronic": round(state["chronic"], 1),
+        "acwr": round(ratio, 2) if ratio is not None else None,
+        "zone": acwr_zone(ratio),
+        "last_session": state["last_session"],
+        "as_of": as_of,
+        "rest_days_to_safe": days_until_ratio(state)
+    }
+
+def _state_from_row(row) -> Dict[str, Any]:
+    return {"acute": row.acute, "chronic": row.chronic, "last_date": row.last_date, "last_session": row.last_session}
+
+def record_session_load(db, user_id: int, session_date: date_type, load: float) -> None:
+    """Fold one session into the user's stored workload; the caller commits"""
+    from models.database import UserWorkload
+
+    row = db.get(UserWorkload, user_id, with_for_update=True)
+    state = add_session(_state_from_row(row) if row else None, session_date, load)
+    if row is None:
+        row = UserWorkload(user_id=user_id)
+        db.add(row)
+    row.acute = state["acute"]
+    row.chronic = state["chronic"]
+    row.last_date = state["last_date"]
+    row.last_session = state["last_session"]
+    row.updated_at = datetime.now()
+
+def get_workload(db, user_id: int, as_of: Optional[date_type] = None) -> Dict[str, Any]:
+    """The user's current workload summary from one row read"""
+    try:
+        from models.database import UserWorkload
+
+        row = db.get(UserWorkload, user_id)
+        return summarize(_state_from_row(row) if row else None, as_of)
+
+    except Exception as e:
+        print(f"Error getting workload: {str(e)}")
+        return summarize(None, as_of)
+
+def score_roster(db, user_ids: List[int], as_of: Optional[date_type] = None) -> List[Dict[str, Any]]:
+    """Workload summaries for many users from one query, highest ratio first"""
+    from models.database import UserWorkload
+
+    rows = {row.user_id: row for row in db.query(UserWorkload).filter(UserWorkload.user_id.in_(user_ids)).all()}
+    summaries = [
+        {"user_id": user_id, **summarize(_state_from_row(rows[user_id]) if user_id in rows else None, as_of)}
+        for user_id in user_ids
+    ]
+    summaries.sort(key=lambda summary: summary["acwr"] if summary["acwr"] is not None else -1, reverse=True)
+    return summaries
+
+def rebuild_workloads(db, user_ids: List[int]) -> int:
+    """Recompute stored workloads from the full set log, e.g. after importing history"""
+    from models.database import UserWorkload
+    from utils.workout_log import load_sets_frame
+
+    user_ids = list(user_ids)
+    frame = load_sets_frame(db, user_ids)
+    rebuilt = set()
+    if not frame.empty:
+        frame["session_load"] = frame["reps"] * frame["load"].where(frame["load"] > 0, BODYWEIGHT_REP_LOAD)
+        daily = frame.groupby(["user_id", "date"])["session_load"].sum()
+        for user_id, user_daily in daily.groupby(level="user_id"):
+            state = None
+            for (_, day), load in user_daily.items():
+                state = add_session(state, day.date(), float(load))
+            db.merge(UserWorkload(
+                user_id=int(user_id),
+                acute=state["acute"],
+                chronic=state["chronic"],
+                last_date=state["last_date"],
+                last_session=state["last_session"],
+                updated_at=datetime.now()
+            ))
+            rebuilt.add(int(user_id))
+    # Users with no sets left have no workload; drop rows from their deleted history
+    stale = [user_id for user_id in user_ids if user_id not in rebuilt]
+    if stale:
+        db.query(UserWorkload).filter(UserWorkload.user_id.in_(stale)).delete(synchronize_session=False)
+    db.commit()
+    return len(rebuilt)
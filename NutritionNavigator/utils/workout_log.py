@@ -0,0 +1,222 @@
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime, date as date_type
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+# Committed logged exercise IDs by (name, muscle group); rows in logged_exercises are never changed
+_exercise_ids: Dict[Tuple[str, str], int] = {}
+
+def _resolve_exercise_ids(
+    db,
+    keys: Iterable[Tuple[str, str]]
+) -> Tuple[Dict[Tuple[str, str], int], Dict[Tuple[str, str], int]]:
+    """IDs for (name, muscle group) pairs, creating missing ones in one upsert and one select.
+
+    Returns (all IDs, IDs looked up in this transaction). The new ones are only
+    safe to cache once the caller has committed, since a rollback may undo them.
+    """
+    from models.database import LoggedExercise
+    from sqlalchemy import select, tuple_
+    from sqlalchemy.dialects.postgresql import insert
+
+    keys = set(keys)
+    missing = [key for key in keys if key not in _exercise_ids]
+    new_ids: Dict[Tuple[str, str], int] = {}
+    if missing:
+        db.execute(
+            insert(LoggedExercise)
+            .values([{"name": name, "muscle_group": muscle_group} for name, muscle_group in missing])
+            .on_conflict_do_nothing(index_elements=["name", "muscle_group"])
+        )
+        rows = db.execute(
+            select(LoggedExercise.id, LoggedExercise.name, LoggedExercise.muscle_group)
+            .where(tuple_(LoggedExercise.name, LoggedExercise.muscle_group).in_(missing))
+        )
+        for exercise_id, name, muscle_group in rows:
+            new_ids[(name, muscle_group)] = exercise_id
+    return {**{key: _exercise_ids[key] for key in keys if key in _exercise_ids}, **new_ids}, new_ids
+
+def _finite(value: Any, default: Optional[float] = None) -> Optional[float]:
+    """value as a float; missing values (None, NaN) give default, infinities raise"""
+    if value is None or pd.isna(value):
+        return default
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Non-finite value: {value}")
+    return value
+
+def log_sets(
+    db,
+    user_id: int,
+    sets: List[Dict[str, Any]],
+    date: Optional[date_type] = None
+) -> int:
+    """Append a session's sets in one batched insert.
+
+    Each set needs "exercise", "muscle_group", "reps" and "load" and may give
+    "set_number" (defaults to its position per exercise). Returns the number logged.
+    """
+    try:
+        # Empty cells arrive as NaN, which is truthy; a missing load means bodyweight
+        sets = [
+            {**item, "reps": _finite(item.get("reps")), "load": _finite(item.get("load"), 0.0)}
+            for item in sets
+            if item.get("exercise")
+        ]
+    except (TypeError, ValueError) as e:
+        print(f"Error logging sets: {str(e)}")
+        return 0
+    sets = [item for item in sets if item["reps"]]
+    if not sets:
+        return 0
+    try:
+        from models.database import WorkoutSet
+        from sqlalchemy import insert
+        from utils.workload import record_session_load, session_load
+
+        date = date or datetime.now().date()
+        exercise_ids, new_ids = _resolve_exercise_ids(db, ((item["exercise"], item["muscle_group"]) for item in sets))
+        set_counters: Dict[str, int] = {}
+        rows = []
+        for item in sets:
+            set_counters[item["exercise"]] = set_counters.get(item["exercise"], 0) + 1
+            rows.append({
+                "user_id": user_id,
+                "date": date,
+                "exercise_id": exercise_ids[(item["exercise"], item["muscle_group"])],
+                "set_number": int(_finite(item.get("set_number")) or set_counters[item["exercise"]]),
+                "reps": int(item["reps"]),
+                "load": item["load"]
+            })
+        db.execute(insert(WorkoutSet), rows)
+        # Keep the rolling workload current in the same transaction
+        record_session_load(db, user_id, date, session_load(sets))
+        db.commit()
+        _exercise_ids.update(new_ids)
+        return len(rows)
+
+    except Exception as e:
+        print(f"Error logging sets: {str(e)}")
+        db.rollback()
+        return 0
+
+def load_sets_frame(
+    db,
+    user_ids: Iterable[int],
+    start_date: Optional[date_type] = None,
+    end_date: Optional[date_type] = None
+) -> pd.DataFrame:
+    """Logged sets for one or many users as a compactly typed DataFrame"""
+    from models.database import LoggedExercise, WorkoutSet
+    from sqlalchemy import select
+
+    statement = (
+        select(
+            WorkoutSet.user_id,
+            WorkoutSet.date,
+            LoggedExercise.name.label("exercise"),
+            LoggedExercise.muscle_group,
+            WorkoutSet.set_number,
+            WorkoutSet.reps,
+            WorkoutSet.load
+        )
+        .join(LoggedExercise, WorkoutSet.exercise_id == LoggedExercise.id)
+        .where(WorkoutSet.user_id.in_(list(user_ids)))
+    )
+    if start_date:
+        statement = statement.where(WorkoutSet.date >= start_date)
+    if end_date:
+        statement = statement.where(WorkoutSet.date <= end_date)
+
+    frame = pd.read_sql(statement, db.connection())
+    return prepare_sets_frame(frame)
+
+def prepare_sets_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Narrow dtypes and add the estimated 1RM (Epley) and volume of every set"""
+    frame = frame.astype({
+        "user_id": "int32",
+        "exercise": "category",
+        "muscle_group": "category",
+        "set_number": "int16",
+        "reps": "int16",
+        "load": "float32"
+    })
+    frame["date"] = pd.to_datetime(frame["date"])
+    # Epley: load x (1 + reps / 30); a single rep is the 1RM itself
+    frame["e1rm"] = np.where(frame["reps"] == 1, frame["load"], frame["load"] * (1 + frame["reps"] / 30)).astype("float32")
+    frame["volume"] = (frame["reps"] * frame["load"]).astype("float32")
+    return frame
+
+def estimated_1rm_history(frame: pd.DataFrame) -> pd.DataFrame:
+    """Best estimated 1RM per user, exercise and session date"""
+    return (
+        frame.groupby(["user_id", "exercise", "date"], observed=True)["e1rm"]
+        .max()
+        .reset_index()
+    )
+
+def best_estimated_1rm(frame: pd.DataFrame) -> pd.DataFrame:
+    """All-time best estimated 1RM per user and exercise, with the date it was set"""
+    best = frame.loc[frame.groupby(["user_id", "exercise"], observed=True)["e1rm"].idxmax()]
+    return best[["user_id", "exercise", "muscle_group", "date", "e1rm"]].reset_index(drop=True)
+
+def weekly_volume(frame: pd.DataFrame) -> pd.DataFrame:
+    """Sets, reps and volume load (reps x kg) per user, week and muscle group"""
+    week = frame["date"].dt.to_period("W-SUN").dt.start_time.rename("week")
+    return (
+        frame.groupby(["user_id", week, "muscle_group"], observed=True)
+        .agg(sets=("reps", "size"), reps=("reps", "sum"), volume=("volume", "sum"))
+        .reset_index()
+    )
+
+def overload_suggestions(
+    frame: pd.DataFrame,
+    rep_target: int = 12,
+    load_increment: float = 0.025,
+    regression_threshold: float = 0.05
+) -> pd.DataFrame:
+    """Double-progression suggestion for every user's exercises, based on their last two sessions.
+
+    If every set of the last session reached rep_target, the load goes up by
+    load_increment (rounded to 0.5 kg), or a bodyweight exercise gets another
+    set. If the best estimated 1RM fell by more than regression_threshold from
+    the session before, the load is held. Otherwise the next step is adding
+    reps at the same load.
+    """
+    sessions = (
+        frame.groupby(["user_id", "exercise", "date"], observed=True)
+        .agg(top_load=("load", "max"), min_reps=("reps", "min"), e1rm=("e1rm", "max"))
+        .reset_index()
+        .sort_values(["user_id", "exercise", "date"])
+    )
+    sessions["previous_e1rm"] = sessions.groupby(["user_id", "exercise"], observed=True)["e1rm"].shift()
+    last = sessions.groupby(["user_id", "exercise"], observed=True).tail(1).reset_index(drop=True)
+
+    regressed = last["previous_e1rm"].notna() & (last["e1rm"] < last["previous_e1rm"] * (1 - regression_threshold))
+    hit_target = last["min_reps"] >= rep_target
+    bodyweight = last["top_load"] <= 0
+    last["suggestion"] = np.select(
+        [regressed, hit_target & ~bodyweight, hit_target & bodyweight],
+        ["hold", "increase_load", "add_set"],
+        default="add_reps"
+    )
+    increased = (last["top_load"] * (1 + load_increment) * 2).round() / 2
+    # Always move up by at least 0.5 kg
+    increased = np.maximum(increased, last["top_load"] + 0.5)
+    last["suggested_load"] = np.where(last["suggestion"] == "increase_load", increased, last["top_load"])
+    return last[["user_id", "exercise", "date", "top_load", "min_reps", "e1rm", "suggestion", "suggested_load"]]
+
+def exercise_from_schedule_entry(entry: str, library: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(exercise name, muscle group) for a schedule entry like "Upper Chest: Incline Push-ups" """
+    from utils.exercise_substitutions import get_substitution_graph, parse_schedule_entry
+
+    parsed = parse_schedule_entry(entry)
+    if not parsed:
+        return None
+    subgroup, _, name = parsed
+    graph = get_substitution_graph(library)
+    node = graph.find(name, subgroup)
+    if node is None:
+        return None
+    return name, graph.nodes[node][0]